@@ -73,8 +73,11 @@ class Classifier:
 	# Function: Constructor
 	# ---------------------
 	# given a list of recordings, this function converts them to its 
-	# preferred format
-	def __init__ (self, motion_sequences_dict, FeatureExtractor=FeatureFunctions.CompressedAVFeatureExtractor):
+	# preferred format. given a FeatureCache, features already extracted
+	# for these recordings (by the same extractor) are reused
+	def __init__ (self, motion_sequences_dict, FeatureExtractor=FeatureFunctions.CompressedAVFeatureExtractor, feature_cache=None):
+
+		self.feature_cache = feature_cache
 
 		### Step 0: get a dict of dataframes ###
 		print_inner_status ("Initializing Classifier", "Extracting dataframes from motion sequences")		
@@ -99,6 +102,8 @@ class Classifier:
 	# returns dict Map: label -> list of features for recordings
 	def recordings_dict_to_features_dict (self, raw_recordings_dict):
 
+		if not self.feature_cache is None:
+			return self.feature_cache.extract_dict (self.feature_extractor, raw_recordings_dict)
 		return {label:[self.feature_extractor.extract(r) for r in recordings] for label,recordings in raw_recordings_dict.items()}
 
 
@@ -10,22 +10,27 @@ from ..interface.util import *
 
 class EventMonitor (threading.Thread):
 
+	poll_interval = 0.1 	# secs to wait for new frames before re-checking _stop
+
 	# Function: Constructor
 	# ---------------------
 	# stores a reference to the motion sequence
 	def __init__ (self):
 		threading.Thread.__init__ (self)
 		self.motion_sequence = None	
+		self.cursor = None
 		self._stop = threading.Event ()
 		self.event_occurred = threading.Event ()
 
 
 	# Function: attach
 	# ----------------
-	# attaches this EventMonitor to a motion sequence
+	# attaches this EventMonitor to a motion sequence; it gets its
+	# own cursor, so any number of monitors can share one sequence
 	def attach (self, _motion_sequence):
 		
 		self.motion_sequence = _motion_sequence
+		self.cursor = _motion_sequence.get_cursor ()
 
 	# Function: run
 	# -------------
@@ -34,7 +39,8 @@ class EventMonitor (threading.Thread):
 	
 		if not self.motion_sequence:
 			print_error ("Event monitor not attached to a motion sequence", "make sure to <attach ()> before <start ()>ing")
-		while not self._stop.isSet ():
+			return
+		while not self._stop.isSet () and not self.cursor.is_exhausted ():
 			self.monitor ()
 
 
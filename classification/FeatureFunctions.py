@@ -14,6 +14,8 @@ import scipy
 from sklearn.hmm import GaussianHMM
 from sklearn.preprocessing import scale
 from ..interface.util import *
+from ..motion_sequence.MotionSequenceWindow import MotionSequenceWindow
+from ..devices import skeleton
 from copy import copy
 
 
@@ -120,12 +122,95 @@ def get_cleaned_dataframe (df):
 	return df
 
 
+# Function: get_columns
+# ---------------------
+# given a recording (dataframe or MotionSequenceWindow), returns
+# (timestamps, dict Map: column name -> array) without copying
+def get_columns (recording):
+
+	if isinstance (recording, MotionSequenceWindow):
+		return recording.timestamps, recording.columns
+	columns = {name: recording[name].values for name in recording.columns if name != 'timestamp'}
+	return recording['timestamp'].values, columns
+
+
+# Function: lower_time_resolution_indices
+# ---------------------------------------
+# array version of lower_time_resolution: given timestamps, returns
+# the positions of the (roughly) evenly spaced frames it would keep
+def lower_time_resolution_indices (timestamps, new_res=5):
+
+	timestamps = np.asarray (timestamps)
+	elapsed_time = timestamps[-1] - timestamps[0]
+	desired_interval = int(float(elapsed_time) / float(new_res - 1))
+	if desired_interval <= 0:
+		return np.arange (len(timestamps), dtype=int)
+
+	#=====[ first frame at or after each knotch of the target grid...	]=====
+	num_knotches = int(elapsed_time // desired_interval) + 1
+	knotches = np.arange (num_knotches)
+	first_after = np.searchsorted (timestamps, timestamps[0] + knotches * desired_interval, side='left')
+
+	#=====[ ...or, catching up after a gap, the frame after the previous knotch's	]=====
+	include_indices = knotches + np.maximum.accumulate (first_after - knotches)
+	return include_indices[include_indices < len(timestamps)].astype (int)
+
+
+# columns dropped by get_cleaned_dataframe, and those that get
+# velocity/acceleration features (in output order)
+av_dropped_columns 	= set(['fingers', 'hand_sphere_radius', 'hands', 'timestamp'])
+av_motion_columns 	= [('py', 'palm_y'), ('px', 'palm_x'), ('pz', 'palm_z'), ('pitch', 'pitch'), ('roll', 'roll'), ('yaw', 'yaw')]
+
+
 # Function: av_matrix
 # -------------------
-# returns a numpy matrix containing only acceleration, velocity features
-def av_matrix (df):
+# returns a numpy matrix containing only acceleration, velocity features.
+# works directly on the column arrays of a dataframe or a window view:
+# downsampled positions (columns in sorted order), then v_*, then a_*
+def av_matrix (recording):
+
+	timestamps, columns = get_columns (recording)
+	rows = lower_time_resolution_indices (timestamps)
+
+	### Step 1: downsampled raw columns ###
+	kept = [name for name in sorted (columns.keys ()) if not name in av_dropped_columns and columns[name].ndim == 1]
+	features = [np.asarray (columns[name][rows], dtype=np.float64) for name in kept]
 
-	return np.matrix (get_cleaned_dataframe (df))
+	### Step 2: velocity, acceleration (leading nans zeroed) ###
+	velocities, accelerations = [], []
+	for suffix, name in av_motion_columns:
+		v = np.zeros (len(rows))
+		v[1:] = np.diff (np.asarray (columns[name][rows], dtype=np.float64))
+		a = np.zeros (len(rows))
+		a[2:] = np.diff (v)[1:]
+		velocities.append (v)
+		accelerations.append (a)
+
+	return np.matrix (np.column_stack (features + velocities + accelerations))
+
+
+# Function: get_skeleton
+# -----------------------
+# given a recording (dataframe or MotionSequenceWindow), returns its
+# (positions, orientations) arrays, frames x joints x axes
+def get_skeleton (recording):
+
+	if isinstance (recording, MotionSequenceWindow):
+		return recording.get_skeleton ()
+	converted = skeleton.dataframe_to_skeleton (recording)
+	if converted is None:
+		return None
+	return converted[0], converted[1]
+
+
+# Function: skeleton_relative_positions
+# -------------------------------------
+# given joint positions (frames x joints x 3), returns them relative
+# to the torso in the same frame
+def skeleton_relative_positions (positions):
+
+	torso = positions[:, skeleton.joint_index['JOINT_TORSO'], :]
+	return positions - torso[:, np.newaxis, :]
 
 
 # Function: get_elapsed_time
@@ -156,8 +241,14 @@ def get_valid_recordings (raw_recordings_list, evaluation_function):
 # Class: FeatureExtractor
 # -----------------------
 # abstract class for all feature-extraction classes.
+# bump feature_version when extract's output changes in a way its
+# source doesn't show; set cacheable = False if it depends on
+# trained state (see FeatureCache)
 class FeatureExtractor ():
 
+	feature_version = 1
+	cacheable = True
+
 	# Function: Constructor
 	# ---------------------
 	# Parameters (1):
@@ -180,6 +271,15 @@ class FeatureExtractor ():
 		pass
 
 
+	# Function: get_cache_params
+	# --------------------------
+	# returns Map: name -> value of the parameters extract depends on,
+	# for FeatureCache keys; by default, all plain-valued attributes
+	def get_cache_params (self):
+
+		return {k: v for k, v in vars(self).items () if isinstance (v, (bool, int, long, float, str, tuple))}
+
+
 # FeatureExtractor: BaselineFeatureExtractor
 # ------------------------------------------
 # - downsamples recording w/ lower_time_resolution
@@ -205,7 +305,7 @@ class AVFeatureExtractor (FeatureExtractor):
 
 	def extract (self, raw_recording):
 
-		return np.array(av_matrix (copy(raw_recording)))
+		return np.array(av_matrix (raw_recording))
 
 
 
@@ -217,7 +317,7 @@ class CompressedAVFeatureExtractor (FeatureExtractor):
 
 	def extract (self, recording_dataframe):
 
-		avm = av_matrix (copy(recording_dataframe))
+		avm = av_matrix (recording_dataframe)
 		stats_functions = [np.mean, np.std, np.max, np.min]
 		stats = []
 		for f in stats_functions:
@@ -225,6 +325,23 @@ class CompressedAVFeatureExtractor (FeatureExtractor):
 		return np.array(stats)
 
 
+# FeatureExtractor: SkeletonFeatureExtractor
+# ------------------------------------------
+# - downsamples recording w/ lower_time_resolution_indices
+# - returns torso-relative joint positions, one row per frame
+#	(joints * 3 columns); missing joints are zeroed
+class SkeletonFeatureExtractor (FeatureExtractor):
+
+	def extract (self, recording):
+
+		timestamps, columns = get_columns (recording)
+		positions, orientations = get_skeleton (recording)
+		rows = lower_time_resolution_indices (timestamps)
+		relative = skeleton_relative_positions (positions[rows])
+		return np.nan_to_num (relative.reshape (len(rows), -1))
+
+
+
 # FeatureExtractor: HMMScoreFeatureExtractor 
 # -------------------------------------
 # uses HMMs on relative position/velocity/acceleration data
@@ -233,6 +350,7 @@ class CompressedAVFeatureExtractor (FeatureExtractor):
 # gets above 0.95 accuracy on 5-fold CV
 class HMMScoreFeatureExtractor (FeatureExtractor):
 
+	cacheable = False 		# features depend on the HMMs trained in the constructor
 
 	# Function: get_av_matrices 
 	# -------------------------
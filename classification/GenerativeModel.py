@@ -14,71 +14,15 @@ from sklearn.hmm import GaussianHMM
 from sklearn import cross_validation
 import FeatureFunctions
 from ..interface.util import *
-
-# Function: sec_to_usec
-# ---------------------
-# converts seconds to microseconds
-def sec_to_usec (sec):
-	
-	return sec*1000000
-
-# Function: usec_to_sec
-# ---------------------
-# converts seconds to microseconds
-def usec_to_sec (sec):
-	
-	return int(sec/float(1000000))
-
-
-# Function: start_time_to_index
-# -----------------------------
-# given start time, returns the index of the time slice closest to it
-def start_time_to_index (df, start_time):
-
-	return np.argmin (np.abs(df['timestamp'] - start_time))
-
-
-# Function: end_time_to_index
-# ---------------------------
-# given start time, returns the index of the time slice closest to it
-def end_time_to_index (df, end_time):
-
-	return np.argmin (np.abs(df['timestamp'] - end_time))
-
-
-# Function: temporal_subsample
-# ----------------------------
-# given two times within the recording, this will return
-# the portion of the dataframe that occurs between
-def temporal_subsample (df, start_time, end_time):
-
-	return df.loc[start_time_to_index (df, start_time) : end_time_to_index (df, end_time)]
-
-
-# Function: extract_last_n_seconds
-# --------------------------------
-# given a dataframe and secs, this will return the portion
-# of the dataframe that occured over the last n seconds
-def extract_last_n_seconds (df, secs):
-
-	if len(df) < 20:
-		return None
-
-	### Step 1: get desired start/end timestamps ###
-	end_time 	= df.iloc[-1]['timestamp']
-	start_time 	= end_time - sec_to_usec (secs)
-
-	### Step 2: try to temporal subsample, return none if impossible ###
-	try:
-		return temporal_subsample (df, start_time, end_time)
-	except ValueError:
-		return None
+from ..motion_sequence.MotionSequence import sec_to_usec, usec_to_sec
+from ..motion_sequence.MotionSequence import temporal_subsample, extract_last_n_seconds
 
 
 
 class GenerativeModel:
 
 	num_hmm_states = 10
+	min_window_frames = 20
 	feature_extractor = None				# object of class FeatureExtractor 
 	hmm = None
 
@@ -86,22 +30,39 @@ class GenerativeModel:
 	# Function: Constructor
 	# ---------------------
 	# given a list of recordings, this function converts them to its 
-	# preferred format
-	def __init__ (self, _motion_sequences, FeatureExtractor=FeatureFunctions.AVFeatureExtractor):
+	# preferred format. given a FeatureCache, their features are
+	# extracted only if not already cached
+	def __init__ (self, _motion_sequences, FeatureExtractor=FeatureFunctions.AVFeatureExtractor, _feature_cache=None):
 
 		#===[ Local Data ]===
 		self.motion_sequences 	= _motion_sequences
 		self.dataframes 		= [r.get_dataframe () for r in self.motion_sequences]
 		self.feature_extractor 	= FeatureExtractor ()
+		self.feature_cache 		= _feature_cache
+		self.features 			= None
 		self.train ()
 
 
+	# Function: get_features
+	# ----------------------
+	# returns the features of each training recording, extracted once
+	# (through the feature cache, if any)
+	def get_features (self):
+
+		if self.features is None:
+			if self.feature_cache is None:
+				self.features = [self.feature_extractor.extract(x) for x in self.dataframes]
+			else:
+				self.features = self.feature_cache.extract_all (self.feature_extractor, self.dataframes)
+		return self.features
+
+
 	# Function: fit
 	# -------------
 	# fits a generative model (HMM) to the data, returns it
 	def fit_hmm (self):
 
-		X = [self.feature_extractor.extract(x) for x in self.dataframes]
+		X = self.get_features ()
 		print [x.shape for x in X]
 		hmm = GaussianHMM ()
 		hmm.fit (X)
@@ -129,7 +90,7 @@ class GenerativeModel:
 	# threshold score = score_avg - std_dev_range*score_std_dev
 	def get_threshold_score (self, std_dev_range=3):
 
-		scores = [self.score(ms) for ms in self.motion_sequences]
+		scores = [self.hmm.score (x) for x in self.get_features ()]
 		avg, std = np.mean(scores), np.std(scores)
 		return avg - std_dev_range*std
 
@@ -177,8 +138,8 @@ class GenerativeModel:
 	# 'windows' to look at
 	def get_windows (self, df):
 
-		timespans =  [extract_last_n_seconds(df, timespan) for timespan in self.window_timespans]
-		return [t for t in timespans if t]
+		timespans =  [extract_last_n_seconds(df, timespan, self.min_window_frames) for timespan in self.window_timespans]
+		return [t for t in timespans if t is not None]
 
 
 	# Function: detect
@@ -51,11 +51,13 @@ class GestureMonitor (EventMonitor):
 	# ---------------------
 	# train_ms_list: list of motion sequences to train on
 	# monitor_ms: motion sequence to monitor
-	def __init__ (self, _train_ms_list, _gesture_name, FeatureExtractor):
+	# feature_cache: optional FeatureCache for training features
+	def __init__ (self, _train_ms_list, _gesture_name, FeatureExtractor, _feature_cache=None):
 
 		EventMonitor.__init__(self)
 		self.gesture_name = _gesture_name
 		self.feature_extractor 	= FeatureExtractor ()
+		self.feature_cache 		= _feature_cache
 		self.calculate_window_timespans (_train_ms_list)
 		self.train (_train_ms_list)
 
@@ -78,7 +80,18 @@ class GestureMonitor (EventMonitor):
 	def get_window_dfs (self):
 
 		window_dfs = [self.motion_sequence.get_window_df (timespan) for timespan in self.window_timespans]
-		return [w_df for w_df in window_dfs if w_df]
+		return [w_df for w_df in window_dfs if w_df is not None]
+
+
+	# Function: get_windows
+	# ---------------------
+	# returns a read-only MotionSequenceWindow for each (available)
+	# window; copied, as the monitored sequence keeps publishing
+	# frames while they're classified
+	def get_windows (self):
+
+		windows = [self.motion_sequence.get_window (timespan, copy=True) for timespan in self.window_timespans]
+		return [w for w in windows if w is not None]
 
 
 	# Function: train
@@ -91,7 +104,8 @@ class GestureMonitor (EventMonitor):
 
 	# Function: classify_window_df
 	# ----------------------------
-	# classifies a window_df as containing/not containing gesture.
+	# classifies a window (dataframe or MotionSequenceWindow) as
+	# containing/not containing gesture.
 	# override this method for different ML algorithms
 	def classify_window_df (self, window_df):
 		pass
@@ -100,17 +114,18 @@ class GestureMonitor (EventMonitor):
 	# Function: monitor
 	# -----------------
 	# main function called in thread, applied repeatedly
-	# to 'monitor_sequence'
+	# to 'monitor_sequence'; classifies once per batch of new
+	# frames read off this monitor's cursor
 	def monitor (self):
 
-		self.motion_sequence._new_frame_available.wait ()
-		window_dfs 	= self.get_window_dfs ()
+		if self.cursor.read (timeout=self.poll_interval) is None:
+			return
+		windows = self.get_windows ()
 
-		labels = [self.classify_window_df (df) for df in window_dfs]
+		labels = [self.classify_window_df (w) for w in windows]
 
 		if any(labels):
 			print "#####[ " + self.gesture_name + " ]#####"
-		self.motion_sequence._new_frame_available.clear ()
 
 
 	# Function: visualize
@@ -126,14 +141,17 @@ class GestureMonitor (EventMonitor):
 # uses HMMs to detect gestures
 class HMMGestureMonitor (GestureMonitor):
 
-	def __init__ (self, _train_ms_list, _gesture_name, FeatureExtractor=AVFeatureExtractor):
+	def __init__ (self, _train_ms_list, _gesture_name, FeatureExtractor=AVFeatureExtractor, _feature_cache=None):
 
-		GestureMonitor.__init__ (self, _train_ms_list, _gesture_name, FeatureExtractor)
+		GestureMonitor.__init__ (self, _train_ms_list, _gesture_name, FeatureExtractor, _feature_cache)
 
 	def train (self, motion_sequences):
 
 		dfs 					= [ms.get_dataframe () for ms in motion_sequences]
-		examples				= [self.feature_extractor.extract (df) for df in dfs]
+		if self.feature_cache is None:
+			examples			= [self.feature_extractor.extract (df) for df in dfs]
+		else:
+			examples			= self.feature_cache.extract_all (self.feature_extractor, dfs)
 		examples				= [e for e in examples if not np.isnan(np.sum(e))]
 
 		self.hmm 				= GaussianHMM (n_components=5).fit (examples)
@@ -148,7 +166,7 @@ class HMMGestureMonitor (GestureMonitor):
 
 	def get_current_reaction (self):
 
-		scores = [self.hmm.score (self.feature_extractor.extract(window_df)) for window_df in self.get_window_dfs ()]
+		scores = [self.hmm.score (self.feature_extractor.extract(window)) for window in self.get_windows ()]
 		if len(scores) > 0:
 			return np.max(scores)
 		else:
@@ -0,0 +1,13 @@
+from NIPy.file_storage.StorageDelegate import StorageDelegate
+import sys
+
+# usage: python compress_recordings.py [data dir] [--mode=lossless|quantized|float16] [--remove-originals]
+# compresses every recording under the data dir, printing each one's codec report
+if __name__ == "__main__":
+
+	data_dir = sys.argv[1] if len(sys.argv) > 1 and not sys.argv[1].startswith ('--') else './data'
+	modes = [arg[len('--mode='):] for arg in sys.argv if arg.startswith ('--mode=')]
+	storage_delegate = StorageDelegate (data_dir)
+	reports = storage_delegate.compress_recordings (modes[0] if len(modes) > 0 else 'quantized', '--remove-originals' in sys.argv)
+	for path, report in sorted (reports.items ()):
+		print path, '%(ratio).1fx, %(encode_mb_per_sec).1f MB/s' % report
@@ -0,0 +1,11 @@
+from NIPy.file_storage.StorageDelegate import StorageDelegate
+import sys
+
+# usage: python convert_recordings.py [data dir] [--remove-pickles]
+# converts every pickled recording under the data dir to the columnar format
+if __name__ == "__main__":
+
+	data_dir = sys.argv[1] if len(sys.argv) > 1 and not sys.argv[1].startswith ('--') else './data'
+	storage_delegate = StorageDelegate (data_dir)
+	for path in storage_delegate.convert_recordings ('--remove-pickles' in sys.argv):
+		print path
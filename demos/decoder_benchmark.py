@@ -0,0 +1,54 @@
+from NIPy.devices.FrameDecoder import PrimesenseDecoder
+from NIPy.devices.parameters import *
+from NIPy.devices import skeleton
+import json
+import time
+
+num_frames = 5000
+target_speedup = 5.0 		# decode cost, relative to the legacy decoder
+
+#==========[ Step 1: build a PrimesenseReceiver-style message	]==========
+raw_frame = {
+				j: 	{
+						'REAL_WORLD_POSITION': {a: repr(float(i)) for i, a in enumerate (skeleton.position_axes)},
+						'ORIENTATION': {a: repr(float(i)) for i, a in enumerate (skeleton.orientation_axes)}
+					}
+				for j in skeleton.joint_names
+			}
+raw_frame['JOINT_HEAD']['ORIENTATION']['w'] = '1.17549435e-38'
+json_message = device_filters['primesense'] + json.dumps (raw_frame)
+
+
+#==========[ Step 2: the per-coordinate dict decoding it replaces	]==========
+def format_coords (d):
+	return {k:float(v) if not v in connect_parameters['none_substitutes'] else None for k, v in d.items()}
+
+def legacy_decode (message):
+	frame = json.loads (message[len(device_filters['primesense']):])
+	formatted_frame = {}
+	for joint_name, data in frame.items ():
+		formatted_frame[joint_name + '_POSITION'] = format_coords (data['REAL_WORLD_POSITION'])
+		formatted_frame[joint_name + '_ORIENTATION'] = format_coords (data['ORIENTATION'])
+	return formatted_frame
+
+
+#==========[ Step 3: time each	]==========
+def usec_per_frame (decode, message):
+	start = time.time ()
+	for i in range(num_frames):
+		decode (message)
+	return (time.time () - start) * 1000000 / num_frames
+
+decoder = PrimesenseDecoder ()
+decoded_frame = decoder.decode (json_message)
+binary_message = decoder.encode (0, decoded_frame[skeleton.positions_column], decoded_frame[skeleton.orientations_column])
+
+legacy 	= usec_per_frame (legacy_decode, json_message)
+fast 	= usec_per_frame (decoder.decode, json_message)
+binary 	= usec_per_frame (decoder.decode, binary_message)
+print '==========[ usec per frame	]=========='
+print 'legacy (json + format_coords):	%.1f' % legacy
+print 'decoder, json:			%.1f (%.1fx)' % (fast, legacy / fast)
+print 'decoder, binary:		%.1f (%.1fx)' % (binary, legacy / binary)
+for wire_format, speedup in [('json', legacy / fast), ('binary', legacy / binary)]:
+	print '%s: %.1fx target %s' % (wire_format, target_speedup, 'met' if speedup >= target_speedup else 'NOT met')
@@ -2,14 +2,16 @@ from NIPy.file_storage.StorageDelegate import StorageDelegate
 from NIPy.motion_sequence.MotionSequence import PlayBackMotionSequence
 from NIPy.devices.DeviceReceiver import DeviceReceiver
 from NIPy.recording.Recorder import Recorder
+from NIPy.recording.RecordingWriter import load_stream
 import time
 
-#==========[ Step 1: create device receiver	]==========
-primesense_receiver = DeviceReceiver ('primesense')
+#==========[ Step 1: create device receiver (keep every frame)	]==========
+primesense_receiver = DeviceReceiver ('primesense', _transport_profile='lossless')
 
 
-#==========[ Step 2: create recorder	]==========
-recorder = Recorder (primesense_receiver)
+#==========[ Step 2: create recorder, streaming to disk as it goes	]==========
+storage_delegate = StorageDelegate ('./data')
+recorder = Recorder (primesense_receiver, _path=storage_delegate.get_new_capture_path ())
 
 
 #==========[ Step 3: record on enter	]==========
@@ -19,11 +21,13 @@ print '==========[ 	RECORDING]=========='
 recorder.start ()
 raw_input(">>> ENTER TO STOP <<<\n")
 recorder.stop ()
+recorder.join ()
+print recorder.get_capture_stats ()
+print recorder.get_writer_stats ()
 
 
-#==========[ Step 4: retrieve and save recorded motion sequence	]==========
-storage_delegate = StorageDelegate ('./data')
-recording = recorder.get_motion_sequence ()
+#==========[ Step 4: read back the streamed capture, save it as a recording	]==========
+recording = PlayBackMotionSequence (_frame_buffer=load_stream (recorder.get_stream_path ()))
 storage_delegate.save_recording (recording)
 
 
@@ -0,0 +1,42 @@
+from NIPy.devices.DeviceSimulator import DeviceSimulator, SyntheticSource, RecordingSource
+from NIPy.devices.DeviceHub import DeviceHub
+from NIPy.devices.DeviceReceiver import DeviceReceiver
+from NIPy.file_storage.StorageDelegate import StorageDelegate
+from NIPy.recording.Recorder import Recorder
+import sys
+import time
+
+# usage: python simulator_demo.py [rate] [secs] [recording name]
+rate 	= int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+secs 	= float(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+#==========[ Step 1: start simulator (synthetic, or replaying a recording)	]==========
+if len(sys.argv) > 3:
+	storage_delegate = StorageDelegate ('./data')
+	sources = [RecordingSource (storage_delegate.get_recording (sys.argv[3]))]
+else:
+	sources = [SyntheticSource ('primesense'), SyntheticSource ('leap')]
+simulator = DeviceSimulator (sources, rate)
+simulator.start ()
+
+
+#==========[ Step 2: receive on one hub, record	]==========
+hub = DeviceHub ()
+receivers = [DeviceReceiver (name, hub, 'lossless') for name in set([s.device_name for s in sources])]
+hub.start ()
+recorder = Recorder (receivers, _verbose=False)
+recorder.start ()
+time.sleep (secs)
+
+
+#==========[ Step 3: stop everything, report	]==========
+recorder.stop ()
+simulator.stop ()
+hub.stop ()
+print '==========[ simulator	]=========='
+print simulator.get_stats ()
+print '==========[ receivers	]=========='
+for receiver in receivers:
+	print receiver.get_statistics ()
+print '==========[ recorded	]=========='
+print len(recorder.get_motion_sequence ()), 'frames'
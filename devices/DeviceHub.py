@@ -0,0 +1,167 @@
+#-------------------------------------------------- #
+# Class: DeviceHub
+# ----------------
+# one thread and one zmq.Context receiving for any
+# number of devices: polls all of their sockets and
+# routes each message to its DeviceReceiver.
+#-------------------------------------------------- #
+import threading
+import zmq
+from ..threads.StoppableThread import StoppableThread
+from .parameters import *
+from .transport import is_conflating, open_sub_socket
+
+
+class DeviceHub (StoppableThread):
+	"""
+		Class: DeviceHub
+		----------------
+		pass to DeviceReceivers (DeviceReceiver ('leap', hub)) so
+		they share this thread instead of each running their own;
+		then start () it. devices at the same address and with the
+		same transport profile share one SUB socket, subscribed to
+		each of their filters; conflating profiles get a socket per
+		device, as conflation keeps only one message per socket
+	"""
+	_name = "DeviceHub"
+	poll_timeout = 100 		# msecs to wait for messages before re-checking _stop
+
+
+	def __init__ (self, _connect_address=connect_parameters['connect_address']):
+		"""
+			PUBLIC: Constructor
+			-------------------
+			given the default address receivers connect to, creates
+			the context and poller (no sockets until receivers
+			register)
+		"""
+		StoppableThread.__init__ (self, self._name)
+		self.connect_address = _connect_address
+
+		self.context 	= zmq.Context ()
+		self.poller 	= zmq.Poller ()
+		self.sockets 	= {} 		# Map: (address, profile[, filter]) -> SUB socket
+		self.routes 	= {} 		# Map: socket -> list of (device filter, receiver)
+
+		#=====[ registrations are applied from the hub's own thread	]=====
+		self._pending 	= []
+		self._lock 		= threading.Lock ()
+
+
+	def register (self, receiver, connect_address=None):
+		"""
+			PUBLIC: register
+			----------------
+			routes messages for receiver's device (at connect_address,
+			default self.connect_address) to receiver.handle_message,
+			over a socket set up per its transport profile. call again
+			after the profile changes. safe to call while the hub is
+			running
+		"""
+		with self._lock:
+			self._pending.append ((receiver, connect_address or self.connect_address))
+
+
+	def unregister (self, receiver):
+		"""
+			PUBLIC: unregister
+			------------------
+			stops routing messages to receiver, closing its socket if
+			no other receiver uses it. safe to call while the hub is
+			running
+		"""
+		with self._lock:
+			self._pending.append ((receiver, None))
+
+
+	def apply_registrations (self):
+		"""
+			PRIVATE: apply_registrations
+			----------------------------
+			creates/subscribes sockets for receivers registered since
+			the last call, and unroutes those unregistered (address
+			None); zmq sockets may only be used from one thread, so
+			this runs in the hub's
+		"""
+		with self._lock:
+			pending, self._pending = self._pending, []
+
+		for receiver, address in pending:
+			self.unroute (receiver)
+			if address is None:
+				continue
+			device_filter = receiver.decoder.device_filter
+
+			key = (address, receiver.transport_profile)
+			if is_conflating (receiver.transport_profile):
+				key += (device_filter,)
+			if not key in self.sockets:
+				socket = open_sub_socket (self.context, address, receiver.transport_profile)
+				self.poller.register (socket, zmq.POLLIN)
+				self.sockets[key] = socket
+				self.routes[socket] = []
+			socket = self.sockets[key]
+			socket.setsockopt (zmq.SUBSCRIBE, device_filter)
+			self.routes[socket].append ((device_filter, receiver))
+
+
+	def unroute (self, receiver):
+		"""
+			PRIVATE: unroute
+			----------------
+			removes receiver's existing route, if any, closing its
+			socket if nothing else uses it
+		"""
+		for key, socket in self.sockets.items ():
+			routes = [(f, r) for f, r in self.routes[socket] if r is receiver]
+			if len(routes) == 0:
+				continue
+			for route in routes:
+				self.routes[socket].remove (route)
+				socket.setsockopt (zmq.UNSUBSCRIBE, route[0])
+			if len(self.routes[socket]) == 0:
+				self.poller.unregister (socket)
+				socket.close ()
+				del self.routes[socket]
+				del self.sockets[key]
+
+
+	def route (self, socket, message):
+		"""
+			PRIVATE: route
+			--------------
+			hands message to every receiver on socket whose filter
+			it starts with
+		"""
+		for device_filter, receiver in self.routes[socket]:
+			if message.startswith (device_filter):
+				receiver.handle_message (message)
+
+
+	def thread_iteration (self):
+		"""
+			PRIVATE: thread_iteration
+			-------------------------
+			waits for any socket to have messages, then drains and
+			routes all of them
+		"""
+		self.apply_registrations ()
+		for socket, event in self.poller.poll (self.poll_timeout):
+			while True:
+				try:
+					message = socket.recv (zmq.NOBLOCK)
+				except zmq.Again:
+					break
+				self.route (socket, message)
+
+
+	def run (self):
+		"""
+			PUBLIC, OVERRIDE: run
+			---------------------
+			polls until stopped, then closes sockets and context
+		"""
+		StoppableThread.run (self)
+		for socket in self.sockets.values ():
+			socket.close ()
+		self.context.term ()
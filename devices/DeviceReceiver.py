@@ -11,44 +11,73 @@ import json
 import zmq
 import threading
 from ..threads.StoppableThread import StoppableThread
+from ..threads.clock import monotonic
 from .parameters import *
+from .FrameQueue import FrameQueue
+from .FrameDecoder import get_decoder
+from .ReceiverStatistics import ReceiverStatistics
+from .transport import get_transport_profile, open_sub_socket
 
 
 # Class: DeviceReceiver
 # ---------------------
-# class for receiving frames from a device; runs in its own thread.
+# class for receiving frames from a device; runs in its own thread,
+# unless given a DeviceHub, which then receives for it.
 # - start () to start getting frames (starts thread)
 # - stop () to terminate frame-getting (terminates thread)
-# - get_frame () to get most recent frame
+# - get_frame () to get the next queued frame
+# frames are queued per queue_policy (see FrameQueue): 'conflate'
+# keeps only the latest, 'drop_oldest' and 'block' keep up to
+# queue_size; get_queue_stats () reports what was dropped
+# receive-path telemetry stays out of the frames (and so out of
+# recordings): get_statistics () reports rate, jitter, decode time,
+# latency, queue depth, drops and, for devices that number their
+# frames, frames lost before they reached us
+# transport_profile picks socket options and queue policy together
+# ('latest-only' for control, 'lossless' for recording; see transport.py)
 class DeviceReceiver (StoppableThread):
 
     _name = "DeviceReceiver"
+    poll_timeout = 100      # msecs to wait for a message before re-checking _stop
 
 
     #==========[ Constructor ]==========
-    def __init__ (self, _device_name):
+    def __init__ (self, _device_name, _hub=None, _transport_profile='default', _queue_policy=None, _queue_size=None):
         """ 
             PUBLIC: Constructor
             -------------------
-            given device name, begins communication with device
+            given device name, begins communication with device;
+            received frames are queued according to _queue_policy
+            (default: the transport profile's).
+            given a DeviceHub, registers with it rather than opening
+            a socket and starting a thread of its own (note that a
+            'block' queue then stalls the hub, and so every device)
         """
         #=====[ Step 1: initialize StoppableThread ]=====
         StoppableThread.__init__ (self, self._name)
 
         #=====[ Step 2: IPC setup ]=====
-        self._new_frame_available = threading.Event ()
+        profile = get_transport_profile (_transport_profile)
+        self.transport_profile = _transport_profile
+        self._pending_profile = None
+        self.frame_queue = FrameQueue (_queue_policy or profile['queue_policy'], _queue_size or profile['max_frames'])
+        self.statistics = ReceiverStatistics ()
+        self._listeners = []
         self.last_frame = None
 
         #===[ Step 3: verify/setup device ]===
         if not _device_name in device_filters.keys ():
             raise TypeError ("Device not supported: " + _device_name)
         self.device_name = _device_name
+        self.decoder = get_decoder (_device_name)
 
-        #=====[ Step 4: connect to UDP ]=====
-        self.zmq_init ()
-
-        #=====[ Step 5: start this thread ]=====
-        self.start ()
+        #=====[ Step 4: connect to UDP, start this thread (or share the hub's) ]=====
+        self.hub = _hub
+        if self.hub is None:
+            self.zmq_init ()
+            self.start ()
+        else:
+            self.hub.register (self)
 
     #==========[ Destructor ]==========
     def __del__ (self):
@@ -58,7 +87,21 @@ class DeviceReceiver (StoppableThread):
             stops/joins this thread
         """
         self.stop ()
-        self.join ()
+        if self.hub is None:
+            self.join ()
+
+
+    def stop (self):
+        """
+            PUBLIC, OVERRIDE: stop
+            ----------------------
+            stops this thread (or unregisters from the hub);
+            releases it if it is blocked on a full frame queue
+        """
+        StoppableThread.stop (self)
+        if not self.hub is None:
+            self.hub.unregister (self)
+        self.frame_queue.close ()
 
 
     #==========[ ZeroMQ: Port Communication ]==========
@@ -69,44 +112,42 @@ class DeviceReceiver (StoppableThread):
             initializes communication with PrimeSenseReceiver via TCP
         """
         self.context = zmq.Context ()
-        self.socket = self.context.socket(zmq.SUB)
-        self.socket.connect (connect_parameters['connect_address'])
-        self.socket.setsockopt(zmq.SUBSCRIBE, device_filters[self.device_name])
+        self.socket = open_sub_socket (self.context, connect_parameters['connect_address'], self.transport_profile)
+        self.socket.setsockopt(zmq.SUBSCRIBE, self.decoder.device_filter)
 
 
-    def thread_iteration (self):
+    def set_transport_profile (self, profile_name):
         """
-            PRIVATE: thread_iteration
-            -------------------------
-            grabs a frame via self.read_frame
+            PUBLIC: set_transport_profile
+            -----------------------------
+            switches to another transport profile: the frame queue
+            changes now, the socket is reopened with the profile's
+            options by whichever thread owns it
         """
-        self.read_frame ()
+        profile = get_transport_profile (profile_name)
+        self.frame_queue.configure (profile['queue_policy'], profile['max_frames'])
+        self.transport_profile = profile_name
+        if self.hub is None:
+            self._pending_profile = profile_name
+        else:
+            self.hub.register (self)
 
 
-
-    def format_coords (self, d):
+    def thread_iteration (self):
         """
-            PRIVATE: format_coords
-            ----------------------
-            goes from strings to floats, puts in nan where appropriate
+            PRIVATE: thread_iteration
+            -------------------------
+            reopens the socket if the transport profile changed, then
+            grabs a frame via self.read_frame once one arrives
         """
-        return {k:float(v) if not v in connect_parameters['none_substitutes'] else None for k, v in d.items()}
+        if not self._pending_profile is None:
+            self._pending_profile = None
+            self.socket.close ()
+            self.socket = open_sub_socket (self.context, connect_parameters['connect_address'], self.transport_profile)
+            self.socket.setsockopt(zmq.SUBSCRIBE, self.decoder.device_filter)
 
-
-    def format_frame_primesense (self, frame):
-        """
-            PRIVATE: format_frame_primesense
-            ---------------------------------
-            given a frame from PrimesenseReceiver, this will format it so that it 
-            can go into a pandas dataframe easily
-        """
-        formatted_frame = {}
-        for joint_name, data in frame.iteritems ():
-            position = self.format_coords(data['REAL_WORLD_POSITION'])
-            orientation = self.format_coords (data['ORIENTATION'])
-            formatted_frame [joint_name + "_POSITION"] = position
-            formatted_frame [joint_name + "_ORIENTATION"] = orientation
-        return formatted_frame
+        if self.socket.poll (self.poll_timeout):
+            self.read_frame ()
 
 
 
@@ -115,28 +156,103 @@ class DeviceReceiver (StoppableThread):
             PRIVATE: read_frame
             -------------------
             grabs a frame from device communication channel
-            sets self.last_frame, self._new_frame_available
         """
-        #==========[ Step 1: get raw json dict ]==========
-        raw_frame  = json.loads (self.socket.recv ()[len(device_filters[self.device_name]):])
+        self.handle_message (self.socket.recv ())
 
-        #==========[ Step 2: reformat ]==========
-        formatted_frame = self.format_frame_primesense (raw_frame)
 
-        #==========[ Step 3: store/update ]==========
+    def handle_message (self, message):
+        """
+            PRIVATE: handle_message
+            -----------------------
+            given a raw message for this device, decodes it, sets
+            self.last_frame and queues the frame. called from this
+            thread, or from the DeviceHub's
+        """
+        #==========[ Step 1: decode (JSON or binary) into arrays ]==========
+        receive_time = monotonic ()
+        formatted_frame = self.decoder.decode (message)
+        decode_secs = monotonic () - receive_time
+
+        #==========[ Step 2: stamp with arrival time if needed, record telemetry ]==========
+        now = time.time () * 1000000
+        latency = None
+        if not 'timestamp' in formatted_frame:
+            formatted_frame['timestamp'] = now
+        else:
+            latency = (now - formatted_frame['timestamp']) / 1000000.0
+        self.statistics.record (receive_time, decode_secs, latency, self.decoder.last_sequence)
+
+        #==========[ Step 3: store/update, queue, wake listeners ]==========
         self.last_frame = formatted_frame
-        self._new_frame_available.set ()
+        self.frame_queue.put (formatted_frame)
+        for listener in self._listeners:
+            listener.set ()
 
 
-    def get_frame (self):
+    def add_listener (self, event):
+        """
+            PUBLIC: add_listener
+            --------------------
+            registers a threading.Event to be set whenever a new frame
+            arrives; lets one thread wait on several receivers at once
+        """
+        self._listeners.append (event)
+
+
+    def get_frame (self, block=True, timeout=None):
         """
             PUBLIC: get_frame
             -----------------
-            blocks until a new frame is available, then returns it
+            blocks until a new frame is available, then returns the
+            oldest queued one. with block=False (or once timeout secs
+            pass) returns None if there is no new frame
+        """
+        return self.frame_queue.get (block, timeout)
+
+
+    def get_frames (self, block=True, timeout=None):
+        """
+            PUBLIC: get_frames
+            ------------------
+            like get_frame, but returns every queued frame, oldest
+            first (empty list if there are none)
+        """
+        return self.frame_queue.get_all (block, timeout)
+
+
+    def get_decode_stats (self):
+        """
+            PUBLIC: get_decode_stats
+            ------------------------
+            returns frames decoded and average decode time (usec)
+        """
+        return self.decoder.get_decode_stats ()
+
+
+    def get_statistics (self):
+        """
+            PUBLIC: get_statistics
+            ----------------------
+            returns a snapshot of this receiver's rolling receive-path
+            statistics (see ReceiverStatistics), plus its current
+            queue depth and frames dropped
+        """
+        snapshot = self.statistics.snapshot ()
+        queue_stats = self.frame_queue.get_stats ()
+        snapshot['device'] = self.device_name
+        snapshot['queue_depth'] = queue_stats['queued']
+        snapshot['dropped'] = queue_stats['dropped']
+        return snapshot
+
+
+    def get_queue_stats (self):
+        """
+            PUBLIC: get_queue_stats
+            -----------------------
+            returns frames enqueued, delivered and dropped so far,
+            plus the current queue depth
         """
-        self._new_frame_available.wait ()
-        self._new_frame_available.clear ()
-        return self.last_frame
+        return self.frame_queue.get_stats ()
 
 
 
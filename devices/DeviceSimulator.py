@@ -0,0 +1,283 @@
+#-------------------------------------------------- #
+# Class: DeviceSimulator
+# ----------------------
+# stands in for the device bridge: publishes device
+# messages (synthetic or replayed from recordings)
+# on a local ZeroMQ PUB socket, at a fixed rate.
+#-------------------------------------------------- #
+import json
+import time
+import numpy as np
+import zmq
+from ..threads.StoppableThread import StoppableThread
+from ..threads.clock import monotonic
+from .parameters import *
+from .FrameDecoder import encode_binary
+from . import skeleton
+
+
+# standing pose (mm, device coordinates) that synthetic skeletons move about
+standing_pose = {
+					'JOINT_HEAD': (0, 400, 2000),
+					'JOINT_NECK': (0, 200, 2000),
+					'JOINT_TORSO': (0, 0, 2000),
+					'JOINT_LEFT_SHOULDER': (-150, 200, 2000),
+					'JOINT_LEFT_ELBOW': (-300, 0, 2000),
+					'JOINT_LEFT_HAND': (-350, -200, 1950),
+					'JOINT_RIGHT_SHOULDER': (150, 200, 2000),
+					'JOINT_RIGHT_ELBOW': (300, 0, 2000),
+					'JOINT_RIGHT_HAND': (350, -200, 1950),
+					'JOINT_LEFT_HIP': (-100, -200, 2000),
+					'JOINT_LEFT_KNEE': (-100, -600, 2000),
+					'JOINT_LEFT_FOOT': (-100, -1000, 2000),
+					'JOINT_RIGHT_HIP': (100, -200, 2000),
+					'JOINT_RIGHT_KNEE': (100, -600, 2000),
+					'JOINT_RIGHT_FOOT': (100, -1000, 2000)
+}
+
+
+# Function: to_wire_value
+# -----------------------
+# nan -> the device's sentinel value, as the bridge sends it
+def to_wire_value (value):
+
+	return skeleton.sentinel_value if np.isnan (value) else float(value)
+
+
+
+
+
+####################################################################################################
+##############################[ --- SOURCES --- ]###################################################
+####################################################################################################
+
+class SimulatedSource:
+	"""
+		Class: SimulatedSource
+		----------------------
+		abstract source of frames for one simulated device.
+		get_values (index, secs) returns the frame's float32 arrays;
+		to_json turns them into the message the bridge would send
+	"""
+
+	def __init__ (self, _device_name):
+
+		if not _device_name in device_filters:
+			raise TypeError ("Device not supported: " + _device_name)
+		self.device_name 	= _device_name
+		self.device_filter 	= device_filters[_device_name]
+
+
+	def get_values (self, index, secs):
+		"""
+			PUBLIC, OVERRIDE: get_values
+			----------------------------
+			given the frame's index and its time (secs since the
+			start), returns a list of float32 arrays
+		"""
+		raise NotImplementedError
+
+
+	def to_json (self, values):
+		"""
+			PUBLIC: to_json
+			---------------
+			given get_values output, returns the JSON-able frame
+		"""
+		if self.device_name == 'primesense':
+			positions, orientations = values
+			return 	{
+						j: 	{
+								'REAL_WORLD_POSITION': dict(zip(skeleton.position_axes, [to_wire_value (v) for v in positions[i]])),
+								'ORIENTATION': dict(zip(skeleton.orientation_axes, [to_wire_value (v) for v in orientations[i]]))
+							}
+						for i, j in enumerate (skeleton.joint_names)
+					}
+		return dict(zip(device_fields[self.device_name], [to_wire_value (v) for v in values[0]]))
+
+
+	def encode (self, index, secs, timestamp, wire_format='json'):
+		"""
+			PUBLIC: encode
+			--------------
+			returns the message for frame 'index' (JSON messages
+			carry it as the device's frame counter)
+		"""
+		values = self.get_values (index, secs)
+		if wire_format == 'binary':
+			return encode_binary (self.device_filter, timestamp, values)
+		frame = self.to_json (values)
+		frame[sequence_field] = index
+		return self.device_filter + json.dumps (frame)
+
+
+
+class SyntheticSource (SimulatedSource):
+	"""
+		Class: SyntheticSource
+		----------------------
+		generates frames: for primesense, a standing skeleton
+		waving both hands (wave_hz) plus noise (mm); for other
+		devices, a noisy sinusoid per field of device_fields
+	"""
+	wave_hz = 0.5
+	noise = 5.0
+
+	def __init__ (self, _device_name='primesense', _seed=None):
+
+		SimulatedSource.__init__ (self, _device_name)
+		self.random = np.random.RandomState (_seed)
+		if _device_name == 'primesense':
+			self.base = np.array ([standing_pose[j] for j in skeleton.joint_names], dtype=np.float32)
+			self.swing = np.zeros_like (self.base)
+			for joint, amplitude in [('HAND', 300), ('ELBOW', 150)]:
+				for side in ['LEFT', 'RIGHT']:
+					self.swing[skeleton.joint_index['JOINT_' + side + '_' + joint], 1] = amplitude
+			self.orientations = np.zeros ((skeleton.num_joints, len(skeleton.orientation_axes)), dtype=np.float32)
+			self.orientations[:, 3] = 1
+		else:
+			num_fields = len(device_fields[_device_name])
+			self.base = self.random.uniform (0, 100, num_fields).astype (np.float32)
+			self.swing = self.random.uniform (0, 50, num_fields).astype (np.float32)
+
+
+	def get_values (self, index, secs):
+
+		wave = np.sin (2 * np.pi * self.wave_hz * secs)
+		values = self.base + wave * self.swing + self.random.normal (0, self.noise, self.base.shape).astype (np.float32)
+		if self.device_name == 'primesense':
+			return [values, self.orientations]
+		return [values]
+
+
+
+class RecordingSource (SimulatedSource):
+	"""
+		Class: RecordingSource
+		----------------------
+		replays a recorded motion sequence (e.g. from
+		StorageDelegate.get_recording) frame by frame, looping at
+		the end. for primesense, its skeleton; otherwise its
+		device_fields columns (missing ones as nan)
+	"""
+
+	def __init__ (self, _motion_sequence, _device_name='primesense'):
+
+		SimulatedSource.__init__ (self, _device_name)
+		if _device_name == 'primesense':
+			self.frames = list(zip (*_motion_sequence.get_skeleton ()))
+		else:
+			frame_buffer = _motion_sequence.get_frame_buffer ()
+			columns = [frame_buffer.get_column (f) if frame_buffer.has_column (f) else np.full (len(frame_buffer), np.nan) for f in device_fields[_device_name]]
+			self.frames = [[row] for row in np.column_stack (columns).astype (np.float32)]
+
+
+	def get_values (self, index, secs):
+
+		return list(self.frames[index % len(self.frames)])
+
+
+
+
+
+####################################################################################################
+##############################[ --- PUBLISHER --- ]#################################################
+####################################################################################################
+
+class DeviceSimulator (StoppableThread):
+	"""
+		Class: DeviceSimulator
+		----------------------
+		publishes one frame from every source per round, 'rate'
+		rounds per second (None: as fast as possible). rounds that
+		fall behind are sent back to back rather than skipped, so
+		high rates (thousands/sec) don't depend on sleep resolution.
+		wire_format is 'binary' (see FrameDecoder; decodes many
+		times faster, but carries no frame counter) or 'json' (as
+		the bridge sends); None sends binary for devices in
+		binary_wire_devices and json for the rest
+	"""
+	_name = "DeviceSimulator"
+	max_sleep = 0.1 		# secs; bounds how long stop () can take
+
+
+	def __init__ (self, _sources, _rate=30, _wire_format='binary', _bind_address=connect_parameters['bind_address']):
+		"""
+			PUBLIC: Constructor
+			-------------------
+			given a list of SimulatedSources (or one), the rate and
+			wire format; call start () to begin publishing
+		"""
+		StoppableThread.__init__ (self, self._name)
+		self.sources 		= _sources if type(_sources) == type([]) else [_sources]
+		self.rate 			= _rate
+		self.wire_format 	= _wire_format
+		self.bind_address 	= _bind_address
+
+		self.num_rounds 	= 0
+		self.num_sent 		= 0
+		self.start_clock 	= None
+
+
+	def publish_round (self):
+		"""
+			PRIVATE: publish_round
+			----------------------
+			sends the next frame of every source
+		"""
+		secs = self.num_rounds / float(self.rate) if self.rate else monotonic () - self.start_clock
+		timestamp = time.time () * 1000000
+		for source in self.sources:
+			wire_format = self.wire_format or ('binary' if source.device_name in binary_wire_devices else 'json')
+			self.socket.send (source.encode (self.num_rounds, secs, timestamp, wire_format))
+			self.num_sent += 1
+		self.num_rounds += 1
+
+
+	def thread_iteration (self):
+		"""
+			PRIVATE: thread_iteration
+			-------------------------
+			sends every round that is due, or sleeps until the next
+		"""
+		if not self.rate:
+			self.publish_round ()
+			return
+
+		num_due = int((monotonic () - self.start_clock) * self.rate) + 1 - self.num_rounds
+		if num_due <= 0:
+			next_due = self.start_clock + self.num_rounds / float(self.rate)
+			time.sleep (max (0, min (next_due - monotonic (), self.max_sleep)))
+			return
+		for i in range(num_due):
+			self.publish_round ()
+
+
+	def run (self):
+		"""
+			PUBLIC, OVERRIDE: run
+			---------------------
+			binds the PUB socket (in this thread, as zmq requires),
+			publishes until stopped, then closes it
+		"""
+		self.context 	= zmq.Context ()
+		self.socket 	= self.context.socket (zmq.PUB)
+		self.socket.bind (self.bind_address)
+		self.start_clock = monotonic ()
+		StoppableThread.run (self)
+		self.socket.close ()
+		self.context.term ()
+
+
+	def get_stats (self):
+		"""
+			PUBLIC: get_stats
+			-----------------
+			returns rounds/messages sent and the achieved rate
+		"""
+		elapsed = 0.0 if self.start_clock is None else monotonic () - self.start_clock
+		return 	{
+					'rounds': self.num_rounds,
+					'messages': self.num_sent,
+					'rounds_per_sec': self.num_rounds / elapsed if elapsed > 0 else 0.0
+				}
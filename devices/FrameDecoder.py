@@ -0,0 +1,292 @@
+#-------------------------------------------------- #
+# Class: FrameDecoder
+# -------------------
+# per-device decoders for wire messages; built once
+# from the device's schema, they parse payloads
+# straight into float32 arrays. accepts JSON or the
+# compact binary layout written by encode_binary.
+#-------------------------------------------------- #
+import json
+import struct
+from operator import itemgetter
+import numpy as np
+from ..threads.clock import monotonic
+from .parameters import *
+from . import skeleton
+
+
+# binary payloads: binary_magic, then binary_header (timestamp in
+# usec, number of float32 values), then the values (little-endian)
+binary_magic 	= 'NIB1'
+binary_header 	= struct.Struct ('<dI')
+
+
+# Function: encode_binary
+# -----------------------
+# given a device filter, a timestamp (usec) and a list of arrays,
+# returns a binary wire message holding them as float32
+def encode_binary (device_filter, timestamp, arrays):
+
+	values = np.concatenate ([np.asarray (a, dtype='<f4').ravel () for a in arrays])
+	return device_filter + binary_magic + binary_header.pack (timestamp, len(values)) + values.tostring ()
+
+
+class FrameDecoder:
+	"""
+		Class: FrameDecoder
+		-------------------
+		decodes messages for a single device: strips its filter
+		prefix, then dispatches on the payload format. this base
+		class returns JSON payloads as parsed; subclasses override
+		decode_json/decode_values for a device's schema.
+		keeps a running count of frames and time spent decoding,
+		per wire format. last_sequence holds the device's own
+		frame counter from the last payload (None if it sent
+		none). with require_binary (default: the device is in
+		binary_wire_devices), JSON payloads raise ValueError.
+		layout lists the (column, dtype, entry shape) of decoded
+		frames, where fixed (None otherwise)
+	"""
+	num_values = 0
+	layout = None
+
+	def __init__ (self, _device_name, _require_binary=None):
+		"""
+			PUBLIC: Constructor
+			-------------------
+			given a device name (a key of device_filters), builds
+			the decoder for it
+		"""
+		if not _device_name in device_filters:
+			raise TypeError ("Device not supported: " + _device_name)
+		self.device_name 	= _device_name
+		self.device_filter 	= device_filters[_device_name]
+		self.sentinel 		= np.float32 (skeleton.sentinel_value)
+		self.require_binary = _require_binary if not _require_binary is None else _device_name in binary_wire_devices
+
+		self.num_decoded 	= 0
+		self.decode_secs 	= 0.0
+		self.format_stats 	= {'json': [0, 0.0], 'binary': [0, 0.0]} 	# format -> [frames, secs]
+		self.last_sequence 	= None
+
+
+	def decode (self, message):
+		"""
+			PUBLIC: decode
+			--------------
+			given a raw message (filter prefix included), returns the
+			decoded frame as a dict
+		"""
+		start = monotonic ()
+		payload = message[len(self.device_filter):]
+		self.last_sequence = None
+		if payload.startswith (binary_magic):
+			wire_format, frame = 'binary', self.decode_binary (payload)
+		elif self.require_binary:
+			raise ValueError (self.device_name + " sent JSON, but is in binary_wire_devices: its sender must use encode_binary")
+		else:
+			raw_frame = json.loads (payload)
+			if isinstance (raw_frame, dict) and sequence_field in raw_frame:
+				self.last_sequence = int(raw_frame.pop (sequence_field))
+			wire_format, frame = 'json', self.decode_json (raw_frame)
+		decode_secs = monotonic () - start
+		self.decode_secs += decode_secs
+		self.num_decoded += 1
+		self.format_stats[wire_format][0] += 1
+		self.format_stats[wire_format][1] += decode_secs
+		return frame
+
+
+	def decode_binary (self, payload):
+		"""
+			PRIVATE: decode_binary
+			----------------------
+			decodes a payload written by encode_binary
+		"""
+		offset = len(binary_magic)
+		timestamp, num_values = binary_header.unpack_from (payload, offset)
+		if num_values != self.num_values:
+			raise ValueError ("Expected " + str(self.num_values) + " values for " + self.device_name + ", got " + str(num_values))
+		values = np.frombuffer (payload, dtype='<f4', count=num_values, offset=offset + binary_header.size).astype (np.float32)
+		frame = self.decode_values (values)
+		frame['timestamp'] = timestamp
+		return frame
+
+
+	def decode_json (self, raw_frame):
+		"""
+			PRIVATE, OVERRIDE: decode_json
+			------------------------------
+			given a parsed JSON frame, returns the decoded frame
+		"""
+		return raw_frame
+
+
+	def decode_values (self, values):
+		"""
+			PRIVATE, OVERRIDE: decode_values
+			--------------------------------
+			given the flat float32 values of a binary frame (sentinels
+			not yet replaced), returns the decoded frame
+		"""
+		raise NotImplementedError
+
+
+	def to_float32 (self, values):
+		"""
+			PRIVATE: to_float32
+			-------------------
+			converts a list of numbers/numeric strings to a float32
+			array in one pass, replacing sentinel values with nan
+		"""
+		array = np.array (values, dtype=np.float32)
+		array[array == self.sentinel] = np.nan
+		return array
+
+
+	def get_decode_stats (self):
+		"""
+			PUBLIC: get_decode_stats
+			------------------------
+			returns frames decoded and average decode time (usec),
+			overall and per wire format, so the cost of JSON
+			senders shows up in a live session
+		"""
+		average = self.decode_secs / self.num_decoded if self.num_decoded > 0 else 0.0
+		stats = {'frames': self.num_decoded, 'usec_per_frame': average * 1000000}
+		for wire_format, (num_frames, secs) in self.format_stats.iteritems ():
+			stats[wire_format + '_frames'] = num_frames
+			stats[wire_format + '_usec_per_frame'] = secs / num_frames * 1000000 if num_frames > 0 else None
+		return stats
+
+
+
+class PrimesenseDecoder (FrameDecoder):
+	"""
+		Class: PrimesenseDecoder
+		------------------------
+		decodes PrimesenseReceiver frames (joint name -> {
+		REAL_WORLD_POSITION, ORIENTATION}) into the canonical
+		skeleton arrays (see skeleton.py)
+	"""
+	num_values = skeleton.num_joints * (len(skeleton.position_axes) + len(skeleton.orientation_axes))
+	layout = 	[
+					(skeleton.positions_column, 'float32', (skeleton.num_joints, len(skeleton.position_axes))),
+					(skeleton.orientations_column, 'float32', (skeleton.num_joints, len(skeleton.orientation_axes)))
+				]
+
+	def __init__ (self, _device_name='primesense'):
+
+		FrameDecoder.__init__ (self, _device_name)
+
+		#=====[ (joint, field, axis) per value, in array order	]=====
+		self.position_fields 	= [(j, 'REAL_WORLD_POSITION', a) for j in skeleton.joint_names for a in skeleton.position_axes]
+		self.orientation_fields = [(j, 'ORIENTATION', a) for j in skeleton.joint_names for a in skeleton.orientation_axes]
+		self.num_position_values = len(self.position_fields)
+
+
+	def decode_json (self, raw_frame):
+
+		missing = {}
+		positions 		= self.to_float32 ([raw_frame.get (j, missing).get (f, missing).get (a, 'nan') for j, f, a in self.position_fields])
+		orientations 	= self.to_float32 ([raw_frame.get (j, missing).get (f, missing).get (a, 'nan') for j, f, a in self.orientation_fields])
+		return self.make_frame (positions, orientations)
+
+
+	def decode_values (self, values):
+
+		values[values == self.sentinel] = np.nan
+		return self.make_frame (values[:self.num_position_values], values[self.num_position_values:])
+
+
+	def make_frame (self, positions, orientations):
+		"""
+			PRIVATE: make_frame
+			-------------------
+			given flat position/orientation arrays, returns the frame
+		"""
+		return 	{
+					skeleton.positions_column: positions.reshape (skeleton.num_joints, len(skeleton.position_axes)),
+					skeleton.orientations_column: orientations.reshape (skeleton.num_joints, len(skeleton.orientation_axes))
+				}
+
+
+	def encode (self, timestamp, positions, orientations):
+		"""
+			PUBLIC: encode
+			--------------
+			returns a binary wire message for the given skeleton
+		"""
+		return encode_binary (self.device_filter, timestamp, [positions, orientations])
+
+
+
+class FlatFieldDecoder (FrameDecoder):
+	"""
+		Class: FlatFieldDecoder
+		-----------------------
+		decodes devices whose frames are flat dicts of numbers
+		(leap hand frames, eyetribe gaze samples; fields per
+		device_fields) into one float32 column per field.
+		all fields are fetched in a single itemgetter call, so
+		100+ Hz streams cost no per-field Python work
+	"""
+
+	def __init__ (self, _device_name):
+
+		FrameDecoder.__init__ (self, _device_name)
+		self.fields 		= device_fields[_device_name]
+		self.num_values 	= len(self.fields)
+		self.layout 		= [(f, 'float32', ()) for f in self.fields]
+		self.get_fields 	= itemgetter (*self.fields)
+
+
+	def decode_json (self, raw_frame):
+
+		try:
+			values = self.get_fields (raw_frame)
+		except KeyError:
+			values = [raw_frame.get (f, 'nan') for f in self.fields]
+		return self.make_frame (self.to_float32 (values))
+
+
+	def decode_values (self, values):
+
+		values[values == self.sentinel] = np.nan
+		return self.make_frame (values)
+
+
+	def make_frame (self, values):
+		"""
+			PRIVATE: make_frame
+			-------------------
+			given the float32 values in field order, returns the
+			frame (field -> float32 scalar)
+		"""
+		return dict(zip (self.fields, values))
+
+
+	def encode (self, timestamp, values):
+		"""
+			PUBLIC: encode
+			--------------
+			returns a binary wire message for the given field values
+		"""
+		return encode_binary (self.device_filter, timestamp, [values])
+
+
+
+# Map: device name -> decoder class
+device_decoders = {
+					'primesense': PrimesenseDecoder,
+					'leap': FlatFieldDecoder,
+					'eyetribe': FlatFieldDecoder
+}
+
+
+# Function: get_decoder
+# ---------------------
+# returns a new decoder for the given device
+def get_decoder (device_name):
+
+	return device_decoders.get (device_name, FrameDecoder) (device_name)
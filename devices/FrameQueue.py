@@ -0,0 +1,191 @@
+#-------------------------------------------------- #
+# Class: FrameQueue
+# -----------------
+# bounded single-producer queue between a device's
+# receiving thread and whoever consumes its frames;
+# counts every frame it takes in, hands out or drops.
+#-------------------------------------------------- #
+import threading
+from collections import deque
+from ..threads.clock import monotonic
+
+
+# policies for a full queue:
+# - block: producer waits for room (nothing is dropped)
+# - drop_oldest: the oldest queued frame is discarded
+# - conflate: only the latest frame is kept
+queue_policies = ['block', 'drop_oldest', 'conflate']
+
+
+class FrameQueue:
+	"""
+		Class: FrameQueue
+		-----------------
+		put () from the receiving thread, get ()/get_all () from
+		consumers. get_stats () reports frames enqueued, delivered
+		and dropped, so what a consumer missed under load is known
+		exactly
+	"""
+
+	def __init__ (self, _policy='conflate', _max_frames=64):
+		"""
+			PUBLIC: Constructor
+			-------------------
+			given a policy (one of queue_policies) and the max number
+			of frames held, builds an empty queue. conflate always
+			holds at most one
+		"""
+		if not _policy in queue_policies:
+			raise TypeError ("Queue policy not supported: " + str(_policy))
+		self.policy 	= _policy
+		self.max_frames = 1 if _policy == 'conflate' else _max_frames
+
+		self._frames 	= deque ()
+		self._lock 		= threading.Condition ()
+		self._closed 	= False
+
+		self.num_enqueued 	= 0
+		self.num_delivered 	= 0
+		self.num_dropped 	= 0
+		self.max_depth 		= 0
+		self.blocked_secs 	= 0.0 	# producer time spent waiting for room (backpressure)
+
+
+	def __len__ (self):
+
+		return len(self._frames)
+
+
+	def put (self, frame, timeout=None):
+		"""
+			PUBLIC: put
+			-----------
+			adds a frame, applying the policy if the queue is full.
+			returns false if the frame was dropped: under 'block' that
+			only happens if timeout secs pass or the queue is closed
+		"""
+		with self._lock:
+
+			#=====[ Step 1: make room	]=====
+			if self.policy == 'block':
+				wait_start = monotonic ()
+				deadline = None if timeout is None else wait_start + timeout
+				while len(self._frames) >= self.max_frames and not self._closed:
+					remaining = None if deadline is None else deadline - monotonic ()
+					if not remaining is None and remaining <= 0:
+						break
+					self._lock.wait (remaining)
+				self.blocked_secs += monotonic () - wait_start
+				if len(self._frames) >= self.max_frames or self._closed:
+					self.num_dropped += 1
+					return False
+			else:
+				while len(self._frames) >= self.max_frames:
+					self._frames.popleft ()
+					self.num_dropped += 1
+
+			#=====[ Step 2: enqueue, wake consumers	]=====
+			self._frames.append (frame)
+			self.num_enqueued += 1
+			self.max_depth = max (self.max_depth, len(self._frames))
+			self._lock.notify_all ()
+			return True
+
+
+	def get (self, block=True, timeout=None):
+		"""
+			PUBLIC: get
+			-----------
+			returns the oldest queued frame. blocks until there is one
+			unless block=False; returns None if there is none once
+			timeout secs pass (or the queue is closed)
+		"""
+		with self._lock:
+			if block:
+				self.wait_for_frames (timeout)
+			if len(self._frames) == 0:
+				return None
+			frame = self._frames.popleft ()
+			self.num_delivered += 1
+			self._lock.notify_all ()
+			return frame
+
+
+	def get_all (self, block=True, timeout=None):
+		"""
+			PUBLIC: get_all
+			---------------
+			like get, but returns (and removes) every queued frame,
+			oldest first; empty list if there are none
+		"""
+		with self._lock:
+			if block:
+				self.wait_for_frames (timeout)
+			frames = list(self._frames)
+			self._frames.clear ()
+			self.num_delivered += len(frames)
+			self._lock.notify_all ()
+			return frames
+
+
+	def wait_for_frames (self, timeout=None):
+		"""
+			PRIVATE: wait_for_frames
+			------------------------
+			waits (holding self._lock) until a frame is queued, the
+			queue is closed or timeout secs pass
+		"""
+		deadline = None if timeout is None else monotonic () + timeout
+		while len(self._frames) == 0 and not self._closed:
+			remaining = None if deadline is None else deadline - monotonic ()
+			if not remaining is None and remaining <= 0:
+				break
+			self._lock.wait (remaining)
+
+
+	def configure (self, policy, max_frames):
+		"""
+			PUBLIC: configure
+			-----------------
+			switches to a new policy/size; frames beyond the new size
+			are dropped, oldest first
+		"""
+		if not policy in queue_policies:
+			raise TypeError ("Queue policy not supported: " + str(policy))
+		with self._lock:
+			self.policy 	= policy
+			self.max_frames = 1 if policy == 'conflate' else max_frames
+			while len(self._frames) > self.max_frames:
+				self._frames.popleft ()
+				self.num_dropped += 1
+			self._lock.notify_all ()
+
+
+	def close (self):
+		"""
+			PUBLIC: close
+			-------------
+			wakes every thread blocked on this queue; blocked puts
+			give up and count their frames as dropped
+		"""
+		with self._lock:
+			self._closed = True
+			self._lock.notify_all ()
+
+
+	def get_stats (self):
+		"""
+			PUBLIC: get_stats
+			-----------------
+			returns a dict of the queue's counters and depth
+		"""
+		with self._lock:
+			return 	{
+						'policy': self.policy,
+						'enqueued': self.num_enqueued,
+						'delivered': self.num_delivered,
+						'dropped': self.num_dropped,
+						'queued': len(self._frames),
+						'max_queued': self.max_depth,
+						'blocked_secs': self.blocked_secs
+					}
@@ -0,0 +1,115 @@
+#-------------------------------------------------- #
+# Class: ReceiverStatistics
+# -------------------------
+# rolling receive-path statistics for one device:
+# arrival rate, inter-arrival jitter, decode time,
+# (when frames carry a send time) latency and (when
+# they carry the device's frame counter) frames the
+# device sent that never arrived.
+#-------------------------------------------------- #
+import threading
+from collections import deque
+import numpy as np
+
+
+class ReceiverStatistics:
+	"""
+		Class: ReceiverStatistics
+		-------------------------
+		record () is called by the receiving thread once per frame;
+		the rolling figures cover the last 'window' frames.
+		snapshot () returns them all as a dict
+	"""
+	window = 256
+
+	def __init__ (self):
+		"""
+			PUBLIC: Constructor
+			-------------------
+			starts with nothing received
+		"""
+		self._lock 				= threading.Lock ()
+		self.num_received 		= 0
+		self.first_receive_time = None
+		self.last_receive_time 	= None
+		self.last_sequence 		= None
+		self.num_lost 			= 0 	# gaps in the device's frame counter
+
+		self.intervals 		= deque (maxlen=self.window) 	# secs between arrivals
+		self.decode_times 	= deque (maxlen=self.window) 	# secs
+		self.latencies 		= deque (maxlen=self.window) 	# secs, send -> receive
+
+
+	def record (self, receive_time, decode_secs, latency=None, sequence=None):
+		"""
+			PUBLIC: record
+			--------------
+			given a frame's (monotonic) receive time, the secs spent
+			decoding it and, if known, its latency in secs and the
+			device's frame counter, updates the statistics. a jump
+			in the counter counts the frames skipped as lost; a
+			reset (the device restarted) does not
+		"""
+		with self._lock:
+			if not sequence is None:
+				if not self.last_sequence is None and sequence > self.last_sequence + 1:
+					self.num_lost += sequence - self.last_sequence - 1
+				self.last_sequence = sequence
+			if not self.last_receive_time is None:
+				self.intervals.append (receive_time - self.last_receive_time)
+			else:
+				self.first_receive_time = receive_time
+			self.last_receive_time = receive_time
+			self.decode_times.append (decode_secs)
+			if not latency is None:
+				self.latencies.append (latency)
+			self.num_received += 1
+
+
+	def get_rate (self):
+		"""
+			PUBLIC: get_rate
+			----------------
+			returns frames/sec over the rolling window (0 if unknown)
+		"""
+		with self._lock:
+			if len(self.intervals) == 0 or sum(self.intervals) <= 0:
+				return 0.0
+			return len(self.intervals) / sum(self.intervals)
+
+
+	def get_jitter (self):
+		"""
+			PUBLIC: get_jitter
+			------------------
+			returns the standard deviation of inter-arrival times
+			(secs) over the rolling window
+		"""
+		with self._lock:
+			if len(self.intervals) == 0:
+				return 0.0
+			return float(np.std (self.intervals))
+
+
+	def snapshot (self):
+		"""
+			PUBLIC: snapshot
+			----------------
+			returns all statistics as a dict (times in secs)
+		"""
+		with self._lock:
+			intervals, decode_times, latencies = list(self.intervals), list(self.decode_times), list(self.latencies)
+			num_received, num_lost = self.num_received, self.num_lost
+
+		return 	{
+					'received': num_received,
+					'device_lost': num_lost,
+					'rate': len(intervals) / sum(intervals) if sum(intervals) > 0 else 0.0,
+					'interval_mean': float(np.mean (intervals)) if len(intervals) > 0 else None,
+					'interval_max': max (intervals) if len(intervals) > 0 else None,
+					'jitter': float(np.std (intervals)) if len(intervals) > 0 else None,
+					'decode_mean': float(np.mean (decode_times)) if len(decode_times) > 0 else None,
+					'decode_max': max (decode_times) if len(decode_times) > 0 else None,
+					'latency_mean': float(np.mean (latencies)) if len(latencies) > 0 else None,
+					'latency_max': max (latencies) if len(latencies) > 0 else None
+				}
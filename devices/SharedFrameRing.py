@@ -0,0 +1,168 @@
+#-------------------------------------------------- #
+# Class: SharedFrameRing
+# ----------------------
+# fixed-layout ring buffer of frames in shared
+# memory: written by an ingest process, read in
+# place by the main one. each frame is written
+# twice (position i and i + capacity), so the last
+# 'capacity' frames are always one contiguous slice.
+# a per-slot sequence number (seqlock) tells readers
+# whether a frame was overwritten while they read it.
+#-------------------------------------------------- #
+import ctypes
+import multiprocessing
+import numpy as np
+
+
+statistics_fields = ['received', 'rate', 'jitter', 'decode_mean', 'dropped', 'device_lost'] 	# shared by the writer, see set_statistics
+max_read_attempts = 3 		# re-reads of a slot caught mid-write before giving up
+
+
+class SharedFrameRing:
+	"""
+		Class: SharedFrameRing
+		----------------------
+		create before forking the writer; one writer only.
+		columns maps name -> array of shape (2 * capacity,) + entry
+		shape, backed by shared memory. num_written is published
+		after a frame's data, so readers never see a frame before
+		it is complete; frames older than 'capacity' are
+		overwritten in place. each slot's sequence number is odd
+		while a frame is being written into it and 2 * (frame
+		number + 1) once it is, so read_frame can detect (and
+		is_intact report) frames overwritten under a reader
+	"""
+
+	def __init__ (self, _layout, _capacity=4096):
+		"""
+			PUBLIC: Constructor
+			-------------------
+			given a layout (list of (column name, dtype, entry
+			shape); must include 'timestamp') and the number of
+			frames to keep, allocates the shared arrays
+		"""
+		self.layout 	= _layout
+		self.capacity 	= _capacity
+
+		self._buffers 	= {}
+		self.columns 	= {}
+		for name, dtype, shape in _layout:
+			dtype = np.dtype (dtype)
+			size = 2 * _capacity * int(np.prod (shape)) * dtype.itemsize
+			self._buffers[name] = multiprocessing.RawArray (ctypes.c_char, size)
+			self.columns[name] = np.frombuffer (self._buffers[name], dtype=dtype).reshape ((2 * _capacity,) + tuple(shape))
+
+		self._sequences 	= multiprocessing.RawArray (ctypes.c_ulonglong, _capacity)
+		self._num_written 	= multiprocessing.RawValue (ctypes.c_ulonglong, 0)
+		self._statistics 	= multiprocessing.RawArray (ctypes.c_double, [np.nan] * len(statistics_fields))
+		self._frame_written = multiprocessing.Event ()
+
+
+	def write (self, frame):
+		"""
+			PUBLIC: write
+			-------------
+			(writer) marks the slot as being written, copies the
+			frame's entries into both of its copies, marks it
+			written, then publishes it. missing entries are left nan
+		"""
+		frame_number = self._num_written.value
+		index = frame_number % self.capacity
+		self._sequences[index] = 2 * frame_number + 1
+		for name, column in self.columns.iteritems ():
+			value = frame.get (name, np.nan)
+			column[index] = value
+			column[index + self.capacity] = value
+		self._sequences[index] = 2 * frame_number + 2
+		self._num_written.value = frame_number + 1
+		self._frame_written.set ()
+
+
+	def set_statistics (self, statistics):
+		"""
+			PUBLIC: set_statistics
+			----------------------
+			(writer) publishes the writer's receive-path statistics
+			(those in statistics_fields; missing/None become nan)
+		"""
+		for i, field in enumerate (statistics_fields):
+			value = statistics.get (field)
+			self._statistics[i] = np.nan if value is None else value
+
+
+	def get_num_written (self):
+		"""
+			PUBLIC: get_num_written
+			-----------------------
+			returns the total number of frames written so far
+		"""
+		return self._num_written.value
+
+
+	def get_statistics (self):
+		"""
+			PUBLIC: get_statistics
+			----------------------
+			returns the statistics last published by the writer
+			(nan for those unknown)
+		"""
+		return dict(zip (statistics_fields, self._statistics[:]))
+
+
+	def is_intact (self, frame_number):
+		"""
+			PUBLIC: is_intact
+			-----------------
+			returns true if the frame's slot still holds it, i.e. the
+			writer hasn't started overwriting it
+		"""
+		return self._sequences[frame_number % self.capacity] == 2 * frame_number + 2
+
+
+	def read_frame (self, frame_number):
+		"""
+			PUBLIC: read_frame
+			------------------
+			returns a copy of the given (published) frame as a dict,
+			or None if it has been overwritten. the slot's sequence
+			number is checked before and after copying; a mismatch
+			means the copy may be torn, so it is read again
+		"""
+		index = frame_number % self.capacity
+		expected = 2 * frame_number + 2
+		for attempt in range (max_read_attempts):
+			if self._sequences[index] > expected:
+				return None
+			frame = {name: column[index].copy () if column.ndim > 1 else column[index] for name, column in self.columns.iteritems ()}
+			if self._sequences[index] == expected:
+				return frame
+		return None
+
+
+	def get_live_range (self, num_dropped=0):
+		"""
+			PUBLIC: get_live_range
+			----------------------
+			returns (start, end, num_written): columns[start:end]
+			holds every frame still in the ring that comes after the
+			first num_dropped, oldest first. the oldest slot is left
+			out, as the writer overwrites it next
+		"""
+		num_written = self.get_num_written ()
+		if num_written == 0:
+			return 0, 0, 0
+		num_live = min (num_written - num_dropped, self.capacity - 1)
+		end = (num_written - 1) % self.capacity + self.capacity + 1
+		return end - max (num_live, 0), end, num_written
+
+
+	def wait (self, timeout=None):
+		"""
+			PUBLIC: wait
+			------------
+			(single reader) blocks until a frame is written after the
+			last call, or timeout secs pass; returns true if one was
+		"""
+		written = self._frame_written.wait (timeout)
+		self._frame_written.clear ()
+		return bool(written)
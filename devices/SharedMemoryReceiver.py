@@ -0,0 +1,190 @@
+#-------------------------------------------------- #
+# Class: SharedMemoryReceiver
+# ---------------------------
+# runs a DeviceReceiver in a separate process, which
+# writes decoded frames into a SharedFrameRing; the
+# main process reads them in place. ingest then
+# keeps pace no matter how busy (or GIL-bound) the
+# main process's analytics are.
+#-------------------------------------------------- #
+import multiprocessing
+import threading
+import numpy as np
+from ..motion_sequence.RingFrameBuffer import RingFrameBuffer
+from .parameters import *
+from .FrameDecoder import get_decoder
+from .SharedFrameRing import SharedFrameRing
+
+
+# Function: ingest
+# ----------------
+# body of the ingest process: receives frames for device_name and
+# writes each into ring until stop_event is set
+def ingest (device_name, transport_profile, ring, stop_event, poll_timeout):
+
+	from .DeviceReceiver import DeviceReceiver
+	receiver = DeviceReceiver (device_name, _transport_profile=transport_profile)
+	while not stop_event.is_set ():
+		for frame in receiver.get_frames (timeout=poll_timeout):
+			ring.write (frame)
+		ring.set_statistics (receiver.get_statistics ())
+	receiver.stop ()
+	receiver.join ()
+
+
+class SharedMemoryReceiver:
+	"""
+		Class: SharedMemoryReceiver
+		---------------------------
+		stands in for a DeviceReceiver. given one, a single-device
+		RealTimeMotionSequence reads straight out of the shared
+		ring (see RingFrameBuffer), without copying frames; with
+		several devices, get_frames copies them out as usual.
+		only devices whose decoder has a fixed layout are supported
+	"""
+	poll_timeout = 0.1 		# secs; bounds how long stop () takes
+
+
+	def __init__ (self, _device_name, _transport_profile='default', _capacity=4096):
+		"""
+			PUBLIC: Constructor
+			-------------------
+			given device name, allocates a ring of _capacity frames
+			and starts the ingest process
+		"""
+		#=====[ Step 1: frame layout, from the device's decoder	]=====
+		self.device_name = _device_name
+		self.decoder = get_decoder (_device_name)
+		if self.decoder.layout is None:
+			raise TypeError ("Device has no fixed frame layout: " + _device_name)
+		layout = [('timestamp', 'float64', ())] + self.decoder.layout
+
+		#=====[ Step 2: shared ring, reader state	]=====
+		self.ring = SharedFrameRing (layout, _capacity)
+		self.frame_buffer = RingFrameBuffer (self.ring)
+		self._pending = []
+		self.num_dropped = 0
+		self._listeners = []
+		self._notifier = None
+
+		#=====[ Step 3: start ingest process	]=====
+		self._stop = multiprocessing.Event ()
+		self.process = multiprocessing.Process (target=ingest, args=(_device_name, _transport_profile, self.ring, self._stop, self.poll_timeout))
+		self.process.daemon = True
+		self.process.start ()
+
+
+	def stop (self):
+		"""
+			PUBLIC: stop
+			------------
+			stops and joins the ingest process
+		"""
+		self._stop.set ()
+		self.process.join ()
+
+
+	def make_frame_buffer (self):
+		"""
+			PUBLIC: make_frame_buffer
+			-------------------------
+			returns a new RingFrameBuffer over the shared ring, for
+			a reader that tracks its own position
+		"""
+		return RingFrameBuffer (self.ring)
+
+
+	def wait (self, timeout=None):
+		"""
+			PUBLIC: wait
+			------------
+			blocks until the ingest process writes a frame, or timeout
+			secs pass. single reader: don't mix with add_listener
+		"""
+		return self.ring.wait (timeout)
+
+
+	def get_frames (self, block=True, timeout=None):
+		"""
+			PUBLIC: get_frames
+			------------------
+			returns (copies of) every frame written since the last
+			call, oldest first; empty list if there are none. frames
+			the ring overwrote before they could be copied (more than
+			its capacity arrived between calls) count in num_dropped
+		"""
+		num_new = self.frame_buffer.refresh ()
+		if num_new == 0 and block and not self._notifier and self.wait (timeout):
+			num_new = self.frame_buffer.refresh ()
+
+		#=====[ Step 1: frames overwritten before this call	]=====
+		num_available = min (num_new, len(self.frame_buffer))
+		self.num_dropped += num_new - num_available
+
+		#=====[ Step 2: copy the rest, checking each for overwrites	]=====
+		frames = self._pending
+		first = self.frame_buffer.get_num_dropped () + len(self.frame_buffer) - num_available
+		for frame_number in range (first, first + num_available):
+			frame = self.ring.read_frame (frame_number)
+			if frame is None:
+				self.num_dropped += 1
+			else:
+				frames.append (frame)
+		self._pending = []
+		self.frame_buffer.drop_front (len(self.frame_buffer))
+		return frames
+
+
+	def get_frame (self, block=True, timeout=None):
+		"""
+			PUBLIC: get_frame
+			-----------------
+			like get_frames, but returns them one at a time; None if
+			there are none
+		"""
+		if len(self._pending) == 0:
+			self._pending = self.get_frames (block, timeout)
+		if len(self._pending) == 0:
+			return None
+		return self._pending.pop (0)
+
+
+	def add_listener (self, event):
+		"""
+			PUBLIC: add_listener
+			--------------------
+			registers a threading.Event to be set whenever a frame is
+			written; starts a thread that waits on the ring for them
+		"""
+		self._listeners.append (event)
+		if self._notifier is None:
+			self._notifier = threading.Thread (target=self.notify_listeners)
+			self._notifier.daemon = True
+			self._notifier.start ()
+
+
+	def notify_listeners (self):
+		"""
+			PRIVATE: notify_listeners
+			-------------------------
+			body of the notifier thread
+		"""
+		while not self._stop.is_set ():
+			if self.wait (self.poll_timeout):
+				for listener in self._listeners:
+					listener.set ()
+
+
+	def get_statistics (self):
+		"""
+			PUBLIC: get_statistics
+			----------------------
+			returns the ingest process's receive-path statistics
+			(frames received, rate, jitter, average decode time,
+			frames lost by the device); dropped adds the frames the
+			ring overwrote before get_frames copied them
+		"""
+		statistics = self.ring.get_statistics ()
+		statistics['device'] = self.device_name
+		statistics['dropped'] = np.nan_to_num (statistics['dropped']) + self.num_dropped
+		return statistics
@@ -1,9 +1,29 @@
 connect_parameters = {
 	'connect_address':"tcp://localhost:5555",
+	'bind_address':"tcp://*:5555",
 	'none_substitutes':set(['1.17549435e-38', 1.17549435e-38])
 }
 device_filters = { 
 					'primesense':'__primesense__',
 					'leap':'__leap__',
 					'eyetribe':'__eyetribe__'
-}
\ No newline at end of file
+}
+queue_parameters = {
+	'policy':'conflate',
+	'max_frames':64
+}
+transport_profiles = {
+	'default':{'socket_options':{}, 'queue_policy':queue_parameters['policy'], 'max_frames':queue_parameters['max_frames']},
+	'latest-only':{'socket_options':{'CONFLATE':1, 'RCVHWM':1}, 'queue_policy':'conflate', 'max_frames':1},
+	'lossless':{'socket_options':{'RCVHWM':100000}, 'queue_policy':'block', 'max_frames':4096}
+}
+device_fields = {
+					'leap':['palm_x', 'palm_y', 'palm_z', 'pitch', 'roll', 'yaw', 'hand_sphere_radius', 'fingers', 'hands'],
+					'eyetribe':['avg_x', 'avg_y', 'left_psize', 'right_psize', 'fix']
+}
+sequence_field = 'sequence' 		# JSON payload field with the device's own frame counter, if it sends one
+
+# devices whose senders emit the binary (NIB1) wire format; their
+# decoders reject JSON, which costs several times more to decode per
+# message. add a device here once its bridge sends binary
+binary_wire_devices = set([])
@@ -0,0 +1,125 @@
+#-------------------------------------------------- #
+# File: skeleton.py
+# -----------------
+# canonical skeleton representation: per frame, a
+# joints x 3 float32 array of positions and a
+# joints x 4 float32 array of orientations
+# (quaternions), indexed by the joint table below.
+#-------------------------------------------------- #
+import numpy as np
+from .parameters import connect_parameters
+
+
+#==========[ Joint table	]==========
+joint_names = 	[
+					'JOINT_HEAD',
+					'JOINT_NECK',
+					'JOINT_TORSO',
+					'JOINT_LEFT_SHOULDER',
+					'JOINT_LEFT_ELBOW',
+					'JOINT_LEFT_HAND',
+					'JOINT_RIGHT_SHOULDER',
+					'JOINT_RIGHT_ELBOW',
+					'JOINT_RIGHT_HAND',
+					'JOINT_LEFT_HIP',
+					'JOINT_LEFT_KNEE',
+					'JOINT_LEFT_FOOT',
+					'JOINT_RIGHT_HIP',
+					'JOINT_RIGHT_KNEE',
+					'JOINT_RIGHT_FOOT'
+				]
+joint_index = {name: index for index, name in enumerate (joint_names)}
+num_joints 	= len(joint_names)
+
+position_axes 		= ('x', 'y', 'z')
+orientation_axes 	= ('x', 'y', 'z', 'w')
+
+#==========[ Frame/buffer column names	]==========
+positions_column 	= 'skeleton_positions'
+orientations_column = 'skeleton_orientations'
+
+sentinel_value = float(list(connect_parameters['none_substitutes'])[0])
+
+
+# Function: empty_skeleton
+# ------------------------
+# returns (positions, orientations) for num_frames frames, all nan;
+# num_frames=None gives a single frame (joints x axes)
+def empty_skeleton (num_frames=None):
+
+	leading = () if num_frames is None else (num_frames,)
+	positions 		= np.full (leading + (num_joints, len(position_axes)), np.nan, dtype=np.float32)
+	orientations 	= np.full (leading + (num_joints, len(orientation_axes)), np.nan, dtype=np.float32)
+	return positions, orientations
+
+
+# Function: get_coordinate
+# ------------------------
+# reads one axis out of a legacy {'x','y','z'(,'w')} coordinate dict
+def get_coordinate (coords, axis):
+
+	if coords is None or coords.get (axis) is None:
+		return np.nan
+	return coords[axis]
+
+
+# Function: dataframe_to_skeleton
+# -------------------------------
+# given a dataframe holding skeleton data either as legacy object
+# columns (JOINT_HEAD_POSITION -> coordinate dict) or flat columns
+# (JOINT_HEAD_POSITION_x, ...), returns (positions, orientations,
+# names of the columns they came from); None if there are none
+def dataframe_to_skeleton (df):
+
+	positions, orientations = empty_skeleton (len(df))
+	source_columns = []
+	for j, joint_name in enumerate (joint_names):
+		for kind, array, axes in [('POSITION', positions, position_axes), ('ORIENTATION', orientations, orientation_axes)]:
+
+			legacy_column = joint_name + '_' + kind
+			if legacy_column in df.columns:
+				source_columns.append (legacy_column)
+				for a, axis in enumerate (axes):
+					array[:, j, a] = [get_coordinate (c, axis) for c in df[legacy_column]]
+				continue
+
+			for a, axis in enumerate (axes):
+				flat_column = legacy_column + '_' + axis
+				if flat_column in df.columns:
+					source_columns.append (flat_column)
+					array[:, j, a] = df[flat_column].values
+
+	if len(source_columns) == 0:
+		return None
+	return positions, orientations, source_columns
+
+
+# Function: flat_column_labels
+# ----------------------------
+# given the name of a multi-dimensional column and the shape of one
+# of its entries, returns names for each of its scalar components
+def flat_column_labels (name, shape):
+
+	if name == positions_column:
+		return [j + '_POSITION_' + a for j in joint_names for a in position_axes]
+	if name == orientations_column:
+		return [j + '_ORIENTATION_' + a for j in joint_names for a in orientation_axes]
+	return [name + '_' + str(i) for i in range(int(np.prod (shape)))]
+
+
+# Function: flatten_columns
+# -------------------------
+# given a dict Map: column name -> array (frames first), returns the
+# same with every multi-dimensional column split into scalar columns
+# (views; nothing is copied)
+def flatten_columns (columns):
+
+	flat_columns = {}
+	for name, column in columns.iteritems ():
+		if column.ndim == 1:
+			flat_columns[name] = column
+			continue
+		flat = column.reshape (len(column), -1)
+		for i, label in enumerate (flat_column_labels (name, column.shape[1:])):
+			flat_columns[label] = flat[:, i]
+	return flat_columns
@@ -0,0 +1,44 @@
+#-------------------------------------------------- #
+# File: transport.py
+# ------------------
+# ZeroMQ socket setup per transport profile (see
+# transport_profiles in parameters.py):
+# - latest-only: CONFLATE, RCVHWM=1; stale frames
+#	are never delivered (cursor control, poses)
+# - lossless: large RCVHWM, blocking frame queue
+#	(recording)
+#-------------------------------------------------- #
+import zmq
+from .parameters import *
+
+
+# Function: get_transport_profile
+# -------------------------------
+# returns the named transport profile; raises TypeError if unknown
+def get_transport_profile (profile_name):
+
+	if not profile_name in transport_profiles:
+		raise TypeError ("Transport profile not supported: " + str(profile_name))
+	return transport_profiles[profile_name]
+
+
+# Function: is_conflating
+# -----------------------
+# returns true if the profile's sockets keep only the latest message;
+# such a socket can carry only a single device's subscription
+def is_conflating (profile_name):
+
+	return get_transport_profile (profile_name)['socket_options'].get ('CONFLATE', 0) == 1
+
+
+# Function: open_sub_socket
+# -------------------------
+# returns a SUB socket in 'context', configured per the named profile
+# and connected to 'address' (options have to be set before connecting)
+def open_sub_socket (context, address, profile_name):
+
+	socket = context.socket (zmq.SUB)
+	for option, value in get_transport_profile (profile_name)['socket_options'].iteritems ():
+		socket.setsockopt (getattr (zmq, option), value)
+	socket.connect (address)
+	return socket
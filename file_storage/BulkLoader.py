@@ -0,0 +1,152 @@
+#-------------------------------------------------- #
+# Class: BulkLoader
+# -----------------
+# loads many recordings concurrently on a pool of
+# worker threads, streaming them back as they finish
+# and keeping track of throughput. pickled
+# recordings are opened on a pool of processes.
+#-------------------------------------------------- #
+import threading
+import multiprocessing
+from multiprocessing.pool import ThreadPool
+from ..threads.clock import monotonic
+from .RecordingCatalog import get_file_stats, open_frame_buffer
+
+
+# Function: timed_load
+# --------------------
+# worker body: loads filepath with load_function, returns
+# (filepath, loaded recording, size in bytes). given a process
+# pool, the file is opened there and load_function is handed
+# the resulting FrameBuffer as well
+def timed_load (load_function, filepath, process_pool=None):
+
+	if process_pool is None:
+		recording = load_function (filepath)
+	else:
+		recording = load_function (filepath, process_pool.apply (open_frame_buffer, (filepath,)))
+	return filepath, recording, get_file_stats (filepath)[0]
+
+
+class BulkLoader:
+	"""
+		Class: BulkLoader
+		-----------------
+		load_function turns a filepath into a recording (e.g.
+		load_motion_sequence). iter_load yields recordings in the
+		order they finish; load returns them in the order asked for.
+		file reads, zlib and memory-mapped columns release the GIL,
+		so those formats overlap on threads; unpickling holds it.
+		given _use_processes (filepath -> bool, e.g. true for
+		uncached pickles), those files are opened on a process pool
+		instead and load_function is called as (filepath,
+		frame_buffer). both pools are created on first use and
+		reused by every call until close ()
+	"""
+
+	def __init__ (self, _load_function, _num_workers=8, _use_processes=None):
+		"""
+			PUBLIC: Constructor
+			-------------------
+			given a load function, the number of workers (threads,
+			and processes if needed) and which files need a process
+		"""
+		self.load_function 	= _load_function
+		self.num_workers 	= _num_workers
+		self.use_processes 	= _use_processes
+		self.thread_pool 	= None
+		self.process_pool 	= None
+		self._lock 			= threading.Lock ()
+
+		self.num_files 		= 0
+		self.num_bytes 		= 0
+		self.load_secs 		= 0.0
+
+
+	def get_pools (self, need_processes):
+		"""
+			PRIVATE: get_pools
+			------------------
+			returns (thread pool, process pool or None), creating
+			them the first time they're needed
+		"""
+		with self._lock:
+			if self.thread_pool is None:
+				self.thread_pool = ThreadPool (self.num_workers)
+			if need_processes and self.process_pool is None:
+				self.process_pool = multiprocessing.Pool (self.num_workers)
+			return self.thread_pool, self.process_pool
+
+
+	def iter_load (self, filepaths, ordered=False):
+		"""
+			PUBLIC: iter_load
+			-----------------
+			yields (filepath, recording) for every filepath as soon as
+			it is loaded (in filepaths' order if ordered). files still
+			loading when iteration stops early finish in the background
+		"""
+		if len(filepaths) == 0:
+			return
+		in_process = set([f for f in filepaths if self.use_processes and self.use_processes (f)])
+		thread_pool, process_pool = self.get_pools (len(in_process) > 0)
+		map_function = thread_pool.imap if ordered else thread_pool.imap_unordered
+		start, previous_secs = monotonic (), self.load_secs
+		for filepath, recording, num_bytes in map_function (lambda f: timed_load (self.load_function, f, process_pool if f in in_process else None), filepaths):
+			self.num_files += 1
+			self.num_bytes += num_bytes
+			self.load_secs = previous_secs + monotonic () - start
+			yield filepath, recording
+
+
+	def load (self, filepaths):
+		"""
+			PUBLIC: load
+			------------
+			returns the recordings at filepaths, as a list in the
+			same order
+		"""
+		return [recording for filepath, recording in self.iter_load (filepaths, ordered=True)]
+
+
+	def load_dict (self, filepaths_dict):
+		"""
+			PUBLIC: load_dict
+			-----------------
+			given Map: label -> list of filepaths, returns Map: label ->
+			list of recordings (same order), loading all of them on
+			the one pool
+		"""
+		labels = {f: label for label, filepaths in filepaths_dict.iteritems () for f in filepaths}
+		recordings = dict(self.iter_load (labels.keys ()))
+		return {label: [recordings[f] for f in filepaths] for label, filepaths in filepaths_dict.iteritems ()}
+
+
+	def close (self):
+		"""
+			PUBLIC: close
+			-------------
+			shuts down the worker pools; later loads start new ones
+		"""
+		with self._lock:
+			for pool in [self.thread_pool, self.process_pool]:
+				if not pool is None:
+					pool.terminate ()
+					pool.join ()
+			self.thread_pool, self.process_pool = None, None
+
+
+	def get_stats (self):
+		"""
+			PUBLIC: get_stats
+			-----------------
+			returns files/bytes loaded so far, time spent loading
+			(wall clock) and throughput in files/s and MB/s
+		"""
+		return 	{
+					'files': self.num_files,
+					'bytes': self.num_bytes,
+					'secs': self.load_secs,
+					'files_per_sec': self.num_files / self.load_secs if self.load_secs > 0 else 0.0,
+					'mb_per_sec': self.num_bytes / 1000000.0 / self.load_secs if self.load_secs > 0 else 0.0
+				}
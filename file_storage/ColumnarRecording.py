@@ -0,0 +1,152 @@
+#-------------------------------------------------- #
+# File: ColumnarRecording
+# -----------------------
+# columnar on-disk recordings: a directory holding
+# one raw typed array per column plus header.json
+# (schema, devices, rate). loading memory-maps the
+# columns, so opening a recording reads only the
+# header; data is paged in as it is used.
+#-------------------------------------------------- #
+import os
+import json
+import pickle
+import numpy as np
+from ..motion_sequence.FrameBuffer import FrameBuffer
+from ..devices.parameters import device_fields
+from ..devices import skeleton
+
+
+format_version 		= 1
+recording_extension = '.recording'
+header_filename 	= 'header.json'
+objects_filename 	= 'objects.pickle' 	# columns with no fixed type, pickled
+
+
+# Function: is_columnar_recording
+# -------------------------------
+# returns true if path is a columnar recording directory
+def is_columnar_recording (path):
+
+	return os.path.isdir (path) and os.path.exists (os.path.join (path, header_filename))
+
+
+# Function: infer_devices
+# -----------------------
+# given column names, returns the devices they came from (by their
+# fields)
+def infer_devices (column_names):
+
+	devices = set([d for d, fields in device_fields.items () if any ([f in column_names for f in fields])])
+	if skeleton.positions_column in column_names:
+		devices.add ('primesense')
+	return sorted (devices)
+
+
+# Function: infer_frame_rate
+# --------------------------
+# given timestamps (usec), returns the median frame rate (Hz)
+def infer_frame_rate (timestamps):
+
+	if len(timestamps) < 2:
+		return None
+	return 1000000.0 / float(np.median (np.diff (timestamps)))
+
+
+# Function: get_column_filename
+# -----------------------------
+# returns the name of the file holding column 'index'
+def get_column_filename (index):
+
+	return 'column_' + str(index) + '.bin'
+
+
+# Function: save_columnar
+# -----------------------
+# given a FrameBuffer, writes it as a columnar recording at 'path'
+# (a directory, created if needed); returns the header
+def save_columnar (frame_buffer, path, devices=None, frame_rate=None):
+
+	if not os.path.isdir (path):
+		os.makedirs (path)
+
+	timestamps = frame_buffer.get_timestamps ()
+	header = 	{
+					'version': format_version,
+					'num_frames': len(frame_buffer),
+					'frame_rate': frame_rate or infer_frame_rate (timestamps),
+					'devices': devices or infer_devices (frame_buffer.get_column_names ()),
+					'columns': []
+				}
+
+	#=====[ Step 1: typed columns, one raw file each	]=====
+	objects = {}
+	columns = [('timestamp', timestamps)] + [(name, frame_buffer.get_column (name)) for name in frame_buffer.get_column_names ()]
+	for index, (name, column) in enumerate (columns):
+		if column.dtype == object:
+			objects[name] = list(column)
+			continue
+		filename = get_column_filename (index)
+		np.ascontiguousarray (column).tofile (os.path.join (path, filename))
+		header['columns'].append ({'name': name, 'dtype': column.dtype.str, 'shape': list(column.shape[1:]), 'file': filename})
+
+	#=====[ Step 2: untyped columns, header	]=====
+	if len(objects) > 0:
+		pickle.dump (objects, open (os.path.join (path, objects_filename), 'wb'))
+		header['object_columns'] = sorted (objects.keys ())
+	json.dump (header, open (os.path.join (path, header_filename), 'w'), indent=1)
+	return header
+
+
+# Function: load_header
+# ---------------------
+# returns the header of the columnar recording at 'path'
+def load_header (path):
+
+	return json.load (open (os.path.join (path, header_filename), 'r'))
+
+
+# Function: load_columnar
+# -----------------------
+# opens the columnar recording at 'path' as a FrameBuffer of
+# read-only memory-mapped columns. start_time/end_time (usec) limit
+# it to that time range, without reading anything outside it
+def load_columnar (path, start_time=None, end_time=None):
+
+	header = load_header (path)
+	num_frames = header['num_frames']
+
+	#=====[ Step 1: map every typed column	]=====
+	columns = {}
+	for column in header['columns']:
+		shape = (num_frames,) + tuple(column['shape'])
+		if num_frames == 0:
+			columns[column['name']] = np.empty (shape, dtype=np.dtype (column['dtype']))
+		else:
+			columns[column['name']] = np.memmap (os.path.join (path, column['file']), dtype=np.dtype (column['dtype']), mode='r', shape=shape)
+	if len(header.get ('object_columns', [])) > 0:
+		objects = pickle.load (open (os.path.join (path, objects_filename), 'rb'))
+		for name, values in objects.iteritems ():
+			columns[name] = np.array (values + [None], dtype=object)[:-1]
+
+	#=====[ Step 2: restrict to the time range	]=====
+	timestamps = columns.pop ('timestamp')
+	start = 0 if start_time is None else int(np.searchsorted (timestamps, start_time, side='left'))
+	end = num_frames if end_time is None else int(np.searchsorted (timestamps, end_time, side='right'))
+	columns = {name: column[start:end] for name, column in columns.iteritems ()}
+
+	column_order = [c['name'] for c in header['columns'] if c['name'] != 'timestamp'] + header.get ('object_columns', [])
+	return FrameBuffer.from_arrays (timestamps[start:end], columns, column_order)
+
+
+# Function: convert_pickled_recording
+# -----------------------------------
+# one-shot converter: given the path to a pickled dataframe recording,
+# writes it as a columnar recording at out_path (default: same name,
+# recording_extension); returns out_path
+def convert_pickled_recording (pickle_path, out_path=None):
+
+	if out_path is None:
+		out_path = os.path.splitext (pickle_path)[0] + recording_extension
+	dataframe = pickle.load (open (pickle_path, 'rb'))
+	save_columnar (FrameBuffer.from_dataframe (dataframe), out_path)
+	return out_path
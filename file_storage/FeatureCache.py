@@ -0,0 +1,211 @@
+# ------------------------------------------------------------ #
+# Class: FeatureCache
+# -------------------
+# persistent, content-addressed cache of extracted features:
+# keyed by a hash of the recording's contents plus the
+# extractor's class, parameters, version and source, so
+# retraining skips extraction for anything already seen
+# ------------------------------------------------------------ #
+import hashlib
+import inspect
+import pickle
+import sqlite3
+import threading
+import numpy as np
+
+
+cache_schema = 	[
+					'''CREATE TABLE IF NOT EXISTS features (
+						key TEXT PRIMARY KEY,
+						extractor TEXT,
+						extractor_id TEXT,
+						value BLOB
+					)''',
+					'''CREATE INDEX IF NOT EXISTS features_by_extractor ON features (extractor, extractor_id)'''
+				]
+max_batch_keys = 500 		# keys per bulk query (sqlite caps bound parameters)
+
+
+# Function: get_recording_hash
+# ----------------------------
+# returns a sha1 of a recording's (dataframe's) contents: column
+# names and values, in column order
+def get_recording_hash (dataframe):
+
+	sha1 = hashlib.sha1 ()
+	for name in dataframe.columns:
+		values = dataframe[name].values
+		sha1.update (str(name))
+		if values.dtype == object:
+			sha1.update (pickle.dumps (list(values), pickle.HIGHEST_PROTOCOL))
+		else:
+			sha1.update (values.dtype.str)
+			sha1.update (np.ascontiguousarray (values).view (np.uint8))
+	return sha1.hexdigest ()
+
+
+# Function: get_extractor_name
+# ----------------------------
+# returns the full name (module.class) of an extractor
+def get_extractor_name (feature_extractor):
+
+	return feature_extractor.__class__.__module__ + '.' + feature_extractor.__class__.__name__
+
+
+# Function: get_extractor_id
+# --------------------------
+# returns a hash identifying what an extractor computes: its name,
+# feature_version, cache params and the source of its module, so
+# editing the extraction code invalidates what it produced
+def get_extractor_id (feature_extractor):
+
+	sha1 = hashlib.sha1 ()
+	sha1.update (get_extractor_name (feature_extractor))
+	sha1.update (str(getattr (feature_extractor, 'feature_version', 0)))
+	sha1.update (repr(sorted (feature_extractor.get_cache_params ().items ())))
+	source_file = inspect.getsourcefile (feature_extractor.__class__)
+	if not source_file is None:
+		with open (source_file, 'rb') as f:
+			sha1.update (f.read ())
+	return sha1.hexdigest ()
+
+
+class FeatureCache:
+	"""
+		Class: FeatureCache
+		-------------------
+		SQLite table Map: key -> pickled features, where key combines
+		the recording's hash and the extractor's id. entries left
+		behind by an earlier id of the same extractor are deleted the
+		first time the new one is used. extractors whose cacheable
+		is False (e.g. those trained on the data) bypass the cache
+	"""
+
+	def __init__ (self, _db_path):
+		"""
+			PUBLIC: Constructor
+			-------------------
+			opens (creating if needed) the cache at _db_path
+		"""
+		self.db_path 	= _db_path
+		self.connection = sqlite3.connect (_db_path, check_same_thread=False)
+		self._lock 		= threading.Lock ()
+		self.checked_ids = set([])
+		with self._lock, self.connection:
+			for statement in cache_schema:
+				self.connection.execute (statement)
+
+		self.stats 		= {'hits': 0, 'misses': 0, 'invalidated': 0}
+
+
+	def extract_all (self, feature_extractor, dataframes):
+		"""
+			PUBLIC: extract_all
+			-------------------
+			returns feature_extractor.extract (df) for each of dataframes,
+			in order; cached features are read in one pass, the rest
+			extracted and written back in one transaction
+		"""
+		if not getattr (feature_extractor, 'cacheable', False):
+			return [feature_extractor.extract (df) for df in dataframes]
+
+		#=====[ Step 1: keys, bulk read	]=====
+		extractor_id = self.check_extractor (feature_extractor)
+		keys = [extractor_id + ':' + get_recording_hash (df) for df in dataframes]
+		cached = self.get_many (keys)
+
+		#=====[ Step 2: extract misses, bulk write	]=====
+		missing = {}
+		for key, df in zip (keys, dataframes):
+			if not key in cached and not key in missing:
+				missing[key] = feature_extractor.extract (df)
+		self.put_many (get_extractor_name (feature_extractor), extractor_id, missing)
+
+		self.stats['hits'] += len(keys) - len(missing)
+		self.stats['misses'] += len(missing)
+		cached.update (missing)
+		return [cached[key] for key in keys]
+
+
+	def extract_dict (self, feature_extractor, dataframes_dict):
+		"""
+			PUBLIC: extract_dict
+			--------------------
+			given Map: label -> list of dataframes, returns Map: label ->
+			list of their features, in one bulk read/write
+		"""
+		labels = [(label, len(dfs)) for label, dfs in dataframes_dict.items ()]
+		features = self.extract_all (feature_extractor, [df for label, dfs in dataframes_dict.items () for df in dfs])
+		features_dict, start = {}, 0
+		for label, num_dfs in labels:
+			features_dict[label] = features[start:start + num_dfs]
+			start += num_dfs
+		return features_dict
+
+
+	def check_extractor (self, feature_extractor):
+		"""
+			PRIVATE: check_extractor
+			------------------------
+			returns the extractor's id; the first time it's seen, drops
+			entries from any other version of the same extractor
+		"""
+		extractor_id = get_extractor_id (feature_extractor)
+		if not extractor_id in self.checked_ids:
+			with self._lock, self.connection:
+				cursor = self.connection.execute ('DELETE FROM features WHERE extractor = ? AND extractor_id != ?', (get_extractor_name (feature_extractor), extractor_id))
+				self.stats['invalidated'] += cursor.rowcount
+			self.checked_ids.add (extractor_id)
+		return extractor_id
+
+
+	def get_many (self, keys):
+		"""
+			PRIVATE: get_many
+			-----------------
+			returns Map: key -> features for those of keys cached
+		"""
+		found = {}
+		with self._lock:
+			for start in range (0, len(keys), max_batch_keys):
+				batch = keys[start:start + max_batch_keys]
+				rows = self.connection.execute ('SELECT key, value FROM features WHERE key IN (' + ', '.join (['?'] * len(batch)) + ')', batch).fetchall ()
+				found.update ({key: pickle.loads (str(value)) for key, value in rows})
+		return found
+
+
+	def put_many (self, extractor_name, extractor_id, features):
+		"""
+			PRIVATE: put_many
+			-----------------
+			given Map: key -> features, writes them all in one transaction
+		"""
+		if len(features) == 0:
+			return
+		rows = [(key, extractor_name, extractor_id, sqlite3.Binary (pickle.dumps (value, pickle.HIGHEST_PROTOCOL))) for key, value in features.iteritems ()]
+		with self._lock, self.connection:
+			self.connection.executemany ('INSERT OR REPLACE INTO features (key, extractor, extractor_id, value) VALUES (?, ?, ?, ?)', rows)
+
+
+	def clear (self):
+		"""
+			PUBLIC: clear
+			-------------
+			drops every entry
+		"""
+		with self._lock, self.connection:
+			self.connection.execute ('DELETE FROM features')
+		self.checked_ids = set([])
+
+
+	def get_stats (self):
+		"""
+			PUBLIC: get_stats
+			-----------------
+			returns hits, misses and entries invalidated so far, and the
+			number of entries stored
+		"""
+		stats = dict(self.stats)
+		with self._lock:
+			stats['entries'] = self.connection.execute ('SELECT COUNT(*) FROM features').fetchone ()[0]
+		return stats
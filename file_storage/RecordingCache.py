@@ -0,0 +1,218 @@
+#-------------------------------------------------- #
+# Class: RecordingCache
+# ---------------------
+# in-process LRU cache of loaded recordings, bounded
+# by a memory budget; an entry is reloaded as soon
+# as its file's size or mtime changes.
+#-------------------------------------------------- #
+import mmap
+import threading
+import numpy as np
+from collections import OrderedDict
+from ..motion_sequence.FrameBuffer import FrameBuffer
+from ..motion_sequence.MotionSequence import PlayBackMotionSequence
+from ..motion_sequence.MotionSequenceWindow import read_only_view
+from .RecordingCatalog import get_file_stats, open_frame_buffer
+
+
+# Function: is_memory_mapped
+# --------------------------
+# returns true if array is (a view of) a memory-mapped file
+def is_memory_mapped (array):
+
+	while not array is None:
+		if isinstance (array, (np.memmap, mmap.mmap)):
+			return True
+		array = getattr (array, 'base', None)
+	return False
+
+
+# Function: get_buffer_bytes
+# --------------------------
+# returns (bytes held in memory, bytes memory-mapped) by a FrameBuffer's
+# live region (object columns count their references only). mapped
+# pages belong to the OS page cache, so only the first counts against
+# the cache's budget
+def get_buffer_bytes (frame_buffer):
+
+	in_memory, mapped = 0, 0
+	for array in [frame_buffer.get_timestamps ()] + [frame_buffer.get_column (name) for name in frame_buffer.get_column_names ()]:
+		if is_memory_mapped (array):
+			mapped += array.nbytes
+		else:
+			in_memory += array.nbytes
+	return in_memory, mapped
+
+
+# Function: make_view
+# -------------------
+# returns a new FrameBuffer over read-only views of frame_buffer's
+# arrays; trimming or appending to it leaves the original as is, and
+# nothing written through it can reach the original
+def make_view (frame_buffer):
+
+	column_names = frame_buffer.get_column_names ()
+	columns = {name: read_only_view (frame_buffer.get_column (name)) for name in column_names}
+	return FrameBuffer.from_arrays (read_only_view (frame_buffer.get_timestamps ()), columns, column_names)
+
+
+class RecordingCache:
+	"""
+		Class: RecordingCache
+		---------------------
+		Map: filepath -> (file stats, FrameBuffer), least recently
+		used first. only arrays held in memory count against the
+		budget; memory-mapped columns are tracked separately (see
+		get_stats). every get checks the file's (size, mtime) and
+		reloads on a change. cached frames are held as read-only
+		views; callers get further views of them, each in a fresh
+		PlayBackMotionSequence, so playback state is never shared
+	"""
+
+	def __init__ (self, _max_bytes=256*1024*1024):
+		"""
+			PUBLIC: Constructor
+			-------------------
+			given the memory budget for cached frames, in bytes
+		"""
+		self.max_bytes 		= _max_bytes
+		self.entries 		= OrderedDict ()
+		self.num_bytes 		= 0
+		self.num_mapped_bytes = 0
+		self._lock 			= threading.Lock ()
+
+		self.stats 			= {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+
+	def contains (self, filepath):
+		"""
+			PUBLIC: contains
+			----------------
+			returns true if filepath is cached and unchanged since
+		"""
+		file_stats = get_file_stats (filepath)
+		with self._lock:
+			return filepath in self.entries and self.entries[filepath][0] == file_stats
+
+
+	def get_frame_buffer (self, filepath, opened=None):
+		"""
+			PUBLIC: get_frame_buffer
+			------------------------
+			returns a view of the recording at filepath's frames,
+			loading them if they aren't cached or the file changed.
+			given opened (its frames, already read elsewhere, e.g. by
+			a BulkLoader's process), a miss uses them instead
+		"""
+		#=====[ Step 1: hit if cached and unchanged	]=====
+		file_stats = get_file_stats (filepath)
+		with self._lock:
+			entry = self.entries.pop (filepath, None)
+			if not entry is None:
+				if entry[0] == file_stats:
+					self.entries[filepath] = entry
+					self.stats['hits'] += 1
+					return make_view (entry[1])
+				self.forget (entry)
+				self.stats['invalidations'] += 1
+			self.stats['misses'] += 1
+
+		#=====[ Step 2: miss - load (unlocked), then insert and evict	]=====
+		frame_buffer = make_view (opened if not opened is None else open_frame_buffer (filepath))
+		num_bytes, num_mapped_bytes = get_buffer_bytes (frame_buffer)
+		if num_bytes <= self.max_bytes:
+			with self._lock:
+				self.insert (filepath, (file_stats, frame_buffer, num_bytes, num_mapped_bytes))
+		return make_view (frame_buffer)
+
+
+	def get_motion_sequence (self, filepath, opened=None):
+		"""
+			PUBLIC: get_motion_sequence
+			---------------------------
+			returns the recording at filepath as a new
+			PlayBackMotionSequence over cached frames
+		"""
+		return PlayBackMotionSequence (_frame_buffer=self.get_frame_buffer (filepath, opened))
+
+
+	def get_dataframe (self, filepath, opened=None):
+		"""
+			PUBLIC: get_dataframe
+			---------------------
+			returns the recording at filepath as a dataframe
+		"""
+		return self.get_frame_buffer (filepath, opened).get_dataframe ()
+
+
+	def insert (self, filepath, entry):
+		"""
+			PRIVATE: insert
+			---------------
+			adds an entry (most recently used), evicting least
+			recently used ones until within budget. lock held
+		"""
+		previous = self.entries.pop (filepath, None)
+		if not previous is None:
+			self.forget (previous)
+		self.entries[filepath] = entry
+		self.num_bytes += entry[2]
+		self.num_mapped_bytes += entry[3]
+		while self.num_bytes > self.max_bytes:
+			evicted_path, evicted = self.entries.popitem (last=False)
+			self.forget (evicted)
+			self.stats['evictions'] += 1
+
+
+	def forget (self, entry):
+		"""
+			PRIVATE: forget
+			---------------
+			takes a removed entry's bytes off the totals. lock held
+		"""
+		self.num_bytes -= entry[2]
+		self.num_mapped_bytes -= entry[3]
+
+
+	def invalidate (self, filepath):
+		"""
+			PUBLIC: invalidate
+			------------------
+			drops filepath's entry, if any
+		"""
+		with self._lock:
+			entry = self.entries.pop (filepath, None)
+			if not entry is None:
+				self.forget (entry)
+				self.stats['invalidations'] += 1
+
+
+	def clear (self):
+		"""
+			PUBLIC: clear
+			-------------
+			drops every entry
+		"""
+		with self._lock:
+			self.entries.clear ()
+			self.num_bytes = 0
+			self.num_mapped_bytes = 0
+
+
+	def get_stats (self):
+		"""
+			PUBLIC: get_stats
+			-----------------
+			returns hits, misses, evictions, invalidations, hit rate,
+			and the number of cached recordings, bytes they hold in
+			memory and bytes they map
+		"""
+		with self._lock:
+			stats = dict(self.stats)
+			stats['entries'] = len(self.entries)
+			stats['bytes'] = self.num_bytes
+			stats['mapped_bytes'] = self.num_mapped_bytes
+			stats['max_bytes'] = self.max_bytes
+		lookups = stats['hits'] + stats['misses']
+		stats['hit_rate'] = stats['hits'] / float(lookups) if lookups > 0 else 0.0
+		return stats
@@ -0,0 +1,409 @@
+#-------------------------------------------------- #
+# Class: RecordingCatalog
+# -----------------------
+# persistent SQLite index of recordings and their
+# metadata (gesture, frames, duration, devices,
+# columns, size, checksum); answers queries about
+# recordings without opening them. paths are stored
+# relative to the data directory, so it can move.
+#-------------------------------------------------- #
+import os
+import json
+import hashlib
+import sqlite3
+import threading
+import pandas as pd
+from ..motion_sequence.FrameBuffer import FrameBuffer
+from .ColumnarRecording import *
+from .RecordingCodec import is_compressed_recording, decode_recording, compressed_extension
+
+
+catalog_schema = 	[
+						'''CREATE TABLE IF NOT EXISTS gestures (
+							name TEXT PRIMARY KEY
+						)''',
+						'''CREATE TABLE IF NOT EXISTS recordings (
+							path TEXT PRIMARY KEY,
+							gesture TEXT,
+							format TEXT,
+							num_frames INTEGER,
+							duration REAL,
+							devices TEXT,
+							columns TEXT,
+							size INTEGER,
+							mtime REAL,
+							checksum TEXT
+						)''',
+						'''CREATE INDEX IF NOT EXISTS recordings_by_gesture ON recordings (gesture, duration)''',
+						'''CREATE TABLE IF NOT EXISTS directories (
+							path TEXT PRIMARY KEY,
+							mtime REAL
+						)'''
+					]
+recording_fields = ['path', 'gesture', 'format', 'num_frames', 'duration', 'devices', 'columns', 'size', 'mtime', 'checksum']
+recording_extensions = [compressed_extension, recording_extension, '.dataframe'] 	# in order of preference
+
+
+# Function: is_recording_filename
+# -------------------------------
+# returns true if filename has the extension of a recording
+# (columnar, compressed or pickled dataframe)
+def is_recording_filename (filename):
+
+	return os.path.splitext (filename)[1] in recording_extensions
+
+
+# Function: drop_superseded
+# -------------------------
+# given recording filenames, returns (sorted) those not superseded by
+# the same recording in a preferred format, e.g. a pickle kept after
+# conversion to columnar
+def drop_superseded (filenames):
+
+	preferred = {}
+	for filename in filenames:
+		name, extension = os.path.splitext (filename)
+		if not name in preferred or recording_extensions.index (extension) < recording_extensions.index (os.path.splitext (preferred[name])[1]):
+			preferred[name] = filename
+	return sorted (preferred.values ())
+
+
+# Function: get_recording_files
+# -----------------------------
+# returns the files making up the recording at path
+def get_recording_files (path):
+
+	if os.path.isdir (path):
+		return [os.path.join (path, f) for f in sorted (os.listdir (path))]
+	return [path]
+
+
+# Function: get_file_stats
+# ------------------------
+# returns (total size in bytes, latest mtime) of the recording at path
+def get_file_stats (path):
+
+	files = get_recording_files (path)
+	return sum ([os.path.getsize (f) for f in files]), max ([os.path.getmtime (f) for f in files] + [os.path.getmtime (path)])
+
+
+# Function: get_checksum
+# ----------------------
+# returns the sha1 of the contents of the recording at path
+def get_checksum (path, block_size=1<<20):
+
+	sha1 = hashlib.sha1 ()
+	for filepath in get_recording_files (path):
+		with open (filepath, 'rb') as f:
+			block = f.read (block_size)
+			while block:
+				sha1.update (block)
+				block = f.read (block_size)
+	return sha1.hexdigest ()
+
+
+# Function: open_frame_buffer
+# ---------------------------
+# returns the frames of the recording at path as a FrameBuffer
+# (memory-mapped if columnar, so only what's read is loaded)
+def open_frame_buffer (path):
+
+	if is_columnar_recording (path):
+		return load_columnar (path)
+	if is_compressed_recording (path):
+		return decode_recording (path)
+	return FrameBuffer.from_dataframe (pd.read_pickle (path))
+
+
+# Function: get_recording_format
+# ------------------------------
+# returns 'columnar', 'compressed' or 'pickle'
+def get_recording_format (path):
+
+	if is_columnar_recording (path):
+		return 'columnar'
+	if is_compressed_recording (path):
+		return 'compressed'
+	return 'pickle'
+
+
+class RecordingCatalog:
+	"""
+		Class: RecordingCatalog
+		-----------------------
+		one row per recording (keyed by its path relative to
+		_root_dir) and per gesture; paths passed in and handed out
+		are full ones (_root_dir joined on). add_recording indexes
+		a recording as it is saved; sync reconciles the catalog
+		with what is on disk, relisting only directories that
+		changed since it last ran
+	"""
+
+	def __init__ (self, _db_path, _root_dir):
+		"""
+			PUBLIC: Constructor
+			-------------------
+			opens (creating if needed) the catalog at _db_path, for
+			recordings under _root_dir
+		"""
+		self.db_path 	= _db_path
+		self.root_dir 	= _root_dir
+		self.connection = sqlite3.connect (_db_path, check_same_thread=False)
+		self.connection.row_factory = sqlite3.Row
+		self._lock 		= threading.Lock ()
+		with self._lock, self.connection:
+			for statement in catalog_schema:
+				self.connection.execute (statement)
+
+
+	def execute (self, statement, parameters=()):
+		"""
+			PRIVATE: execute
+			----------------
+			runs a statement (committing any changes), returns rows
+		"""
+		with self._lock, self.connection:
+			return self.connection.execute (statement, parameters).fetchall ()
+
+
+	def relative_path (self, path):
+		"""
+			PRIVATE: relative_path
+			----------------------
+			returns path relative to the root dir, as stored
+		"""
+		return os.path.relpath (path, self.root_dir)
+
+
+	def full_path (self, relative_path):
+		"""
+			PRIVATE: full_path
+			------------------
+			inverse of relative_path
+		"""
+		return os.path.join (self.root_dir, relative_path)
+
+
+	def is_empty (self):
+		"""
+			PUBLIC: is_empty
+			----------------
+			returns true if nothing has been catalogued yet
+		"""
+		return self.execute ('SELECT COUNT(*) FROM recordings')[0][0] == 0 and len(self.get_gestures ()) == 0
+
+
+	########################################################################################################################
+	##############################[ --- GESTURES --- ]######################################################################
+	########################################################################################################################
+
+	def add_gesture (self, gesture_name):
+		"""
+			PUBLIC: add_gesture
+			-------------------
+			records that a gesture exists
+		"""
+		self.execute ('INSERT OR IGNORE INTO gestures (name) VALUES (?)', (gesture_name,))
+
+
+	def get_gestures (self):
+		"""
+			PUBLIC: get_gestures
+			--------------------
+			returns the names of all gestures
+		"""
+		return [row['name'] for row in self.execute ('SELECT name FROM gestures ORDER BY name')]
+
+
+	def gesture_exists (self, gesture_name):
+		"""
+			PUBLIC: gesture_exists
+			----------------------
+			returns true if the gesture has been recorded
+		"""
+		return len(self.execute ('SELECT 1 FROM gestures WHERE name = ?', (gesture_name,))) > 0
+
+
+	########################################################################################################################
+	##############################[ --- RECORDINGS --- ]####################################################################
+	########################################################################################################################
+
+	def add_recording (self, path, gesture_name=None, frame_buffer=None):
+		"""
+			PUBLIC: add_recording
+			---------------------
+			indexes the recording at path (replacing any previous
+			entry). pass its frame_buffer, if at hand, to avoid
+			opening it again
+		"""
+		#=====[ Step 1: frame metadata	]=====
+		if frame_buffer is None:
+			frame_buffer = open_frame_buffer (path)
+		timestamps = frame_buffer.get_timestamps ()
+		duration = (timestamps[-1] - timestamps[0]) / 1000000.0 if len(timestamps) > 0 else 0.0
+		column_names = frame_buffer.get_column_names ()
+
+		#=====[ Step 2: file metadata, insert	]=====
+		size, mtime = get_file_stats (path)
+		row = 	(
+					self.relative_path (path), gesture_name, get_recording_format (path),
+					len(frame_buffer), float(duration), json.dumps (infer_devices (column_names)),
+					json.dumps (column_names), size, mtime, get_checksum (path)
+				)
+		self.execute ('INSERT OR REPLACE INTO recordings (' + ', '.join (recording_fields) + ') VALUES (' + ', '.join (['?'] * len(recording_fields)) + ')', row)
+		if not gesture_name is None:
+			self.add_gesture (gesture_name)
+
+
+	def remove_recording (self, path):
+		"""
+			PUBLIC: remove_recording
+			------------------------
+			drops the recording at path from the catalog
+		"""
+		self.execute ('DELETE FROM recordings WHERE path = ?', (self.relative_path (path),))
+
+
+	def get_recording_info (self, path):
+		"""
+			PUBLIC: get_recording_info
+			--------------------------
+			returns the catalog entry for path as a dict, or None
+		"""
+		rows = self.execute ('SELECT * FROM recordings WHERE path = ?', (self.relative_path (path),))
+		if len(rows) == 0:
+			return None
+		return self.row_to_info (rows[0])
+
+
+	def row_to_info (self, row):
+		"""
+			PRIVATE: row_to_info
+			--------------------
+			converts a recordings row to a dict, decoding its lists
+			and making its path a full one
+		"""
+		info = dict(zip (row.keys (), row))
+		info['path'] = self.full_path (info['path'])
+		info['devices'] = json.loads (info['devices'])
+		info['columns'] = json.loads (info['columns'])
+		return info
+
+
+	def find_recordings (self, gesture_name=None, min_duration=None, max_duration=None, device=None):
+		"""
+			PUBLIC: find_recordings
+			-----------------------
+			returns the entries (dicts) of all recordings matching
+			every given condition, ordered by path; durations in secs.
+			e.g. find_recordings ('swirl', 0.5, 2)
+		"""
+		conditions, parameters = [], []
+		for condition, value in [('gesture = ?', gesture_name), ('duration >= ?', min_duration), ('duration <= ?', max_duration)]:
+			if not value is None:
+				conditions.append (condition)
+				parameters.append (value)
+		statement = 'SELECT * FROM recordings'
+		if len(conditions) > 0:
+			statement += ' WHERE ' + ' AND '.join (conditions)
+		infos = [self.row_to_info (row) for row in self.execute (statement + ' ORDER BY path', parameters)]
+		if not device is None:
+			infos = [info for info in infos if device in info['devices']]
+		return infos
+
+
+	def get_recording_paths (self, gesture_name=None):
+		"""
+			PUBLIC: get_recording_paths
+			---------------------------
+			returns the paths of all recordings (of one gesture, or
+			with no gesture if gesture_name is None)
+		"""
+		if gesture_name is None:
+			rows = self.execute ('SELECT path FROM recordings WHERE gesture IS NULL ORDER BY path')
+		else:
+			rows = self.execute ('SELECT path FROM recordings WHERE gesture = ? ORDER BY path', (gesture_name,))
+		return [self.full_path (row['path']) for row in rows]
+
+
+	def sync (self, recordings_dir, gesture_dirs):
+		"""
+			PUBLIC: sync
+			------------
+			reconciles the catalog with the filesystem: gestures are
+			exactly those in gesture_dirs (Map: gesture name ->
+			directory). directories whose mtime changed since the
+			last sync are relisted, indexing new or changed
+			(size/mtime) recordings and dropping missing ones; in the
+			rest, only the recordings already catalogued are checked
+			for changes (rewriting a file in place leaves its
+			directory's mtime as is). files without a
+			recording extension are ignored, as are recordings also
+			on disk in a preferred format (see drop_superseded)
+		"""
+		#=====[ Step 1: gestures	]=====
+		for gesture_name in gesture_dirs:
+			self.add_gesture (gesture_name)
+		for gesture_name in self.get_gestures ():
+			if not gesture_name in gesture_dirs:
+				self.execute ('DELETE FROM gestures WHERE name = ?', (gesture_name,))
+
+		#=====[ Step 2: relist directories that changed, check the others' recordings	]=====
+		directories = {self.relative_path (recordings_dir): None}
+		directories.update ({self.relative_path (gesture_dir): gesture_name for gesture_name, gesture_dir in gesture_dirs.iteritems ()})
+		synced = {row['path']: row['mtime'] for row in self.execute ('SELECT path, mtime FROM directories')}
+		for directory, gesture_name in directories.iteritems ():
+			mtime = os.path.getmtime (self.full_path (directory))
+			if synced.get (directory) != mtime:
+				self.sync_directory (directory, gesture_name)
+				self.execute ('INSERT OR REPLACE INTO directories (path, mtime) VALUES (?, ?)', (directory, mtime))
+			else:
+				self.sync_catalogued (directory, gesture_name)
+
+		#=====[ Step 3: drop what was in directories now gone	]=====
+		for row in self.execute ('SELECT path FROM recordings'):
+			if not os.path.dirname (row['path']) in directories:
+				self.execute ('DELETE FROM recordings WHERE path = ?', (row['path'],))
+		for directory in synced:
+			if not directory in directories:
+				self.execute ('DELETE FROM directories WHERE path = ?', (directory,))
+
+
+	def get_catalogued (self, directory):
+		"""
+			PRIVATE: get_catalogued
+			-----------------------
+			returns Map: path -> (size, mtime) of the recordings
+			catalogued in directory (relative)
+		"""
+		return {row['path']: (row['size'], row['mtime']) for row in self.execute ('SELECT path, size, mtime FROM recordings') if os.path.dirname (row['path']) == directory}
+
+
+	def sync_catalogued (self, directory, gesture_name):
+		"""
+			PRIVATE: sync_catalogued
+			------------------------
+			given a directory (relative) that wasn't relisted,
+			reindexes the catalogued recordings in it that changed
+		"""
+		for path, file_stats in self.get_catalogued (directory).iteritems ():
+			if os.path.exists (self.full_path (path)) and get_file_stats (self.full_path (path)) != file_stats:
+				self.add_recording (self.full_path (path), gesture_name)
+
+
+	def sync_directory (self, directory, gesture_name):
+		"""
+			PRIVATE: sync_directory
+			-----------------------
+			given a directory (relative) and the gesture its
+			recordings are of, indexes new or changed recordings in
+			it and drops those no longer there
+		"""
+		on_disk = [os.path.join (directory, f) for f in drop_superseded (filter (is_recording_filename, os.listdir (self.full_path (directory))))]
+		catalogued = self.get_catalogued (directory)
+		for path in catalogued:
+			if not path in on_disk:
+				self.execute ('DELETE FROM recordings WHERE path = ?', (path,))
+		for path in on_disk:
+			if not path in catalogued or catalogued[path] != get_file_stats (self.full_path (path)):
+				self.add_recording (self.full_path (path), gesture_name)
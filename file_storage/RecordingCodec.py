@@ -0,0 +1,244 @@
+#-------------------------------------------------- #
+# File: RecordingCodec
+# --------------------
+# compressed single-file recordings: timestamps
+# delta-encoded, float columns byte-shuffled
+# (lossless) or quantized to int16/float16 (bounded
+# error), everything zlib-compressed on top.
+#-------------------------------------------------- #
+import os
+import json
+import zlib
+import struct
+import pickle
+import numpy as np
+from ..motion_sequence.FrameBuffer import FrameBuffer
+from ..threads.clock import monotonic
+from ..devices import skeleton
+
+
+compressed_extension 	= '.zrecording'
+codec_magic 			= 'NIZ1'
+codec_header 			= struct.Struct ('<I') 		# json header length, in bytes
+codec_modes 			= ['lossless', 'quantized', 'float16']
+
+# quantization step per column in 'quantized' mode (error is at most
+# half a step); skeleton positions are in mm, good to about 0.1mm
+default_precisions 		= {skeleton.positions_column: 0.1}
+
+
+# Function: shuffle_bytes
+# -----------------------
+# returns the bytes of array grouped by significance (all first
+# bytes, then all second bytes...), which compresses far better
+def shuffle_bytes (array):
+
+	array = np.ascontiguousarray (array)
+	return array.view (np.uint8).reshape (-1, array.dtype.itemsize).T.tostring ()
+
+
+# Function: unshuffle_bytes
+# -------------------------
+# inverse of shuffle_bytes
+def unshuffle_bytes (data, dtype, shape):
+
+	dtype = np.dtype (dtype)
+	return np.frombuffer (data, dtype=np.uint8).reshape (dtype.itemsize, -1).T.copy ().view (dtype).reshape (shape)
+
+
+# Function: delta_encode
+# ----------------------
+# returns integer array with each entry (along the first axis)
+# replaced by its difference from the previous one; wraps around
+# on overflow, which delta_decode undoes exactly
+def delta_encode (array):
+
+	deltas = array.copy ()
+	deltas[1:] = array[1:] - array[:-1]
+	return deltas
+
+
+# Function: delta_decode
+# ----------------------
+# inverse of delta_encode
+def delta_decode (deltas):
+
+	return np.cumsum (deltas, axis=0, dtype=deltas.dtype)
+
+
+# Function: get_quantized_dtype
+# -----------------------------
+# returns the smallest integer dtype holding values in [low, high]
+# quantized to 'precision' around their midpoint (keeping its minimum
+# free to mark nan), or None if even int32 can't
+def get_quantized_dtype (low, high, precision):
+
+	for dtype in [np.int16, np.int32]:
+		if (high - low) / (2.0 * precision) < np.iinfo (dtype).max:
+			return np.dtype (dtype)
+	return None
+
+
+# Function: encode_column
+# -----------------------
+# returns (column entry for the header, encoded bytes) of one column
+def encode_column (name, column, mode, precision):
+
+	entry = {'name': name, 'dtype': column.dtype.str, 'shape': list(column.shape)}
+	lossy = column.dtype.kind == 'f'
+	finite = np.isfinite (column) if lossy else None
+
+	#=====[ Case 1: no fixed type - pickled	]=====
+	if column.dtype == object:
+		entry['encoding'] = 'pickle'
+		return entry, pickle.dumps (list(column), pickle.HIGHEST_PROTOCOL)
+
+	#=====[ Case 2: timestamps - whole usec, delta-encoded	]=====
+	if name == 'timestamp':
+		entry['encoding'] = 'delta'
+		return entry, shuffle_bytes (delta_encode (np.round (column).astype (np.int64)))
+
+	#=====[ Case 3: quantized to int16 (int32 if the range needs it)	]=====
+	low, high = (float(np.min (column[finite])), float(np.max (column[finite]))) if lossy and finite.any () else (0.0, 0.0)
+	if lossy and mode == 'quantized' and not precision is None and not get_quantized_dtype (low, high, precision) is None:
+		dtype, offset = get_quantized_dtype (low, high, precision), (low + high) / 2.0
+		quantized = np.round ((np.where (finite, column, offset) - offset) / precision).astype (dtype)
+		quantized[~finite] = np.iinfo (dtype).min
+		entry.update ({'encoding': 'quantized', 'quantized_dtype': dtype.str, 'offset': offset, 'precision': precision})
+		return entry, shuffle_bytes (delta_encode (quantized))
+
+	#=====[ Case 4: half precision, if in range	]=====
+	if lossy and mode == 'float16' and max (abs (low), abs (high)) < np.finfo (np.float16).max:
+		entry['encoding'] = 'float16'
+		return entry, shuffle_bytes (column.astype (np.float16))
+
+	#=====[ Case 5: as is	]=====
+	entry['encoding'] = 'shuffle'
+	return entry, shuffle_bytes (column)
+
+
+# Function: decode_column
+# -----------------------
+# given a column's header entry and its (decompressed) bytes,
+# returns the column
+def decode_column (entry, data):
+
+	dtype, shape, encoding = np.dtype (entry['dtype']), tuple(entry['shape']), entry['encoding']
+	if encoding == 'pickle':
+		return np.array (pickle.loads (data) + [None], dtype=object)[:-1]
+	if encoding == 'delta':
+		return delta_decode (unshuffle_bytes (data, np.int64, shape)).astype (dtype)
+	if encoding == 'quantized':
+		quantized = delta_decode (unshuffle_bytes (data, entry['quantized_dtype'], shape))
+		column = (quantized * entry['precision'] + entry['offset']).astype (dtype)
+		column[quantized == np.iinfo (quantized.dtype).min] = np.nan
+		return column
+	if encoding == 'float16':
+		return unshuffle_bytes (data, np.float16, shape).astype (dtype)
+	return unshuffle_bytes (data, dtype, shape)
+
+
+# Function: is_compressed_recording
+# ---------------------------------
+# returns true if path is a compressed recording file
+def is_compressed_recording (path):
+
+	if not os.path.isfile (path):
+		return False
+	with open (path, 'rb') as f:
+		return f.read (len(codec_magic)) == codec_magic
+
+
+# Function: encode_recording
+# --------------------------
+# writes a FrameBuffer as a compressed recording at 'path'. mode:
+#	- lossless: float columns byte-shuffled, nothing lost
+#	- quantized: columns in precisions (default: default_precisions)
+#		quantized to that step; the rest lossless
+#	- float16: float columns stored at half precision (~3 digits)
+# timestamps are rounded to whole usec in every mode; columns out of
+# a lossy encoding's range are kept lossless. non-finite quantized
+# values come back as nan. returns the report (sizes,
+# ratio, encode throughput), also stored in the header
+def encode_recording (frame_buffer, path, mode='lossless', precisions=None, level=1):
+
+	if not mode in codec_modes:
+		raise ValueError ("Unknown codec mode: " + str(mode))
+	if precisions is None:
+		precisions = default_precisions
+	start = monotonic ()
+
+	#=====[ Step 1: encode, compress every column	]=====
+	column_names = frame_buffer.get_column_names ()
+	columns = [('timestamp', frame_buffer.get_timestamps ())] + [(name, frame_buffer.get_column (name)) for name in column_names]
+	entries, blocks, raw_bytes = [], [], 0
+	for name, column in columns:
+		entry, data = encode_column (name, column, mode, precisions.get (name))
+		block = zlib.compress (data, level)
+		entry['length'] = len(block)
+		entries.append (entry)
+		blocks.append (block)
+		raw_bytes += column.nbytes
+
+	#=====[ Step 2: header (with report), then the blocks	]=====
+	encoded_bytes = sum ([len(block) for block in blocks])
+	encode_secs = monotonic () - start
+	report = 	{
+					'mode': mode,
+					'raw_bytes': raw_bytes,
+					'encoded_bytes': encoded_bytes,
+					'ratio': raw_bytes / float(encoded_bytes) if encoded_bytes > 0 else 0.0,
+					'encode_secs': encode_secs,
+					'encode_mb_per_sec': raw_bytes / 1000000.0 / encode_secs if encode_secs > 0 else 0.0
+				}
+	header = json.dumps ({'num_frames': len(frame_buffer), 'columns': entries, 'report': report})
+	with open (path, 'wb') as f:
+		f.write (codec_magic + codec_header.pack (len(header)) + header)
+		for block in blocks:
+			f.write (block)
+	return report
+
+
+# Function: load_codec_header
+# ---------------------------
+# returns the header of the compressed recording at 'path'
+def load_codec_header (path):
+
+	with open (path, 'rb') as f:
+		f.read (len(codec_magic))
+		length, = codec_header.unpack (f.read (codec_header.size))
+		return json.loads (f.read (length))
+
+
+# Function: decode_recording
+# --------------------------
+# reads the compressed recording at 'path' into a FrameBuffer. given
+# a 'report' dict, adds decode time/throughput to it
+def decode_recording (path, report=None):
+
+	start = monotonic ()
+	with open (path, 'rb') as f:
+		f.read (len(codec_magic))
+		length, = codec_header.unpack (f.read (codec_header.size))
+		header = json.loads (f.read (length))
+		columns = {entry['name']: decode_column (entry, zlib.decompress (f.read (entry['length']))) for entry in header['columns']}
+
+	timestamps = columns.pop ('timestamp')
+	column_order = [entry['name'] for entry in header['columns'] if entry['name'] != 'timestamp']
+	if not report is None:
+		decode_secs = monotonic () - start
+		raw_bytes = timestamps.nbytes + sum ([column.nbytes for column in columns.itervalues ()])
+		report['decode_secs'] = decode_secs
+		report['decode_mb_per_sec'] = raw_bytes / 1000000.0 / decode_secs if decode_secs > 0 else 0.0
+	return FrameBuffer.from_arrays (timestamps, columns, column_order)
+
+
+# Function: get_codec_report
+# --------------------------
+# returns the full report for the compressed recording at 'path':
+# what was stored at encode time, plus a timed decode
+def get_codec_report (path):
+
+	report = dict(load_codec_header (path)['report'])
+	decode_recording (path, report)
+	return report
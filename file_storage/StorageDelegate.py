@@ -8,9 +8,17 @@ import os
 import sys
 import pickle
 import time
+import shutil
 import pandas as pd
 from ..interface.util import *
 from ..motion_sequence.MotionSequence import *
+from .ColumnarRecording import *
+from .RecordingCodec import *
+from .RecordingCatalog import RecordingCatalog, get_recording_format
+from .BulkLoader import BulkLoader
+from .RecordingCache import RecordingCache
+from ..recording.RecordingWriter import stream_extension
+from .FeatureCache import FeatureCache
 
 
 
@@ -35,20 +43,86 @@ def get_new_filepath (dir_name, extension):
 
 
 
+# Function: get_new_recording_path
+# --------------------------------
+# returns a novel recording path in directory 'dir_name' (columnar by
+# default; compressed_extension for compressed recordings)
+def get_new_recording_path (dir_name, extension=recording_extension):
+
+	return os.path.join (dir_name, str(time.time()) + extension)
+
+
+# Function: load_motion_sequence
+# ------------------------------
+# given the path to a recording (columnar, compressed or pickled
+# dataframe), returns it as a PlayBackMotionSequence; columnar
+# recordings are memory-mapped rather than read in
+def load_motion_sequence (path):
+
+	if is_columnar_recording (path):
+		return PlayBackMotionSequence (_frame_buffer=load_columnar (path))
+	if is_compressed_recording (path):
+		return PlayBackMotionSequence (_frame_buffer=decode_recording (path))
+	return PlayBackMotionSequence (pd.read_pickle (path))
+
+
+# Function: load_dataframe
+# ------------------------
+# given the path to a recording (columnar, compressed or pickled
+# dataframe), returns it as a dataframe
+def load_dataframe (path):
+
+	if is_columnar_recording (path):
+		return load_columnar (path).get_dataframe ()
+	if is_compressed_recording (path):
+		return decode_recording (path).get_dataframe ()
+	return pickle.load (open(path, 'r'))
+
+
+# Function: save_motion_sequence
+# ------------------------------
+# writes a motion sequence's frames as a columnar recording at 'path',
+# or, given a codec_mode (see encode_recording), a compressed one
+def save_motion_sequence (motion_sequence, path, codec_mode=None):
+
+	if codec_mode is None:
+		save_columnar (motion_sequence.get_frame_buffer (), path)
+	else:
+		encode_recording (motion_sequence.get_frame_buffer (), path, codec_mode)
+
+
+
+
+
 class StorageDelegate:
 
 	# Function: Constructor
 	# ---------------------
 	# initialize by passing in data_dir, the path to the directory containing
-	# all of your data
-	def __init__ (self, data_dir):
+	# all of your data; recordings are loaded on num_load_workers threads
+	# and up to cache_bytes of them are kept in memory for reuse. given a
+	# codec_mode (see encode_recording), new recordings are saved compressed
+	def __init__ (self, data_dir, num_load_workers=8, cache_bytes=256*1024*1024, codec_mode=None):
 
 		#===[ Get Filestructure ]===
 		self.build_filestructure (data_dir)
+		self.codec_mode = codec_mode
 
 		#===[ Get contents of filestructure ]===
 		self.update_filesystem_snapshot ()
 
+		#===[ Open the catalog, catching up on changes made outside this class ]===
+		self.catalog = RecordingCatalog (os.path.join (data_dir, 'catalog.sqlite'), data_dir)
+		self.sync_catalog ()
+
+		#===[ Feature cache, opened on first use ]===
+		self.feature_cache = None
+
+		#===[ Cache of loaded recordings, loaders for bulk reads (uncached pickles in processes) ]===
+		self.cache = RecordingCache (cache_bytes)
+		self.loader = BulkLoader (self.cache.get_motion_sequence, num_load_workers, self.needs_process)
+		self.dataframe_loader = BulkLoader (self.cache.get_dataframe, num_load_workers, self.needs_process)
+
 
 
 	########################################################################################################################
@@ -69,6 +143,7 @@ class StorageDelegate:
 		self.filenames['gestures_dir']		= os.path.join (self.filenames['data_dir'], 'gestures')
 		self.filenames['recordings_dir'] 	= os.path.join (self.filenames['data_dir'], 'recordings')
 		self.filenames['figures_dir']		= os.path.join (self.filenames['data_dir'], 'figures')
+		self.filenames['captures_dir']		= os.path.join (self.filenames['data_dir'], 'captures')
 
 		# self.filenames['pose_dir']			= os.path.join (self.filenames['data_dir'], 'poses')		
 
@@ -87,7 +162,7 @@ class StorageDelegate:
 		# current_poses = os.listdir (self.filenames['poses_dir'])
 
 		#=====[ Gestures	]=====
-		current_gestures = os.listdir (self.filenames['gestures_dir'])
+		current_gestures = [g for g in os.listdir (self.filenames['gestures_dir']) if os.path.isdir (os.path.join (self.filenames['gestures_dir'], g))]
 		self.filenames['gestures_dirs'] = {gesture: os.path.join (self.filenames['gestures_dir'], gesture) for gesture in current_gestures}
 		
 		### Step 2: classifiers ###
@@ -95,6 +170,29 @@ class StorageDelegate:
 		### Step 3: recordings ###
 
 
+	def needs_process (self, filepath):
+		"""
+			PRIVATE: needs_process
+			----------------------
+			returns true if loading filepath means unpickling it,
+			which holds the GIL, so BulkLoader opens it in a process
+		"""
+		return get_recording_format (filepath) == 'pickle' and not self.cache.contains (filepath)
+
+
+	def sync_catalog (self):
+		"""
+			PUBLIC: sync_catalog
+			--------------------
+			brings the catalog up to date with the filesystem; run on
+			open. only relists directories that changed, and stats the
+			catalogued recordings in the rest. call again
+			if recordings were added/removed outside of this class since
+		"""
+		self.update_filesystem_snapshot ()
+		self.catalog.sync (self.filenames['recordings_dir'], self.filenames['gestures_dirs'])
+
+
 
 	########################################################################################################################
 	##############################[ --- POSES --- ]#########################################################################
@@ -136,8 +234,7 @@ class StorageDelegate:
 	# returns a list of all of the existing gestures
 	def get_existing_gestures (self):
 
-		self.update_filesystem_snapshot ()
-		return os.listdir(self.filenames['gestures_dir'])
+		return self.catalog.get_gestures ()
 
 
 	# Function: gesture_exists 
@@ -145,10 +242,7 @@ class StorageDelegate:
 	# returns true <=> the specified gesture already exists in the filesystem
 	def gesture_exists (self, gesture_name):
 
-		if gesture_name in self.get_existing_gestures ():
-			return True
-		else:
-			return False
+		return self.catalog.gesture_exists (gesture_name)
 
 
 	# Function: make_gesture
@@ -157,6 +251,7 @@ class StorageDelegate:
 	def make_gesture (self, gesture_name):
 
 		ensure_dir_exists(self.get_gesture_dir (gesture_name))
+		self.catalog.add_gesture (gesture_name)
 
 
 	# Function: ensure_gesture_exists
@@ -173,8 +268,7 @@ class StorageDelegate:
 	# given the name of a gesture, returns the names of all gestures recorded 
 	def get_gesture_recordings_list (self, gesture_name):
 
-		self.update_filesystem_snapshot ()
-		return os.listdir (self.get_gesture_dir (gesture_name))
+		return [os.path.basename (r) for r in self.get_gesture_recording_filepaths (gesture_name)]
 
 
 	# Function: get_num_gesture_recordings
@@ -191,11 +285,7 @@ class StorageDelegate:
 	# as a list
 	def get_gesture_recording_filepaths (self, gesture_name):
 
-		if not self.gesture_exists (gesture_name):
-			return []
-		else:
-			gesture_dir = self.get_gesture_dir (gesture_name)
-			return [os.path.join (gesture_dir, r) for r in os.listdir (gesture_dir)]
+		return self.catalog.get_recording_paths (gesture_name)
 
 
 	# Function: get_new_gesture_recording_filepath
@@ -205,28 +295,81 @@ class StorageDelegate:
 	def get_new_gesture_recording_filepath (self, gesture_name):
 
 		self.ensure_gesture_exists (gesture_name)
-		return get_new_filepath (self.get_gesture_dir(gesture_name), '.gesture')
+		return self.get_new_recording_path (self.get_gesture_dir(gesture_name))
 
 
 	# Function: save_gesture_recording 
 	# --------------------------------
 	# saves 'motion_sequence,' which contains a recording of a gesture, as an instance
-	# of the gesture named 'gesture_name'
+	# of the gesture named 'gesture_name' (columnar)
 	def save_gesture_recording (self, motion_sequence, gesture_name):
 
-		pickle.dump (motion_sequence.get_dataframe (), open(self.get_new_gesture_recording_filepath (gesture_name), 'w'))
+		filepath = self.get_new_gesture_recording_filepath (gesture_name)
+		save_motion_sequence (motion_sequence, filepath, self.codec_mode)
+		self.catalog.add_recording (filepath, gesture_name, motion_sequence.get_frame_buffer ())
 
 
 	# Function: get_gesture_recordings
 	# --------------------------------
 	# given the name of a gesture, returns a list of all recordings of it 
-	# (returns as MotionSequences)
+	# (returns as MotionSequences; columnar or pickled), loaded concurrently
 	def get_gesture_recordings (self, gesture_name):
 
 		if not self.gesture_exists (gesture_name):
 			return []
 		else:
-			return [PlayBackMotionSequence(pickle.load (open(ms, 'r'))) for ms in self.get_gesture_recording_filepaths (gesture_name)]
+			return self.loader.load (self.get_gesture_recording_filepaths (gesture_name))
+
+
+	# Function: get_all_gesture_recordings
+	# ------------------------------------
+	# returns Map: gesture name -> list of its recordings (MotionSequences),
+	# for the given gestures (default: all of them), all loaded on one pool;
+	# suitable as a classifier's raw_recordings_dict
+	def get_all_gesture_recordings (self, gesture_names=None):
+
+		if gesture_names is None:
+			gesture_names = self.get_existing_gestures ()
+		return self.loader.load_dict ({g: self.get_gesture_recording_filepaths (g) for g in gesture_names})
+
+
+	# Function: iter_gesture_recordings
+	# ---------------------------------
+	# yields (gesture name, recording) for every recording of the given
+	# gestures (default: all of them), in the order they finish loading
+	def iter_gesture_recordings (self, gesture_names=None):
+
+		if gesture_names is None:
+			gesture_names = self.get_existing_gestures ()
+		gestures = {f: g for g in gesture_names for f in self.get_gesture_recording_filepaths (g)}
+		for filepath, recording in self.loader.iter_load (gestures.keys ()):
+			yield gestures[filepath], recording
+
+
+	# Function: get_load_stats
+	# ------------------------
+	# returns throughput (files/s, MB/s) of motion sequence loading so far
+	def get_load_stats (self):
+
+		return self.loader.get_stats ()
+
+
+	# Function: get_cache_stats
+	# -------------------------
+	# returns hits, misses, evictions and size of the recording cache
+	def get_cache_stats (self):
+
+		return self.cache.get_stats ()
+
+
+	# Function: find_recordings
+	# -------------------------
+	# returns the filepaths of all recordings matching the given conditions,
+	# answered from the catalog; e.g. find_recordings ('swirl', 0.5, 2)
+	# for all swirls lasting between 0.5 and 2 secs
+	def find_recordings (self, gesture_name=None, min_duration=None, max_duration=None, device=None):
+
+		return [info['path'] for info in self.catalog.find_recordings (gesture_name, min_duration, max_duration, device)]
 
 
 
@@ -239,6 +382,17 @@ class StorageDelegate:
 	##############################[ --- CLASSIFIERS --- ]###################################################################
 	########################################################################################################################
 
+	# Function: get_feature_cache
+	# ---------------------------
+	# returns the persistent FeatureCache in data_dir, for passing to
+	# classifiers/generative models/gesture monitors
+	def get_feature_cache (self):
+
+		if self.feature_cache is None:
+			self.feature_cache = FeatureCache (os.path.join (self.filenames['data_dir'], 'features.sqlite'))
+		return self.feature_cache
+
+
 	# Function: get_classifier_filepath
 	# ---------------------------------
 	# given the classifier's name, returns a filepath to it
@@ -296,34 +450,129 @@ class StorageDelegate:
 	# returns the full filepath to all recordings in a list
 	def get_recording_filepaths (self):
 
-		return [os.path.join (self.filenames['recordings_dir'], r) for r in os.listdir (self.filenames['recordings_dir'])]
+		return self.catalog.get_recording_paths ()
+
+
+	# Function: get_new_capture_path
+	# -------------------------------
+	# returns a novel path for a Recorder to stream a capture to
+	def get_new_capture_path (self):
+
+		return os.path.join (self.filenames['captures_dir'], str(time.time()) + stream_extension)
+
+
+	# Function: get_new_recording_path
+	# --------------------------------
+	# returns a novel path in dir_name for a recording in the format
+	# this delegate saves (columnar, or compressed given a codec_mode)
+	def get_new_recording_path (self, dir_name):
+
+		if self.codec_mode is None:
+			return get_new_recording_path (dir_name)
+		return get_new_recording_path (dir_name, compressed_extension)
 
 
 	# Function: save_recording 
 	# ------------------------
-	# saves a given recording
+	# saves a given recording (columnar, or compressed given a
+	# codec_mode); returns its path
 	def save_recording (self, recording):
 
-		filepath = get_new_filepath (self.filenames['recordings_dir'], 'recording')
-		pickle.dump (recording.get_dataframe(), open (filepath, 'w'))
+		filepath = self.get_new_recording_path (self.filenames['recordings_dir'])
+		save_motion_sequence (recording, filepath, self.codec_mode)
+		self.catalog.add_recording (filepath, None, recording.get_frame_buffer ())
+		return filepath
 
 
 	# Function: get_recording 
 	# -----------------------
-	# given the name of a recording, loads and retrieves it
+	# given the name of a recording, loads and retrieves it;
+	# columnar recordings are memory-mapped, pickles read in
+	# (both only once while cached)
 	def get_recording (self, recording_name):
 
 		full_filepath = os.path.join (self.filenames['recordings_dir'], recording_name)
-		recording = PlayBackMotionSequence(pd.read_pickle (full_filepath))
-		return recording
+		return self.cache.get_motion_sequence (full_filepath)
 
 
 	# Function: load_recordings
 	# -------------------------
-	# returns a list of all recordings
+	# returns a list of all recordings (as dataframes), loaded concurrently
 	def load_recordings (self):
 
-		return [pickle.load (open(f, 'r')) for f in self.get_recording_filepaths ()]
+		return self.dataframe_loader.load (self.get_recording_filepaths ())
+
+
+	# Function: convert_recordings
+	# ----------------------------
+	# one-shot conversion of every pickled recording (in recordings_dir and
+	# all gesture dirs) to the columnar format. each replaces its pickle in
+	# the catalog; with remove_pickles, the pickles are also deleted.
+	# returns the new paths
+	def convert_recordings (self, remove_pickles=False):
+
+		filepaths = self.get_recording_filepaths ()
+		for gesture_name in self.get_existing_gestures ():
+			filepaths += self.get_gesture_recording_filepaths (gesture_name)
+
+		converted = []
+		for filepath in filepaths:
+			if is_columnar_recording (filepath) or is_compressed_recording (filepath):
+				continue
+			converted.append (convert_pickled_recording (filepath))
+			self.replace_recording (filepath, converted[-1])
+			if remove_pickles:
+				os.remove (filepath)
+		return converted
+
+
+	# Function: replace_recording
+	# ---------------------------
+	# catalogs the recording at new_path (a conversion of the one at
+	# filepath) in place of filepath's, under the same gesture
+	def replace_recording (self, filepath, new_path, frame_buffer=None):
+
+		gesture_name = self.catalog.get_recording_info (filepath)['gesture']
+		self.catalog.remove_recording (filepath)
+		self.cache.invalidate (filepath)
+		self.catalog.add_recording (new_path, gesture_name, frame_buffer)
+
+
+	# Function: compress_recordings
+	# -----------------------------
+	# one-shot compression of every uncompressed recording (in recordings_dir
+	# and all gesture dirs) with the given codec mode. each replaces its
+	# original in the catalog; with remove_originals, the originals are also
+	# deleted. returns Map: new path -> codec report
+	def compress_recordings (self, codec_mode='quantized', remove_originals=False):
+
+		filepaths = self.get_recording_filepaths ()
+		for gesture_name in self.get_existing_gestures ():
+			filepaths += self.get_gesture_recording_filepaths (gesture_name)
+
+		reports = {}
+		for filepath in filepaths:
+			if is_compressed_recording (filepath):
+				continue
+			frame_buffer = self.cache.get_frame_buffer (filepath)
+			compressed_path = os.path.splitext (filepath)[0] + compressed_extension
+			reports[compressed_path] = encode_recording (frame_buffer, compressed_path, codec_mode)
+			self.replace_recording (filepath, compressed_path, frame_buffer)
+			if remove_originals:
+				if os.path.isdir (filepath):
+					shutil.rmtree (filepath)
+				else:
+					os.remove (filepath)
+		return reports
+
+
+	# Function: get_codec_report
+	# --------------------------
+	# returns compression ratio and encode/decode throughput of the
+	# compressed recording at filepath
+	def get_codec_report (self, filepath):
+
+		return get_codec_report (filepath)
 
 
 
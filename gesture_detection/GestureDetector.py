@@ -10,61 +10,13 @@ import pandas as pd
 import matplotlib.pyplot as plt
 
 from ..classification.GenerativeModel import GenerativeModel
+from ..motion_sequence.MotionSequence import sec_to_usec
+from ..motion_sequence.MotionSequence import temporal_subsample, extract_last_n_seconds
 
 ########################################################################################################################
 ##############################[ --- UTILITIES --- ]#####################################################################
 ########################################################################################################################
 
-# Function: sec_to_usec
-# ---------------------
-# converts seconds to microseconds
-def sec_to_usec (sec):
-	
-	return sec*1000000
-
-
-# Function: start_time_to_index
-# -----------------------------
-# given start time, returns the index of the time slice closest to it
-def start_time_to_index (df, start_time):
-
-	return np.argmin (np.abs(df['timestamp'] - start_time))
-
-
-# Function: end_time_to_index
-# ---------------------------
-# given start time, returns the index of the time slice closest to it
-def end_time_to_index (df, end_time):
-
-	return np.argmin (np.abs(df['timestamp'] - end_time))
-
-
-# Function: temporal_subsample
-# ----------------------------
-# given two times within the recording, this will return
-# the portion of the dataframe that occurs between
-def temporal_subsample (df, start_time, end_time):
-
-	return df.loc[start_time_to_index (df, start_time) : end_time_to_index (df, end_time)]
-
-
-# Function: extract_last_n_seconds
-# --------------------------------
-# given a dataframe and secs, this will return the portion
-# of the dataframe that occured over the last n seconds
-def extract_last_n_seconds (df, secs):
-
-	### Step 1: get desired start/end timestamps ###
-	end_time 	= df.iloc[-1]['timestamp']
-	start_time 	= end_time - sec_to_usec (secs)
-
-	### Step 2: try to temporal subsample, return none if impossible ###
-	try:
-		return temporal_subsample (df, start_time, end_time)
-	except ValueError:
-		return None
-
-
 # Function: get_hand_gone_indices
 # ----------------------------------
 # given a dataframe of hand frames, returns a series where the index 
@@ -122,11 +74,13 @@ class GestureDetector:
 
 	# Function: Constructor
 	# ---------------------
-	# creates all of the generative models
-	def __init__ (self, _gestures_dict):
+	# creates all of the generative models (reusing features from
+	# _feature_cache, a FeatureCache, if given)
+	def __init__ (self, _gestures_dict, _feature_cache=None):
 
 		#===[ Get Generative Models]===
 		self.gestures_dict = _gestures_dict
+		self.feature_cache = _feature_cache
 		self.generative_models = self.get_generative_models ()
 
 
@@ -136,7 +90,7 @@ class GestureDetector:
 	# as a dict mapping gesture name -> GenerativeModel
 	def get_generative_models (self):
 
-		return {n: GenerativeModel (e) for n, e in self.gestures_dict.items ()}
+		return {n: GenerativeModel (e, _feature_cache=self.feature_cache) for n, e in self.gestures_dict.items ()}
 
 
 	# Function: detect 
@@ -0,0 +1,528 @@
+#-------------------------------------------------- #
+# Class: FrameBuffer
+# ------------------
+# preallocated, growable columnar store for frames.
+# keeps one typed numpy array per column plus a
+# timestamp array; appends are amortized O(1) and
+# reads return views over the live region.
+#-------------------------------------------------- #
+import time
+import numpy as np
+import pandas as pd
+from ..devices import skeleton
+from .MotionSequenceWindow import MotionSequenceWindow
+from .FrameChunk import FrameChunk
+
+
+# Function: infer_column_dtype
+# ----------------------------
+# given the first value seen for a column, returns the dtype
+# its storage array should have
+def infer_column_dtype (value):
+
+	if isinstance (value, np.ndarray):
+		return value.dtype
+	if isinstance (value, (bool, np.bool_)):
+		return np.dtype (np.bool_)
+	if isinstance (value, np.floating):
+		return value.dtype
+	if isinstance (value, (int, long, float, np.number)):
+		return np.dtype (np.float64)
+	return np.dtype (object)
+
+
+# Function: get_fill_value
+# ------------------------
+# returns the value that marks a missing entry in a column of
+# the given dtype (None where it has none; see get_fillable_dtype)
+def get_fill_value (dtype):
+
+	if dtype.kind in 'fc':
+		return np.nan
+	if dtype == np.bool_:
+		return False
+	return None
+
+
+# Function: get_fillable_dtype
+# ----------------------------
+# returns the dtype a column of the given dtype must have to hold
+# missing entries: integers are promoted to float64 (nan), other
+# types without a fill value to object (None)
+def get_fillable_dtype (dtype):
+
+	if dtype.kind in 'fcO' or dtype == np.bool_:
+		return dtype
+	if dtype.kind in 'iu':
+		return np.dtype (np.float64)
+	return np.dtype (object)
+
+
+# Function: get_entry
+# -------------------
+# reads one frame's entry out of a column; multi-dimensional
+# entries are copied so they don't alias the buffer
+def get_entry (column, position):
+
+	if column.ndim > 1:
+		return column[position].copy ()
+	return column[position]
+
+
+# Function: get_frame_timestamp
+# -----------------------------
+# returns the timestamp (usec) of a frame; frames that don't
+# carry one are stamped with the current wall-clock time
+def get_frame_timestamp (frame):
+
+	timestamp = frame.get ('timestamp')
+	if timestamp is None:
+		return time.time () * 1000000
+	return timestamp
+
+
+class FrameBuffer:
+	"""
+		Class: FrameBuffer
+		------------------
+		columnar storage for motion sequence frames. the live
+		region is always contiguous (self._start:self._end), so
+		columns and timestamps can be handed out as views.
+	"""
+
+	initial_capacity = 256
+
+
+	def __init__ (self, _capacity=None, _timestamps=None):
+		"""
+			PUBLIC: Constructor
+			-------------------
+			creates an empty buffer; columns are added as they
+			are first seen in appended frames. given _timestamps,
+			wraps them (without copying) as the frames' timestamps
+			instead of allocating; see from_arrays
+		"""
+		if _timestamps is None:
+			self._capacity 		= _capacity or self.initial_capacity
+			self._end 			= 0
+			self._timestamps 	= np.empty (self._capacity, dtype=np.float64)
+			self._owns_storage 	= True
+		else:
+			self._capacity 		= len(_timestamps)
+			self._end 			= len(_timestamps)
+			self._timestamps 	= _timestamps
+			self._owns_storage 	= False
+		self._start 		= 0
+		self._columns 		= {}
+		self._column_order 	= []
+		self._num_dropped 	= 0
+		self._dataframe_cache = None
+
+
+
+
+	@classmethod
+	def from_arrays (cls, timestamps, columns, column_order=None):
+		"""
+			PUBLIC: from_arrays
+			-------------------
+			wraps a timestamp array and dict Map: column name -> array
+			(frames first, all the same length) without copying them,
+			e.g. memory-mapped columns; appending reallocates
+		"""
+		frame_buffer = cls (_timestamps=timestamps)
+		frame_buffer._columns 		= dict(columns)
+		frame_buffer._column_order 	= list(column_order or sorted (columns.keys ()))
+		return frame_buffer
+
+
+	@classmethod
+	def from_dataframe (cls, dataframe, frame_rate=30):
+		"""
+			PUBLIC: from_dataframe
+			----------------------
+			wraps the columns of an existing dataframe without copying
+			them where pandas allows. skeleton columns (legacy joint
+			dicts or flat floats) are converted, once, into the
+			skeleton position/orientation arrays. recordings made
+			before frames carried timestamps are taken to be evenly
+			spaced at frame_rate (Hz)
+		"""
+		num_frames = len(dataframe)
+
+		#=====[ Step 1: timestamps	]=====
+		if 'timestamp' in dataframe.columns:
+			timestamps = np.asarray (dataframe['timestamp'].values, dtype=np.float64)
+		else:
+			timestamps = np.arange (num_frames, dtype=np.float64) * (1000000.0 / frame_rate)
+		frame_buffer = cls (_timestamps=timestamps)
+
+		#=====[ Step 2: skeleton data, legacy or flat, becomes skeleton columns	]=====
+		skeleton_columns = []
+		skeleton_data = skeleton.dataframe_to_skeleton (dataframe)
+		if not skeleton_data is None:
+			positions, orientations, skeleton_columns = skeleton_data
+			frame_buffer._columns[skeleton.positions_column] = positions
+			frame_buffer._columns[skeleton.orientations_column] = orientations
+			frame_buffer._column_order += [skeleton.positions_column, skeleton.orientations_column]
+
+		#=====[ Step 3: all other columns	]=====
+		skeleton_columns = set(skeleton_columns)
+		for name in dataframe.columns:
+			if name == 'timestamp' or name in skeleton_columns:
+				continue
+			frame_buffer._columns[name] = dataframe[name].values
+			frame_buffer._column_order.append (name)
+		return frame_buffer
+
+
+
+
+	####################################################################################################
+	##############################[ --- PROPERTIES --- ]################################################
+	####################################################################################################
+
+	def __len__ (self):
+		"""
+			PUBLIC: __len__
+			---------------
+			returns the number of frames in the live region
+		"""
+		return self._end - self._start
+
+
+	def get_column_names (self):
+		"""
+			PUBLIC: get_column_names
+			------------------------
+			returns the names of all columns, in the order they
+			were first seen
+		"""
+		return list(self._column_order)
+
+
+	def has_column (self, name):
+		"""
+			PUBLIC: has_column
+			------------------
+			returns true if the named column is stored
+		"""
+		return name in self._columns
+
+
+
+
+	####################################################################################################
+	##############################[ --- WRITING --- ]###################################################
+	####################################################################################################
+
+	def add_column (self, name, value):
+		"""
+			PRIVATE: add_column
+			-------------------
+			allocates storage for a new column, typed after 'value';
+			frames already in the buffer get NaN/None for it (so a
+			column first seen late is promoted to a type that can
+			hold them; see get_fillable_dtype)
+		"""
+		dtype = infer_column_dtype (value)
+		if len(self) > 0:
+			dtype = get_fillable_dtype (dtype)
+		shape = (self._capacity,) + (value.shape if isinstance (value, np.ndarray) else ())
+		if dtype == np.bool_:
+			column = np.zeros (shape, dtype=dtype)
+		else:
+			column = np.empty (shape, dtype=dtype)
+			column[self._start:self._end] = get_fill_value (dtype)
+		self._columns[name] = column
+		self._column_order.append (name)
+
+
+	def reserve (self, num_frames):
+		"""
+			PRIVATE: reserve
+			----------------
+			makes room for num_frames more frames past self._end,
+			either by sliding the live region to the front or by
+			doubling capacity. storage borrowed from elsewhere (see
+			from_dataframe) is never written in place
+		"""
+		if self._end + num_frames <= self._capacity:
+			return
+
+		live = len(self)
+		new_capacity = max (self._capacity, 1)
+		while live + num_frames > new_capacity:
+			new_capacity *= 2
+
+		#=====[ Step 1: slide in place if at least half the buffer is dead	]=====
+		if self._owns_storage and new_capacity == self._capacity and self._start >= self._capacity / 2:
+			self._timestamps[:live] = self._timestamps[self._start:self._end]
+			for name, column in self._columns.items ():
+				column[:live] = column[self._start:self._end]
+				if column.dtype == object:
+					column[live:self._end] = None
+
+		#=====[ Step 2: otherwise grow into fresh arrays	]=====
+		else:
+			new_capacity = max (new_capacity, self._capacity * 2)
+			timestamps = np.empty (new_capacity, dtype=np.float64)
+			timestamps[:live] = self._timestamps[self._start:self._end]
+			self._timestamps = timestamps
+			for name, column in self._columns.items ():
+				new_column = np.empty ((new_capacity,) + column.shape[1:], dtype=column.dtype)
+				new_column[:live] = column[self._start:self._end]
+				self._columns[name] = new_column
+			self._capacity = new_capacity
+			self._owns_storage = True
+
+		self._start, self._end = 0, live
+
+
+	def append (self, frame):
+		"""
+			PUBLIC: append
+			--------------
+			adds a single frame (dict: column -> value) to the end
+			of the buffer
+		"""
+		self.reserve (1)
+		index = self._end
+
+		#=====[ Step 1: write timestamp, columns present in frame	]=====
+		self._timestamps[index] = get_frame_timestamp (frame)
+		num_written = 0
+		for name, value in frame.iteritems ():
+			if name == 'timestamp':
+				continue
+			if not name in self._columns:
+				self.add_column (name, value)
+			self._columns[name][index] = value
+			num_written += 1
+
+		#=====[ Step 2: fill columns missing from this frame, promoting if needed	]=====
+		if num_written < len(self._columns):
+			for name, column in self._columns.items ():
+				if not name in frame:
+					if get_fillable_dtype (column.dtype) != column.dtype:
+						column = self._columns[name] = column.astype (get_fillable_dtype (column.dtype))
+					column[index] = get_fill_value (column.dtype)
+
+		self._end += 1
+		self._dataframe_cache = None
+
+
+	def drop_front (self, num_frames):
+		"""
+			PUBLIC: drop_front
+			------------------
+			discards the oldest num_frames frames; O(1), as the space
+			is reclaimed the next time the buffer slides down
+		"""
+		num_frames = min (num_frames, len(self))
+		if num_frames <= 0:
+			return
+		if self._owns_storage:
+			for column in self._columns.itervalues ():
+				if column.dtype == object:
+					column[self._start:self._start + num_frames] = None
+		self._start += num_frames
+		self._num_dropped += num_frames
+		self._dataframe_cache = None
+
+
+	def get_num_dropped (self):
+		"""
+			PUBLIC: get_num_dropped
+			-----------------------
+			returns the total number of frames discarded from the
+			front of the buffer so far
+		"""
+		return self._num_dropped
+
+
+	def trim (self, start_index, end_index):
+		"""
+			PUBLIC: trim
+			------------
+			keeps only frames [start_index:end_index] of the live
+			region (python slice semantics)
+		"""
+		start_index, end_index, step = slice (start_index, end_index).indices (len(self))
+		end_index = max (start_index, end_index)
+		self._start, self._end = self._start + start_index, self._start + end_index
+		self._num_dropped += start_index
+		self._dataframe_cache = None
+
+
+
+
+	####################################################################################################
+	##############################[ --- READING --- ]###################################################
+	####################################################################################################
+
+	def get_timestamps (self):
+		"""
+			PUBLIC: get_timestamps
+			----------------------
+			returns a view of the timestamps in the live region
+		"""
+		return self._timestamps[self._start:self._end]
+
+
+	def get_column (self, name):
+		"""
+			PUBLIC: get_column
+			------------------
+			returns a view of the named column over the live region
+		"""
+		return self._columns[name][self._start:self._end]
+
+
+	def get_window (self, start_index, end_index, copy=False):
+		"""
+			PUBLIC: get_window
+			------------------
+			returns a MotionSequenceWindow of read-only views over
+			frames [start_index:end_index] of the live region. views
+			are only valid until the buffer next changes (appends may
+			slide the live region in place); with copy, the window
+			owns its data instead
+		"""
+		start, end = self._start + start_index, self._start + end_index
+		columns = {name: self._columns[name][start:end] for name in self._column_order}
+		timestamps = self._timestamps[start:end]
+		if copy:
+			columns = {name: column.copy () for name, column in columns.iteritems ()}
+			timestamps = timestamps.copy ()
+		return MotionSequenceWindow (timestamps, columns, start_index)
+
+
+	def get_numeric_column_names (self):
+		"""
+			PUBLIC: get_numeric_column_names
+			--------------------------------
+			returns the names of all columns that can go into a
+			numeric block (i.e. everything but object columns)
+		"""
+		return [name for name in self._column_order if self._columns[name].dtype != object]
+
+
+	def get_block (self, start_index, end_index, column_names=None):
+		"""
+			PUBLIC: get_block
+			-----------------
+			returns frames [start_index:end_index] as a single 2d
+			float array (frames x features), one feature per numeric
+			column (multi-dimensional columns are flattened in place)
+		"""
+		if column_names is None:
+			column_names = self.get_numeric_column_names ()
+		start, end = self._start + start_index, self._start + end_index
+		columns = [self._columns[name][start:end] for name in column_names]
+		columns = [c.reshape (end - start, -1) for c in columns]
+		if len(columns) == 0:
+			return np.empty ((end - start, 0))
+		return np.hstack (columns).astype (np.float64)
+
+
+	def get_block_labels (self, column_names):
+		"""
+			PUBLIC: get_block_labels
+			------------------------
+			returns the name of each feature (block column) that
+			get_block produces for the given columns
+		"""
+		labels = []
+		for name in column_names:
+			column = self._columns[name]
+			if column.ndim > 1:
+				labels += skeleton.flat_column_labels (name, column.shape[1:])
+			else:
+				labels.append (name)
+		return labels
+
+
+	def get_chunk (self, start_index, end_index, column_names=None):
+		"""
+			PUBLIC: get_chunk
+			-----------------
+			returns frames [start_index:end_index] as a FrameChunk
+		"""
+		if column_names is None:
+			column_names = self.get_numeric_column_names ()
+		start, end = self._start + start_index, self._start + end_index
+		block = self.get_block (start_index, end_index, column_names)
+		return FrameChunk (self._timestamps[start:end].copy (), block, self.get_block_labels (column_names), start_index)
+
+
+	def get_frame (self, index):
+		"""
+			PUBLIC: get_frame
+			-----------------
+			returns the frame at the given (live-region) index as a dict
+		"""
+		if index < 0:
+			index += len(self)
+		position = self._start + index
+		frame = {name: get_entry (self._columns[name], position) for name in self._column_order}
+		frame['timestamp'] = self._timestamps[position]
+		return frame
+
+
+	def get_frame_asof (self, timestamp, interpolate=False):
+		"""
+			PUBLIC: get_frame_asof
+			----------------------
+			as-of lookup: returns the most recent frame at or before
+			'timestamp' (without its own timestamp), or None if there
+			is none. with interpolate, numeric columns are linearly
+			interpolated toward the following frame when there is one
+		"""
+		timestamps = self.get_timestamps ()
+		index = int(np.searchsorted (timestamps, timestamp, side='right')) - 1
+		if index < 0:
+			return None
+
+		position = self._start + index
+		frame = {name: get_entry (self._columns[name], position) for name in self._column_order}
+		if interpolate and index + 1 < len(timestamps) and timestamps[index + 1] > timestamps[index]:
+			weight = (timestamp - timestamps[index]) / float(timestamps[index + 1] - timestamps[index])
+			for name in self._column_order:
+				column = self._columns[name]
+				if column.dtype.kind == 'f':
+					frame[name] = column[position] + weight*(column[position + 1] - column[position])
+		return frame
+
+
+	def get_dataframe (self, start_index=0, end_index=None):
+		"""
+			PUBLIC: get_dataframe
+			---------------------
+			returns a dataframe over frames [start_index:end_index] of
+			the live region, built from the column views. the full
+			dataframe is cached until the buffer next changes, and
+			each caller gets its own copy of it (one memcpy per
+			block, still far cheaper than rebuilding), so changing
+			it doesn't reach other callers. returns None if the
+			buffer is empty
+		"""
+		if len(self) == 0:
+			return None
+
+		#=====[ Step 1: whole live region is cached	]=====
+		whole = (start_index == 0 and end_index is None)
+		if whole and not self._dataframe_cache is None:
+			return self._dataframe_cache.copy ()
+
+		#=====[ Step 2: build from views	]=====
+		start_index, end_index, step = slice (start_index, end_index).indices (len(self))
+		start, end = self._start + start_index, self._start + end_index
+		data = skeleton.flatten_columns ({name: self._columns[name][start:end] for name in self._column_order})
+		data['timestamp'] = self._timestamps[start:end]
+		dataframe = pd.DataFrame (data)
+
+		if whole:
+			self._dataframe_cache = dataframe
+			return dataframe.copy ()
+		return dataframe
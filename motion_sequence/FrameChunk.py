@@ -0,0 +1,43 @@
+#-------------------------------------------------- #
+# Class: FrameChunk
+# -----------------
+# a contiguous block of frames as one 2d array
+# (frames x features) plus their timestamps, for
+# consumers that process many frames per call.
+#-------------------------------------------------- #
+
+
+class FrameChunk:
+	"""
+		Class: FrameChunk
+		-----------------
+		block of frames [start_index:end_index] of a motion sequence.
+		data[i, j] is feature column_names[j] of the ith frame
+	"""
+
+	def __init__ (self, _timestamps, _data, _column_names, _start_index=0):
+		"""
+			PUBLIC: Constructor
+			-------------------
+			given timestamps (n,), data (n x features) and the feature
+			names, wraps them
+		"""
+		self.timestamps 	= _timestamps
+		self.data 			= _data
+		self.column_names 	= _column_names
+		self.start_index 	= _start_index
+		self.end_index 		= _start_index + len(_timestamps)
+
+
+	def __len__ (self):
+
+		return len(self.timestamps)
+
+
+	def get_column (self, name):
+		"""
+			PUBLIC: get_column
+			------------------
+			returns the named feature across all frames in the chunk
+		"""
+		return self.data[:, self.column_names.index (name)]
@@ -0,0 +1,125 @@
+#-------------------------------------------------- #
+# Class: FrameCursor
+# ------------------
+# one consumer's read position in a motion sequence;
+# lets any number of consumers follow the same
+# sequence without taking frames from each other.
+#-------------------------------------------------- #
+from ..interface.util import *
+from ..threads.clock import monotonic
+
+
+class FrameCursor:
+	"""
+		Class: FrameCursor
+		------------------
+		positions are absolute frame counts (frames dropped by a
+		retention policy included), so they stay valid as the
+		sequence's frame buffer is trimmed. get one from
+		MotionSequence.get_cursor ()
+	"""
+
+	def __init__ (self, _motion_sequence, _position=None):
+		"""
+			PUBLIC: Constructor
+			-------------------
+			given a motion sequence, starts reading at _position
+			(default: only frames published from now on)
+		"""
+		self.motion_sequence = _motion_sequence
+		if _position is None:
+			_position = _motion_sequence.get_num_published ()
+		self.position 		= _position
+		self.num_skipped 	= 0
+
+
+	def get_num_pending (self):
+		"""
+			PUBLIC: get_num_pending
+			-----------------------
+			returns the number of frames published since this cursor
+			last read
+		"""
+		return self.motion_sequence.get_num_published () - self.position
+
+
+	def is_exhausted (self):
+		"""
+			PUBLIC: is_exhausted
+			--------------------
+			returns true if the sequence has run out of frames and
+			this cursor has read all of them
+		"""
+		return self.motion_sequence._frames_exhausted.isSet () and self.get_num_pending () <= 0
+
+
+	def wait (self, timeout=None):
+		"""
+			PUBLIC: wait
+			------------
+			blocks until there are frames past this cursor, the
+			sequence is exhausted or timeout secs pass; returns true
+			if there are frames to read
+		"""
+		deadline = None if timeout is None else monotonic () + timeout
+		frames_published = self.motion_sequence._frames_published
+		with frames_published:
+			while self.get_num_pending () <= 0 and not self.motion_sequence._frames_exhausted.isSet ():
+				remaining = None if deadline is None else deadline - monotonic ()
+				if not remaining is None and remaining <= 0:
+					break
+				frames_published.wait (remaining)
+			return self.get_num_pending () > 0
+
+
+	def read (self, block=True, timeout=None):
+		"""
+			PUBLIC: read
+			------------
+			returns a MotionSequenceWindow over (copies of) every frame
+			published since this cursor last read and advances past
+			them; None if there are none. frames that retention dropped
+			before they were read are counted in self.num_skipped
+		"""
+		return self.take (block, timeout, lambda frame_buffer, start, end: frame_buffer.get_window (start, end, copy=True))
+
+
+	def read_frames (self, block=True, timeout=None):
+		"""
+			PUBLIC: read_frames
+			-------------------
+			like read, but returns the frames as a list of dicts
+		"""
+		frames = self.take (block, timeout, lambda frame_buffer, start, end: [frame_buffer.get_frame (i) for i in range(start, end)])
+		if frames is None:
+			return []
+		return frames
+
+
+	def take (self, block, timeout, copy_out):
+		"""
+			PRIVATE: take
+			-------------
+			finds the frames past this cursor and advances past them;
+			copy_out (frame_buffer, start, end), given their live-region
+			indices, copies them out while the sequence is still locked,
+			as retention may drop or slide them as soon as it isn't.
+			returns what it returns, or None if there are no frames
+		"""
+		if block and not self.wait (timeout):
+			return None
+
+		with self.motion_sequence._frames_published:
+			frame_buffer = self.motion_sequence.get_frame_buffer ()
+			num_dropped = frame_buffer.get_num_dropped ()
+			end = min (self.motion_sequence.get_num_published (), num_dropped + len(frame_buffer))
+			if end <= self.position:
+				return None
+
+			if self.position < num_dropped:
+				self.num_skipped += num_dropped - self.position
+				self.position = num_dropped
+
+			frames = copy_out (frame_buffer, self.position - num_dropped, end - num_dropped)
+			self.position = end
+			return frames
@@ -13,6 +13,15 @@ import threading
 import time
 from ..interface.util import *
 from ..devices.DeviceReceiver import DeviceReceiver
+from ..devices.SharedMemoryReceiver import SharedMemoryReceiver
+from ..devices import skeleton
+from ..threads.clock import monotonic
+from .FrameBuffer import FrameBuffer, get_frame_timestamp
+from .TimeIndex import TimeIndex
+from .MotionSequenceWindow import MotionSequenceWindow
+from .FrameChunk import FrameChunk
+from .FrameCursor import FrameCursor
+from .RetentionPolicy import KeepAll, KeepLastSeconds
 
 
 # Function: sec_to_usec
@@ -31,33 +40,59 @@ def usec_to_sec (sec):
 	return int(sec/float(1000000))
 
 
+# Function: get_time_index
+# ------------------------
+# returns a TimeIndex over the 'timestamp' column of df
+def get_time_index (df):
+
+	return TimeIndex (df['timestamp'].values)
+
+
 # Function: start_time_to_index
 # -----------------------------
-# given start time, returns the index of the time slice closest to it
+# given start time, returns the position of the time slice closest to it
 def start_time_to_index (df, start_time):
 
-	return np.argmin (np.abs(df['timestamp'] - start_time))
+	return get_time_index (df).nearest (start_time)
 
 
 # Function: end_time_to_index
 # ---------------------------
-# given start time, returns the index of the time slice closest to it
+# given end time, returns the position of the time slice closest to it
 def end_time_to_index (df, end_time):
 
-	return np.argmin (np.abs(df['timestamp'] - end_time))
+	return get_time_index (df).nearest (end_time)
 
 
 # Function: temporal_subsample
 # ----------------------------
 # given two times within the recording, this will return
 # the portion of the dataframe that occurs between
-def temporal_subsample (df, start_time, end_time):
+def temporal_subsample (df, start_time, end_time, time_index=None):
 
-	# print "df start, end timestamp: ", df.iloc[0]['timestamp'], df.iloc[-1]['timestamp']
-	if start_time < df.iloc[0]['timestamp']:
-		# print "start time is earlier than possible"
+	if time_index is None:
+		time_index = get_time_index (df)
+	if start_time < time_index.get_start_time ():
 		raise ValueError
-	return df.loc[start_time_to_index (df, start_time) : end_time_to_index (df, end_time)]
+	start, end = time_index.get_range (start_time, end_time)
+	return df.iloc[start:end]
+
+
+# Function: extract_last_n_seconds
+# --------------------------------
+# given a dataframe and secs, this will return the portion
+# of the dataframe that occured over the last n seconds (all
+# of it if it spans less); None if it has fewer than min_frames
+def extract_last_n_seconds (df, secs, min_frames=0):
+
+	if len(df) == 0 or len(df) < min_frames:
+		return None
+
+	time_index = get_time_index (df)
+	window_range = time_index.get_last_n_seconds_range (secs)
+	if window_range is None:
+		return df
+	return df.iloc[window_range[0]:window_range[1]]
 
 
 
@@ -68,12 +103,48 @@ def temporal_subsample (df, start_time, end_time):
 # real-time or played back from a recording. 
 # call iter_frames to iterate over the frames
 # call get_dataframe to get a dataframe containing all
+# consumers that follow it (monitors, detectors) each get their own
+# FrameCursor via get_cursor
 class MotionSequence:
 
 	def __init__ (self):
 
 		self._frames_exhausted 		= threading.Event ()
-		self._new_frame_available 	= threading.Event ()
+		self._frames_published 		= threading.Condition ()
+		self.num_published 			= 0
+
+
+	########################################################################################################################
+	##############################[ --- CONSUMERS --- ]#####################################################################
+	########################################################################################################################
+
+	# Function: publish
+	# -----------------
+	# marks frames up to (absolute position) num_published as
+	# available and wakes every waiting cursor
+	def publish (self, num_published):
+
+		with self._frames_published:
+			self.num_published = num_published
+			self._frames_published.notify_all ()
+
+
+	# Function: get_num_published
+	# ---------------------------
+	# returns the number of frames published so far, including
+	# any since dropped by retention
+	def get_num_published (self):
+
+		return self.num_published
+
+
+	# Function: get_cursor
+	# --------------------
+	# returns a new FrameCursor over this sequence; by default it
+	# starts at the frames published from now on
+	def get_cursor (self, position=None):
+
+		return FrameCursor (self, position)
 
 
 	########################################################################################################################
@@ -108,8 +179,15 @@ class MotionSequence:
 	# seconds
 	def get_timespan (self):
 
-		df = self.get_dataframe ()
-		return (df.iloc[-1]['timestamp'] - df.iloc[0]['timestamp'])
+		time_index = self.get_time_index ()
+		return time_index.get_end_time () - time_index.get_start_time ()
+
+
+	# Function: get_time_index
+	# ------------------------
+	# returns the sorted TimeIndex over this sequence's timestamps
+	def get_time_index (self):
+		pass
 
 
 
@@ -132,10 +210,19 @@ class MotionSequence:
 
 		while not self._frames_exhausted.isSet ():
 			new_frame = self.get_frame ()
-			self._new_frame_available.set ()
 			yield new_frame
 
 
+	# Function: stream_chunks
+	# ------------------------
+	# like stream_frames, but yields FrameChunks: numpy blocks of
+	# frames x features plus timestamps. a chunk is flushed when it
+	# holds 'size' frames or when max_latency secs have passed since
+	# its first frame arrived, whichever comes first
+	def stream_chunks (self, size=None, max_latency=None):
+		pass
+
+
 	# Function: get_window_df
 	# -----------------------
 	# given timespan, returns the appropriate window at current
@@ -144,6 +231,56 @@ class MotionSequence:
 		pass
 
 
+	# Function: get_frame_buffer
+	# --------------------------
+	# returns the FrameBuffer holding this sequence's frames
+	def get_frame_buffer (self):
+		pass
+
+
+	# Function: get_window_end
+	# ------------------------
+	# returns the position one past the most recent frame
+	# streamed so far, or None if there is nothing to look at
+	def get_window_end (self):
+		pass
+
+
+	# Function: get_skeleton
+	# ----------------------
+	# returns (positions, orientations): frames x joints x axes
+	# float32 arrays (views), or None if there is no skeleton data
+	def get_skeleton (self):
+
+		frame_buffer = self.get_frame_buffer ()
+		if not frame_buffer.has_column (skeleton.positions_column):
+			return None
+		return frame_buffer.get_column (skeleton.positions_column), frame_buffer.get_column (skeleton.orientations_column)
+
+
+	# Function: get_window
+	# --------------------
+	# given timespan (secs), returns a MotionSequenceWindow of
+	# read-only views over the last 'timespan' seconds at the
+	# current point in streaming; None if not available.
+	# unlike get_window_df, nothing is copied, so the views are
+	# only valid until the next frame is published; pass copy
+	# to keep the window past that (e.g. while frames stream in)
+	def get_window (self, timespan, copy=False):
+
+		with self._frames_published:
+			end = self.get_window_end ()
+			if not end:
+				return None
+
+			frame_buffer = self.get_frame_buffer ()
+			time_index = TimeIndex (frame_buffer.get_timestamps ()[:end])
+			window_range = time_index.get_last_n_seconds_range (timespan)
+			if window_range is None:
+				return None
+			return frame_buffer.get_window (window_range[0], window_range[1], copy)
+
+
 	# Function: trim_dataframe
 	# ------------------------
 	# given start, end, this trims the dataframe to the given
@@ -169,45 +306,275 @@ class MotionSequence:
 # class: PlayBackMotionSequence
 # -----------------------------
 # motion sequence constructed from a recording/pickled
-# dataframe
+# dataframe, or straight from a FrameBuffer (e.g. a memory-mapped
+# columnar recording); its dataframe is then only built on request
 class PlayBackMotionSequence (MotionSequence):
 
 	seq_type = 'PlayBackMotionSequence'
+	lag_tolerance = 0.005 			# secs late before a replayed frame counts as lagging
+	default_chunk_size = 64
 
 
-	def __init__ (self, _dataframe):
+	def __init__ (self, _dataframe=None, _frame_buffer=None):
 
 		MotionSequence.__init__ (self)
 		self.dataframe = _dataframe
+		self.from_frame_buffer = not _frame_buffer is None
+		self.time_index = None
+		self.frame_buffer = _frame_buffer
+		self.frame_block = None
+		self.replay_stats = None
 
 		self.reset ()	
 
 	def reset (self):
 		self._frames_exhausted.clear ()
 		self.current_frame_index = 0
-		if len(self.dataframe) == 0:
+		if self.get_num_frames () == 0:
 			self._frames_exhausted.set ()
+		self.publish (0)
 
 
-	def get_frame (self, timeout=0):
+	def get_num_frames (self):
+		"""
+			PUBLIC: get_num_frames
+			----------------------
+			returns the number of frames in the recording
+		"""
+		if self.from_frame_buffer:
+			return len(self.frame_buffer)
+		return len(self.dataframe)
+
+
+	def advance (self, end):
+		"""
+			PRIVATE: advance
+			----------------
+			moves current_frame_index to 'end', marking the sequence
+			exhausted when it reaches the end, and publishes the
+			frames passed over to any cursors
+		"""
+		self.current_frame_index = end
+		if self.current_frame_index >= self.get_num_frames ():
+			self._frames_exhausted.set ()
+		self.publish (self.current_frame_index)
+
 
+	def get_frame (self, timeout=0):
+		"""
+			PUBLIC: get_frame
+			-----------------
+			returns the next frame, read straight from the frame
+			buffer's columns (so memory-mapped recordings only load
+			the frames that are played)
+		"""
 		assert not self._frames_exhausted.isSet()
 		time.sleep (timeout)
-		new_frame = dict(self.dataframe.iloc[self.current_frame_index])
-		self.current_frame_index += 1
-		if self.current_frame_index >= len (self.dataframe):
-			self._frames_exhausted.set ()
+		new_frame = self.get_frame_buffer ().get_frame (self.current_frame_index)
+		self.advance (self.current_frame_index + 1)
 		return new_frame
 
 
+	def get_frames (self, num_frames):
+		"""
+			PUBLIC: get_frames
+			------------------
+			batch version of get_frame: returns a list of (up to)
+			the next num_frames frames
+		"""
+		assert not self._frames_exhausted.isSet()
+		frame_buffer = self.get_frame_buffer ()
+		start = self.current_frame_index
+		end = min (start + num_frames, len(frame_buffer))
+		new_frames = [frame_buffer.get_frame (i) for i in range(start, end)]
+		self.advance (end)
+		return new_frames
+
+
+	def replay (self, speed=1.0, lag_callback=None):
+		"""
+			PUBLIC: replay
+			--------------
+			iterates through the frames, emitting each at its recorded
+			offset from the first, scaled by 'speed' (2.0 = twice real
+			time). speed=None replays as fast as possible. pacing runs
+			off a monotonic clock, so it does not drift with the time
+			consumers spend on each frame; frames emitted more than
+			lag_tolerance late are counted in self.replay_stats and
+			passed to lag_callback (lag_secs, frame_index)
+		"""
+		timestamps = self.get_frame_buffer ().get_timestamps ()
+		self.replay_stats = {'speed': speed, 'frames': 0, 'late_frames': 0, 'current_lag': 0.0, 'max_lag': 0.0}
+		if self._frames_exhausted.isSet ():
+			return
+
+		first_timestamp = timestamps[self.current_frame_index]
+		start_clock = monotonic ()
+		while not self._frames_exhausted.isSet ():
+
+			#=====[ Step 1: wait until this frame is due	]=====
+			if speed:
+				self.pace (start_clock + (timestamps[self.current_frame_index] - first_timestamp) / (1000000.0 * speed), lag_callback)
+
+			#=====[ Step 2: emit it	]=====
+			new_frame = self.get_frame ()
+			self.replay_stats['frames'] += 1
+			yield new_frame
+
+
+	def pace (self, due, lag_callback=None):
+		"""
+			PRIVATE: pace
+			-------------
+			sleeps until the current frame is 'due' (monotonic secs),
+			recording in self.replay_stats how late it is if already
+			past; see replay
+		"""
+		lag = monotonic () - due
+		if lag < 0:
+			time.sleep (-lag)
+			lag = 0.0
+		self.replay_stats['current_lag'] = lag
+		self.replay_stats['max_lag'] = max (self.replay_stats['max_lag'], lag)
+		if lag > self.lag_tolerance:
+			self.replay_stats['late_frames'] += 1
+			if lag_callback:
+				lag_callback (lag, self.current_frame_index)
+
+
+	def get_replay_stats (self):
+		"""
+			PUBLIC: get_replay_stats
+			------------------------
+			returns a copy of the pacing statistics for the most
+			recent replay: frames emitted, how many were late, and
+			the current/max lag in seconds
+		"""
+		if self.replay_stats is None:
+			return None
+		return dict(self.replay_stats)
+
+
+	def get_frame_block (self):
+		"""
+			PRIVATE: get_frame_block
+			------------------------
+			returns (column names, frames x features array) for the
+			whole recording, built once; chunks are views into it
+		"""
+		if self.frame_block is None:
+			frame_buffer = self.get_frame_buffer ()
+			column_names = frame_buffer.get_numeric_column_names ()
+			block = frame_buffer.get_block (0, len(frame_buffer), column_names)
+			self.frame_block = (frame_buffer.get_block_labels (column_names), block)
+		return self.frame_block
+
+
+	def stream_chunks (self, size=None, max_latency=None, speed=None):
+		"""
+			PUBLIC: stream_chunks
+			---------------------
+			yields FrameChunks whose data are views into a block
+			built once for the whole recording. with a speed, frames
+			are paced as in replay () and a partial chunk is flushed
+			max_latency secs after its first frame, even if no frame
+			is due by then; otherwise every chunk is full-sized (but
+			the last)
+		"""
+		size = size or self.default_chunk_size
+		column_names, block = self.get_frame_block ()
+		timestamps = self.get_frame_buffer ().get_timestamps ()
+
+		#=====[ Case 1: unpaced - slice the block directly	]=====
+		if not speed:
+			while not self._frames_exhausted.isSet ():
+				start = self.current_frame_index
+				end = min (start + size, len(timestamps))
+				self.advance (end)
+				yield FrameChunk (timestamps[start:end], block[start:end], column_names, start)
+			return
+
+		#=====[ Case 2: paced - flush on size or latency deadline	]=====
+		self.replay_stats = {'speed': speed, 'frames': 0, 'late_frames': 0, 'current_lag': 0.0, 'max_lag': 0.0}
+		if self._frames_exhausted.isSet ():
+			return
+		first_timestamp = timestamps[self.current_frame_index]
+		start_clock = monotonic ()
+		start, deadline = None, None
+		while not self._frames_exhausted.isSet ():
+			due = start_clock + (timestamps[self.current_frame_index] - first_timestamp) / (1000000.0 * speed)
+
+			#=====[ the next frame isn't due before the deadline: flush without it	]=====
+			if not deadline is None and deadline < due:
+				time.sleep (max (deadline - monotonic (), 0))
+				end = self.current_frame_index
+				yield FrameChunk (timestamps[start:end], block[start:end], column_names, start)
+				start, deadline = None, None
+				continue
+
+			self.pace (due)
+			self.advance (self.current_frame_index + 1)
+			self.replay_stats['frames'] += 1
+			end = self.current_frame_index
+			if start is None:
+				start = end - 1
+				deadline = None if max_latency is None else monotonic () + max_latency
+			if end - start >= size or (not deadline is None and monotonic () >= deadline) or self._frames_exhausted.isSet ():
+				yield FrameChunk (timestamps[start:end], block[start:end], column_names, start)
+				start, deadline = None, None
+
+
+	def stream_frame_batches (self, batch_size):
+		"""
+			PUBLIC: stream_frame_batches
+			----------------------------
+			iterates through the frames batch_size at a time, yielding
+			lists of frames
+		"""
+		while not self._frames_exhausted.isSet ():
+			new_frames = self.get_frames (batch_size)
+			yield new_frames
+
+
 	def get_dataframe (self):
 
+		if self.dataframe is None:
+			self.dataframe = self.frame_buffer.get_dataframe ()
 		return self.dataframe
 
 
+	def get_time_index (self):
+
+		if self.time_index is None:
+			self.time_index = TimeIndex (self.get_frame_buffer ().get_timestamps ())
+		return self.time_index
+
+
+	def get_frame_buffer (self):
+
+		if self.frame_buffer is None:
+			self.frame_buffer = FrameBuffer.from_dataframe (self.dataframe)
+		return self.frame_buffer
+
+
+	def get_window_end (self):
+
+		if self._frames_exhausted.isSet ():
+			return None
+		return self.current_frame_index + 1
+
+
 	def trim_dataframe (self, start_index, end_index):
 		
-		self.dataframe = self.dataframe.iloc[start_index:end_index]
+		with self._frames_published:
+			if self.from_frame_buffer:
+				self.frame_buffer.trim (start_index, end_index)
+				self.dataframe = None
+			else:
+				self.dataframe = self.dataframe.iloc[start_index:end_index]
+				self.frame_buffer = None
+			self.time_index = None
+			self.frame_block = None
 
 
 	def get_window_df (self, timespan):
@@ -215,11 +582,12 @@ class PlayBackMotionSequence (MotionSequence):
 		if self._frames_exhausted.isSet ():
 			return None
 
-		end_time 	= self.dataframe.iloc[self.current_frame_index]['timestamp']
+		time_index 	= self.get_time_index ()
+		end_time 	= time_index.timestamps[self.current_frame_index]
 		start_time 	= end_time - sec_to_usec (timespan)
 
 		try:
-			return temporal_subsample (self.get_dataframe (), start_time, end_time)
+			return temporal_subsample (self.get_dataframe (), start_time, end_time, time_index)
 		except ValueError:
 			return None
 
@@ -230,13 +598,23 @@ class PlayBackMotionSequence (MotionSequence):
 
 # Class: RealTimeMotionSequence
 # -----------------------------
-# motion sequence gathered real-time from a (set of) device(s)
+# motion sequence gathered real-time from a (set of) device(s).
+# pass a RetentionPolicy (e.g. KeepLastSeconds) to bound how much
+# of it is kept in memory; index-based methods then refer to the
+# retained frames.
+# with several devices, each keeps its own stream and a combined
+# frame is produced for each frame any of them delivers, as-of
+# joined with the latest samples from the others.
+# with a single SharedMemoryReceiver, the frame buffer is the shared
+# ring itself: frames are ingested in another process and read in place
 class RealTimeMotionSequence (MotionSequence):
 
 	seq_type = 'RealTimeMotionSequence' 
+	device_stream_secs = 10			# secs of each device's own stream kept for joining
+	default_chunk_size = 32
 
 
-	def __init__ (self, _device_receivers):
+	def __init__ (self, _device_receivers, _retention=None, _interpolate=False):
 
 		#==========[ Step 1: initialize MotionSequence	]==========
 		MotionSequence.__init__(self)
@@ -247,52 +625,233 @@ class RealTimeMotionSequence (MotionSequence):
 		else:
 			self.device_receivers = [ _device_receivers]
 
-		#==========[ Step 3: initialize frames_list/dataframe	]==========
-		self.frames_list = []
-		self.dataframe = None
+		#==========[ Step 3: initialize frame buffer, retention	]==========
+		self.shared_receiver = None
+		if len(self.device_receivers) == 1 and isinstance (self.device_receivers[0], SharedMemoryReceiver):
+			self.shared_receiver = self.device_receivers[0]
+			self.frame_buffer = self.shared_receiver.make_frame_buffer ()
+		else:
+			self.frame_buffer = FrameBuffer ()
+		self.retention = _retention or KeepAll ()
 
+		#==========[ Step 4: per-device streams for multi-device joins	]==========
+		self.interpolate = _interpolate
+		self.device_streams = {dr.device_name: FrameBuffer () for dr in self.device_receivers}
+		self.device_retention = KeepLastSeconds (self.device_stream_secs)
+		self._device_frame_available = threading.Event ()
+		if self.shared_receiver is None:
+			for dr in self.device_receivers:
+				dr.add_listener (self._device_frame_available)
 
-	def get_frame (self):
+
+	def __len__ (self):
+
+		return len(self.frame_buffer)
+
+
+	def gather_device_frames (self, timeout=None):
+		"""
+			PRIVATE: gather_device_frames
+			-----------------------------
+			waits until at least one receiver has a new frame, then
+			collects every queued frame without blocking on the others.
+			returns a list of (device_name, frame); empty on timeout
+		"""
+		deadline = None if timeout is None else monotonic () + timeout
+		while True:
+			self._device_frame_available.clear ()
+			new_frames = [(dr.device_name, frame) for dr in self.device_receivers for frame in dr.get_frames (block=False)]
+			if len(new_frames) > 0:
+				return new_frames
+
+			remaining = None if deadline is None else deadline - monotonic ()
+			if not remaining is None and remaining <= 0:
+				return []
+			self._device_frame_available.wait (remaining)
+
+
+	def join_device_frames (self, timestamp):
+		"""
+			PRIVATE: join_device_frames
+			---------------------------
+			as-of join across device streams: for each device, takes
+			its latest sample at or before 'timestamp' (interpolated
+			if self.interpolate); returns the combined frame
+		"""
+		new_frame = {}
+		for device_stream in self.device_streams.itervalues ():
+			device_frame = device_stream.get_frame_asof (timestamp, self.interpolate)
+			if not device_frame is None:
+				new_frame.update (device_frame)
+		new_frame['timestamp'] = timestamp
+		return new_frame
+
+
+	def get_shared_frames (self, timeout=None):
+		"""
+			PRIVATE: get_shared_frames
+			--------------------------
+			shared-memory mode: takes in every frame the ingest
+			process has written since the last call (no copies),
+			dropping any the ring overwrote meanwhile; returns the
+			latest, or None if timeout secs pass first
+		"""
+		with self._frames_published:
+			num_new = self.frame_buffer.refresh ()
+		if num_new == 0:
+			if not self.shared_receiver.wait (timeout):
+				return None
+			with self._frames_published:
+				num_new = self.frame_buffer.refresh ()
+			if num_new == 0:
+				return None
+
+		with self._frames_published:
+			self.frame_buffer.validate ()
+			self.retention.apply (self.frame_buffer)
+			self.publish (self.frame_buffer.get_num_dropped () + len(self.frame_buffer))
+		return self.frame_buffer.get_frame (-1)
+
+
+	def get_frame (self, timeout=None):
 		""" 
 			PUBLIC: get_frame
 			-----------------
-			adds a frame to the current dataframe; returns the frame.
+			adds a frame to the frame buffer; returns the frame.
+			with several devices, returns as soon as any of them has
+			a new frame. returns None if timeout secs pass first.
+			in shared-memory mode, takes in all new frames at once
+			and returns the latest
 		"""
-		#==========[ Step 1: add data from all receivers to frame	]==========
-		new_frame = {}
-		for device_specific_frame in [dr.get_frame () for dr in self.device_receivers]:
-			new_frame.update (device_specific_frame)
+		if not self.shared_receiver is None:
+			return self.get_shared_frames (timeout)
 
-		#==========[ Step 2: add frame to frames_list	]==========
-		self.frames_list.append (new_frame)
-		return new_frame
+		#==========[ Step 1: single device - its frame is the frame	]==========
+		if len(self.device_receivers) == 1:
+			new_frame = self.device_receivers[0].get_frame (timeout=timeout)
+			if new_frame is None:
+				return None
+			new_frames = [dict(new_frame)]
+
+		#==========[ Step 1: several devices - store per device, as-of join	]==========
+		else:
+			device_frames = self.gather_device_frames (timeout)
+			if len(device_frames) == 0:
+				return None
+			new_frames = self.join_arrivals (device_frames)
+
+		#==========[ Step 2: add frames to frame buffer, apply retention, publish	]==========
+		with self._frames_published:
+			for new_frame in new_frames:
+				self.frame_buffer.append (new_frame)
+			self.retention.apply (self.frame_buffer)
+			self.publish (self.frame_buffer.get_num_dropped () + len(self.frame_buffer))
+		return new_frames[-1]
+
+
+	def join_arrivals (self, device_frames):
+		"""
+			PRIVATE: join_arrivals
+			----------------------
+			given (device_name, frame) pairs, adds each frame to its
+			device's stream in timestamp order and returns one joined
+			frame per distinct timestamp, carrying forward the latest
+			state of the devices that didn't deliver at it. frames
+			arriving older than the last joined one are joined at
+			that timestamp, so the sequence never goes backwards
+		"""
+		timestamps = self.frame_buffer.get_timestamps ()
+		last_timestamp = timestamps[-1] if len(timestamps) > 0 else None
+		new_frames = []
+		for device_name, device_frame in sorted (device_frames, key=lambda pair: get_frame_timestamp (pair[1])):
+			device_stream = self.device_streams[device_name]
+			device_stream.append (device_frame)
+			self.device_retention.apply (device_stream)
+
+			timestamp = device_stream.get_timestamps ()[-1]
+			if not last_timestamp is None and timestamp <= last_timestamp:
+				timestamp = last_timestamp
+				if len(new_frames) > 0:
+					new_frames.pop ()
+			new_frames.append (self.join_device_frames (timestamp))
+			last_timestamp = timestamp
+		return new_frames
+
+
+	def stream_chunks (self, size=None, max_latency=None):
+		"""
+			PUBLIC: stream_chunks
+			---------------------
+			gathers frames as they arrive and yields them as FrameChunks,
+			flushed when 'size' frames are in or max_latency secs after
+			the chunk's first frame arrived
+		"""
+		size = size or self.default_chunk_size
+		while not self._frames_exhausted.isSet ():
+
+			#=====[ Step 1: fill the chunk	]=====
+			chunk_start, deadline, num_frames = None, None, 0
+			while num_frames < size:
+				remaining = None if deadline is None else deadline - monotonic ()
+				if not remaining is None and remaining <= 0:
+					break
+				num_published = self.get_num_published ()
+				if self.get_frame (timeout=remaining) is None:
+					continue
+				if chunk_start is None:
+					chunk_start = num_published
+					deadline = None if max_latency is None else monotonic () + max_latency
+				num_frames += self.get_num_published () - num_published
+
+			#=====[ Step 2: flush whatever retention has left of it	]=====
+			start = max (chunk_start - self.frame_buffer.get_num_dropped (), 0)
+			yield self.frame_buffer.get_chunk (start, len(self.frame_buffer))
+
+
+	def get_device_stream (self, device_name):
+		"""
+			PUBLIC: get_device_stream
+			-------------------------
+			returns the FrameBuffer holding the (recent) frames of a
+			single device, at that device's own rate
+		"""
+		return self.device_streams[device_name]
 
 
 	def get_dataframe (self):
 		"""
 			PUBLIC: get_dataframe
 			---------------------
-			returns a dataframe-representation of self.frames_list
+			returns a dataframe-representation of self.frame_buffer
 			if there are no frames to speak of, returns None
 		"""
-		if len(self.frames_list) == 0:
-			return None
-		else:
-			return pd.DataFrame (self.frames_list)
+		return self.frame_buffer.get_dataframe ()
 
 
-	def get_window_df (self, timespan):
+	def get_time_index (self):
 
-		end_time 	= self.get_dataframe().iloc[-1]['timestamp']
-		start_time 	= end_time - sec_to_usec (timespan)
+		return TimeIndex (self.frame_buffer.get_timestamps ())
 
-		### Step 2: try to temporal subsample, return none if impossible ###
-		try:
-			return temporal_subsample (self.get_dataframe (), start_time, end_time)
-		except ValueError:
+
+	def get_frame_buffer (self):
+
+		return self.frame_buffer
+
+
+	def get_window_end (self):
+
+		return len(self.frame_buffer)
+
+
+	def get_window_df (self, timespan):
+
+		window_range = self.get_time_index ().get_last_n_seconds_range (timespan)
+		if window_range is None:
 			return None
+		return self.frame_buffer.get_dataframe (*window_range)
 
 
 	def trim_dataframe (self, start_index, end_index):
 
-		self.frames_list = self.frames_list [start_index:end_index]
+		with self._frames_published:
+			self.frame_buffer.trim (start_index, end_index)
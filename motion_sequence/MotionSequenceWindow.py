@@ -0,0 +1,105 @@
+#-------------------------------------------------- #
+# Class: MotionSequenceWindow
+# ---------------------------
+# light, read-only window over a contiguous run of
+# frames; wraps views into the underlying storage
+# rather than copying it.
+#-------------------------------------------------- #
+import pandas as pd
+from ..devices import skeleton
+
+
+# Function: read_only_view
+# ------------------------
+# returns a view of 'array' that can't be written through
+def read_only_view (array):
+
+	view = array.view ()
+	view.flags.writeable = False
+	return view
+
+
+class MotionSequenceWindow:
+	"""
+		Class: MotionSequenceWindow
+		---------------------------
+		frames [start_index:end_index] of a motion sequence. columns
+		are read-only numpy views; nothing is copied until
+		get_dataframe is called.
+	"""
+
+	def __init__ (self, _timestamps, _columns, _start_index=0):
+		"""
+			PUBLIC: Constructor
+			-------------------
+			given a timestamp array, a dict mapping column name to
+			array (all of the same length) and the position of the
+			first frame in the parent sequence, wraps them
+		"""
+		self.timestamps 	= read_only_view (_timestamps)
+		self.columns 		= {name: read_only_view (column) for name, column in _columns.iteritems ()}
+		self.start_index 	= _start_index
+		self.end_index 		= _start_index + len(_timestamps)
+
+
+	def __len__ (self):
+
+		return len(self.timestamps)
+
+
+	def __getitem__ (self, name):
+		"""
+			PUBLIC: __getitem__
+			-------------------
+			window['palm_x'] returns the palm_x view, mirroring
+			dataframe column access
+		"""
+		if name == 'timestamp':
+			return self.timestamps
+		return self.columns[name]
+
+
+	def __contains__ (self, name):
+
+		return name == 'timestamp' or name in self.columns
+
+
+	def get_column_names (self):
+		"""
+			PUBLIC: get_column_names
+			------------------------
+			returns the names of all (non-timestamp) columns
+		"""
+		return self.columns.keys ()
+
+
+	def get_skeleton (self):
+		"""
+			PUBLIC: get_skeleton
+			--------------------
+			returns (positions, orientations) views, frames x joints x
+			axes, or None if the window holds no skeleton data
+		"""
+		if not skeleton.positions_column in self.columns:
+			return None
+		return self.columns[skeleton.positions_column], self.columns[skeleton.orientations_column]
+
+
+	def get_timespan (self):
+		"""
+			PUBLIC: get_timespan
+			--------------------
+			returns the time spanned by this window, in usec
+		"""
+		return self.timestamps[-1] - self.timestamps[0]
+
+
+	def get_dataframe (self):
+		"""
+			PUBLIC: get_dataframe
+			---------------------
+			materializes this window as a dataframe (copies)
+		"""
+		data = skeleton.flatten_columns (self.columns)
+		data['timestamp'] = self.timestamps
+		return pd.DataFrame (data, index=range(self.start_index, self.end_index))
@@ -0,0 +1,184 @@
+#-------------------------------------------------- #
+# Class: RetentionPolicy
+# ----------------------
+# policies bounding how much of a live motion
+# sequence is kept in memory. applied to the
+# frame buffer after every new frame.
+#-------------------------------------------------- #
+import os
+import Queue
+import pickle
+import itertools
+import threading
+import numpy as np
+import pandas as pd
+
+
+segment_format = '%08d.dataframe' 		# SpillToDisk segment filenames, by number
+
+
+# Function: get_next_segment_number
+# ---------------------------------
+# returns the number after the highest of the spill segments
+# already in spill_dir (0 if none); other files are ignored
+def get_next_segment_number (spill_dir):
+
+	numbers = [int(os.path.splitext (f)[0]) for f in os.listdir (spill_dir) if f.endswith ('.dataframe') and os.path.splitext (f)[0].isdigit ()]
+	return max (numbers) + 1 if len(numbers) > 0 else 0
+
+
+class RetentionPolicy:
+	"""
+		Abstract Class: RetentionPolicy
+		-------------------------------
+		decides which of the oldest frames in a FrameBuffer to let go
+	"""
+
+	def apply (self, frame_buffer):
+		"""
+			PUBLIC, OVERRIDE: apply
+			-----------------------
+			called after each frame is appended; drops frames from
+			the front of frame_buffer as the policy requires
+		"""
+		pass
+
+
+
+class KeepAll (RetentionPolicy):
+	"""
+		Class: KeepAll
+		--------------
+		never drops anything (unbounded memory)
+	"""
+	pass
+
+
+
+class KeepLastFrames (RetentionPolicy):
+	"""
+		Class: KeepLastFrames
+		---------------------
+		keeps only the most recent num_frames frames
+	"""
+
+	def __init__ (self, _num_frames):
+
+		self.num_frames = _num_frames
+
+
+	def apply (self, frame_buffer):
+
+		frame_buffer.drop_front (len(frame_buffer) - self.num_frames)
+
+
+
+class KeepLastSeconds (RetentionPolicy):
+	"""
+		Class: KeepLastSeconds
+		----------------------
+		keeps only frames from the last 'secs' seconds
+	"""
+
+	def __init__ (self, _secs):
+
+		self.secs = _secs
+
+
+	def apply (self, frame_buffer):
+
+		timestamps = frame_buffer.get_timestamps ()
+		if len(timestamps) == 0:
+			return
+		cutoff = timestamps[-1] - self.secs*1000000
+		if timestamps[0] < cutoff:
+			frame_buffer.drop_front (int(np.searchsorted (timestamps, cutoff, side='left')))
+
+
+
+class SpillToDisk (RetentionPolicy):
+	"""
+		Class: SpillToDisk
+		------------------
+		once more than max_frames are held, copies the oldest frames
+		(all but the newest keep_frames) out and drops them from
+		memory; a background thread writes each such segment to
+		spill_dir as a pickled dataframe, so the capture thread
+		never waits on the disk. segments are numbered in order,
+		after any already in spill_dir
+	"""
+
+	def __init__ (self, _spill_dir, _max_frames, _keep_frames=None):
+
+		self.spill_dir 		= _spill_dir
+		self.max_frames 	= _max_frames
+		self.keep_frames 	= _keep_frames if not _keep_frames is None else _max_frames / 2
+		self.spilled_filepaths = []
+		if not os.path.isdir (self.spill_dir):
+			os.makedirs (self.spill_dir)
+		self.segment_numbers = itertools.count (get_next_segment_number (self.spill_dir))
+
+		self.segments 		= Queue.Queue ()
+		self.write_error 	= None
+		self.writer 		= threading.Thread (target=self.write_segments)
+		self.writer.daemon 	= True
+		self.writer.start ()
+
+
+	def apply (self, frame_buffer):
+
+		if len(frame_buffer) <= self.max_frames:
+			return
+
+		num_spilled = len(frame_buffer) - self.keep_frames
+		filepath = os.path.join (self.spill_dir, segment_format % self.segment_numbers.next ())
+		self.segments.put ((filepath, frame_buffer.get_window (0, num_spilled, copy=True)))
+		self.spilled_filepaths.append (filepath)
+		frame_buffer.drop_front (num_spilled)
+
+
+	def write_segments (self):
+		"""
+			PRIVATE: write_segments
+			-----------------------
+			body of the writer thread: pickles each queued segment
+			to its file, in order
+		"""
+		while True:
+			filepath, window = self.segments.get ()
+			try:
+				with open (filepath, 'wb') as f:
+					pickle.dump (window.get_dataframe (), f, pickle.HIGHEST_PROTOCOL)
+			except Exception as error:
+				self.write_error = error
+			finally:
+				self.segments.task_done ()
+
+
+	def flush (self):
+		"""
+			PUBLIC: flush
+			-------------
+			blocks until every segment spilled so far is on disk;
+			raises the writer's error if a write failed
+		"""
+		self.segments.join ()
+		if not self.write_error is None:
+			raise IOError ("Failed to spill segment: " + str(self.write_error))
+
+
+	def get_spilled_dataframe (self):
+		"""
+			PUBLIC: get_spilled_dataframe
+			-----------------------------
+			loads every spilled segment, in order, as one dataframe;
+			None if nothing has been spilled yet
+		"""
+		self.flush ()
+		if len(self.spilled_filepaths) == 0:
+			return None
+		dataframes = []
+		for filepath in self.spilled_filepaths:
+			with open (filepath, 'rb') as f:
+				dataframes.append (pickle.load (f))
+		return pd.concat (dataframes, ignore_index=True)
@@ -0,0 +1,85 @@
+#-------------------------------------------------- #
+# Class: RingFrameBuffer
+# ----------------------
+# FrameBuffer whose storage is a SharedFrameRing
+# filled by another process; reads are views into
+# the shared memory, nothing is copied.
+#-------------------------------------------------- #
+from .FrameBuffer import FrameBuffer
+
+
+class RingFrameBuffer (FrameBuffer):
+	"""
+		Class: RingFrameBuffer
+		----------------------
+		the live region is the frames in the ring as of the last
+		refresh (), less any dropped by retention. frames can't be
+		appended from this side; the ring's writer adds them.
+		reads are views that the writer may overwrite once enough
+		frames arrive: after reading, validate () drops (and
+		counts) any frames that were overwritten meanwhile
+	"""
+
+	def __init__ (self, _ring):
+		"""
+			PUBLIC: Constructor
+			-------------------
+			given a SharedFrameRing, wraps its columns
+		"""
+		FrameBuffer.__init__ (self, 1)
+		self.ring 			= _ring
+		self._capacity 		= 2 * _ring.capacity
+		self._timestamps 	= _ring.columns['timestamp']
+		self._column_order 	= [name for name, dtype, shape in _ring.layout if name != 'timestamp']
+		self._columns 		= {name: _ring.columns[name] for name in self._column_order}
+		self._owns_storage 	= False
+		self.refresh ()
+
+
+	def refresh (self):
+		"""
+			PUBLIC: refresh
+			---------------
+			takes in the frames written since the last refresh;
+			those the ring has overwritten since count as dropped.
+			returns the number of frames taken in
+		"""
+		previous_end = self._num_dropped + len(self)
+		self._start, self._end, num_written = self.ring.get_live_range (self._num_dropped)
+		self._num_dropped = num_written - len(self)
+		self._dataframe_cache = None
+		return num_written - previous_end
+
+
+	def get_num_overwritten (self):
+		"""
+			PUBLIC: get_num_overwritten
+			---------------------------
+			returns the number of frames at the front of the live
+			region that the ring's writer has overwritten (or is
+			overwriting) since the last refresh
+		"""
+		oldest_intact = self.ring.get_num_written () - self.ring.capacity + 1
+		return max (min (oldest_intact - self._num_dropped, len(self)), 0)
+
+
+	def validate (self):
+		"""
+			PUBLIC: validate
+			----------------
+			drops the frames get_num_overwritten counts, so they count
+			as dropped; returns how many there were. views read before
+			the call hold valid data only if it returns 0
+		"""
+		num_overwritten = self.get_num_overwritten ()
+		self.drop_front (num_overwritten)
+		return num_overwritten
+
+
+	def append (self, frame):
+		"""
+			PUBLIC, OVERRIDE: append
+			------------------------
+			not supported: frames are written by the ring's writer
+		"""
+		raise TypeError ("RingFrameBuffer is filled by its SharedFrameRing's writer")
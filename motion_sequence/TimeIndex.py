@@ -0,0 +1,95 @@
+#-------------------------------------------------- #
+# Class: TimeIndex
+# ----------------
+# sorted index over a motion sequence's timestamps;
+# answers nearest/range queries by binary search
+# instead of scanning the whole timestamp column.
+#-------------------------------------------------- #
+import numpy as np
+
+
+class TimeIndex:
+	"""
+		Class: TimeIndex
+		----------------
+		wraps a sorted (non-decreasing) array of timestamps. the
+		array is not copied, so an index over a live view stays
+		cheap to construct.
+	"""
+
+	def __init__ (self, _timestamps):
+		"""
+			PUBLIC: Constructor
+			-------------------
+			given a sorted array of timestamps (usec), builds the index
+		"""
+		self.timestamps = np.asarray (_timestamps)
+
+
+	def __len__ (self):
+
+		return len(self.timestamps)
+
+
+	def get_start_time (self):
+		"""
+			PUBLIC: get_start_time
+			----------------------
+			returns the earliest timestamp in the index
+		"""
+		return self.timestamps[0]
+
+
+	def get_end_time (self):
+		"""
+			PUBLIC: get_end_time
+			--------------------
+			returns the latest timestamp in the index
+		"""
+		return self.timestamps[-1]
+
+
+	def nearest (self, time):
+		"""
+			PUBLIC: nearest
+			---------------
+			returns the position of the timestamp closest to 'time';
+			ties go to the earlier position
+		"""
+		position = int(np.searchsorted (self.timestamps, time, side='left'))
+		if position == 0:
+			return 0
+		if position == len(self.timestamps):
+			return position - 1
+		if time - self.timestamps[position - 1] <= self.timestamps[position] - time:
+			return position - 1
+		return position
+
+
+	def get_range (self, start_time, end_time):
+		"""
+			PUBLIC: get_range
+			-----------------
+			returns (start, end) positions such that [start:end] covers
+			the timestamps nearest to start_time through those nearest
+			to end_time, inclusive
+		"""
+		start = self.nearest (start_time)
+		end = self.nearest (end_time) + 1
+		return start, max (start, end)
+
+
+	def get_last_n_seconds_range (self, secs):
+		"""
+			PUBLIC: get_last_n_seconds_range
+			--------------------------------
+			returns (start, end) positions covering the last 'secs'
+			seconds, or None if the index doesn't reach back that far
+		"""
+		if len(self.timestamps) == 0:
+			return None
+		end_time = self.timestamps[-1]
+		start_time = end_time - secs*1000000
+		if start_time < self.timestamps[0]:
+			return None
+		return self.get_range (start_time, end_time)
@@ -36,6 +36,7 @@ class PoseDetector (StoppableThread):
 		class for determining what pose a user is in
 	"""
 	_name = 'PoseDetector'
+	poll_interval = 0.1 	# secs to wait for new frames per iteration
 	
 
 	def __init__ (self, pose_dataset):
@@ -70,8 +71,10 @@ class PoseDetector (StoppableThread):
 			PUBLIC: attach 
 			--------------
 			sets this pose detector so that it watches motion_sequence 
+			through its own cursor
 		"""
 		self.motion_sequence = motion_sequence
+		self.cursor = motion_sequence.get_cursor ()
 
 
 	def load_classifiers (self):
@@ -89,11 +92,11 @@ class PoseDetector (StoppableThread):
 		self.classifiers['nn']  	= pickle.load (open(self.nn_filepath, 'r'))				
 	
 
-	# PRIVATE: _get_frame
-	# -------------------
-	# returns the most recent frame from self.motion_sequence
-	def _get_frame (self):
-		self._last_frame = self.motion_sequence.get_frame ()
+	# PRIVATE: _get_frames
+	# --------------------
+	# returns all frames from self.motion_sequence since the last call
+	def _get_frames (self):
+		return self.cursor.read_frames (timeout=self.poll_interval)
 
 
 	# Function: is_valid 
@@ -187,8 +190,17 @@ class PoseDetector (StoppableThread):
 	# performs classification on every frame that comes through
 	def thread_iteration (self):
 
-		#===[ get frame, check validity ]===
-		self._get_frame ()
+		for frame in self._get_frames ():
+			self._last_frame = frame
+			self.process_frame ()
+
+
+	# PRIVATE: process_frame
+	# ----------------------
+	# classifies self._last_frame and broadcasts any change
+	def process_frame (self):
+
+		#===[ check validity ]===
 		if not self.is_valid (self._last_frame):
 			return
 
@@ -1,5 +1,8 @@
 from ..threads.StoppableThread import StoppableThread
+from ..threads.clock import monotonic
 from ..motion_sequence.MotionSequence import RealTimeMotionSequence
+from ..motion_sequence.RetentionPolicy import KeepLastSeconds
+from .RecordingWriter import RecordingWriter
 
 class Recorder (StoppableThread):
 	"""
@@ -8,14 +11,22 @@ class Recorder (StoppableThread):
 		class for recording motion sequences 
 	"""
 	_name = "Recorder"
+	flush_secs = 1.0 		# secs between chunks handed to the writer, when streaming
+	retention_secs = 10 	# secs of frames kept in memory, when streaming
 
 
 	#==========[ Initialization	]==========
-	def __init__ (self, _device_receivers, _verbose=True):
+	def __init__ (self, _device_receivers, _verbose=True, _transport_profile=None, _path=None, _max_segment_bytes=64*1024*1024, _max_segment_secs=300):
 		""" 
 			PUBLIC: Constructor
 			-------------------
-			given a list of device receivers (or a single device receiver), initializes
+			given a list of device receivers (or a single device receiver), initializes.
+			given a _transport_profile, switches the receivers to it; by default
+			their policy is left alone and dropped frames are only counted (see
+			get_capture_stats). 'lossless' is opt-in: it blocks receivers on a full
+			queue, which back-pressures the DeviceHub and every device on it.
+			given a _path, streams the capture there (see RecordingWriter) as it
+			goes, keeping only the last retention_secs of it in memory
 		"""
 		#=====[ Step 1: initialize StoppableThread	]=====
 		StoppableThread.__init__ (self, self._name)
@@ -23,8 +34,21 @@ class Recorder (StoppableThread):
 		#=====[ Step 2: set optional parameters ]=====
 		self._verbose = _verbose
 
-		#=====[ Step 3: create motion sequence to write to	]=====
-		self.motion_sequence = RealTimeMotionSequence (_device_receivers)
+		#=====[ Step 3: create motion sequence to write to, writer	]=====
+		if _path is None:
+			self.writer = None
+			self.motion_sequence = RealTimeMotionSequence (_device_receivers)
+		else:
+			self.writer = RecordingWriter (_path, _max_segment_bytes, _max_segment_secs)
+			self.motion_sequence = RealTimeMotionSequence (_device_receivers, _retention=KeepLastSeconds (self.retention_secs))
+		self.num_streamed = 0
+		self.num_lost = 0
+		self.last_flush = monotonic ()
+
+		#=====[ Step 4: set receivers' transport profile	]=====
+		if not _transport_profile is None:
+			for dr in self.motion_sequence.device_receivers:
+				dr.set_transport_profile (_transport_profile)
 
 
 	def is_recording (self):
@@ -36,27 +60,104 @@ class Recorder (StoppableThread):
 		return self._stop.isSet ()
 
 
+	def run (self):
+		"""
+			PUBLIC, OVERRIDE: run
+			---------------------
+			records until stopped; when streaming, runs the writer
+			alongside and, once stopped, hands it the last frames and
+			waits for it to finish
+		"""
+		if self.writer is None:
+			return StoppableThread.run (self)
+		self.writer.start ()
+		StoppableThread.run (self)
+		self.flush ()
+		self.writer.stop ()
+		self.writer.join ()
+
+
 	def thread_iteration (self):
 		"""
 			PRIVATE: thread_iteration
 			-------------------------
 			on each thread iteration, adds a new frame to motion sequence
-			optionally prints out info on most recent frame, if appropriate
+			optionally prints out info on most recent frame, if appropriate.
+			when streaming, hands frames to the writer every flush_secs
 		"""
-		self.motion_sequence.get_frame ()
-		if self._verbose:
-			print self.motion_sequence.get_dataframe ().iloc[-1]
+		new_frame = self.motion_sequence.get_frame (timeout=self.flush_secs)
+		if self._verbose and not new_frame is None:
+			print new_frame
+		if not self.writer is None and monotonic () - self.last_flush >= self.flush_secs:
+			self.flush ()
+
+
+	def flush (self):
+		"""
+			PRIVATE: flush
+			--------------
+			hands every frame captured since the last flush to the
+			writer; counts any that retention already let go as lost
+		"""
+		self.last_flush = monotonic ()
+		frame_buffer = self.motion_sequence.get_frame_buffer ()
+		with self.motion_sequence._frames_published:
+			start_index = self.num_streamed - frame_buffer.get_num_dropped ()
+			if start_index < 0:
+				self.num_lost -= start_index
+				start_index = 0
+			self.writer.write_frames (frame_buffer, start_index, len(frame_buffer))
+			self.num_streamed = frame_buffer.get_num_dropped () + len(frame_buffer)
 
 
 	def get_motion_sequence (self):
 		""" 
 			PUBLIC: get_motion_sequence
 			---------------------------
-			returns the product of this recording as a motion sequence
+			returns the product of this recording as a motion sequence.
+			when streaming, it holds only the last retention_secs; the
+			whole capture is at get_stream_path () (see load_stream)
 		"""
 		return self.motion_sequence
 
 
+	def get_stream_path (self):
+		"""
+			PUBLIC: get_stream_path
+			-----------------------
+			returns the path the capture streams to; None if not streaming
+		"""
+		if self.writer is None:
+			return None
+		return self.writer.path
+
+
+	def get_writer_stats (self):
+		"""
+			PUBLIC: get_writer_stats
+			------------------------
+			returns frames/bytes/segments written, chunks queued,
+			frames dropped by the writer's full queue and frames lost
+			(let go by retention) before they could be handed over;
+			None if not streaming
+		"""
+		if self.writer is None:
+			return None
+		stats = self.writer.get_stats ()
+		stats['lost'] = self.num_lost
+		return stats
+
+
+	def get_capture_stats (self):
+		"""
+			PUBLIC: get_capture_stats
+			-------------------------
+			returns dict Map: device name -> that receiver's frame
+			queue stats (frames enqueued, delivered, dropped)
+		"""
+		return {dr.device_name: dr.get_queue_stats () for dr in self.motion_sequence.device_receivers}
+
+
 
 
 
@@ -0,0 +1,250 @@
+#-------------------------------------------------- #
+# Class: RecordingWriter
+# ----------------------
+# background writer streaming captured frames to an
+# append-only chunked recording: a directory of
+# segment files, each a run of length-prefixed
+# pickled column chunks. readable while being
+# written; a crash loses at most the last chunk.
+#-------------------------------------------------- #
+import os
+import struct
+import pickle
+import Queue
+import numpy as np
+from ..threads.StoppableThread import StoppableThread
+from ..motion_sequence.FrameBuffer import FrameBuffer, get_fill_value, get_fillable_dtype
+
+
+stream_extension 	= '.stream'
+segment_magic 		= 'NIS1'
+chunk_header 		= struct.Struct ('<I') 		# pickled chunk length, in bytes
+
+
+# Function: get_segment_filename
+# ------------------------------
+# returns the name of segment number 'index'
+def get_segment_filename (index):
+
+	return 'segment_' + str(index).zfill (6) + '.chunks'
+
+
+# Function: get_segment_filepaths
+# -------------------------------
+# returns the segment files of the stream at path, in order
+def get_segment_filepaths (path):
+
+	return [os.path.join (path, f) for f in sorted (os.listdir (path)) if f.startswith ('segment_')]
+
+
+# Function: get_next_segment_index
+# ---------------------------------
+# returns the index after the highest of the segments already in
+# the stream at path (0 if none)
+def get_next_segment_index (path):
+
+	indices = [int(f[len('segment_'):-len('.chunks')]) for f in os.listdir (path) if f.startswith ('segment_') and f.endswith ('.chunks') and f[len('segment_'):-len('.chunks')].isdigit ()]
+	return max (indices) + 1 if len(indices) > 0 else 0
+
+
+# Function: read_chunks
+# ---------------------
+# yields the chunks ({'timestamp', 'columns': Map: column name ->
+# array, 'column_order'}) of the stream at path, oldest first. an
+# incomplete chunk ends its segment, so it is safe on a stream
+# still being written (or cut short by a crash)
+def read_chunks (path):
+
+	for filepath in get_segment_filepaths (path):
+		with open (filepath, 'rb') as f:
+			if f.read (len(segment_magic)) != segment_magic:
+				continue
+			while True:
+				header = f.read (chunk_header.size)
+				if len(header) < chunk_header.size:
+					break
+				length, = chunk_header.unpack (header)
+				payload = f.read (length)
+				if len(payload) < length:
+					break
+				yield pickle.loads (payload)
+
+
+# Function: load_stream
+# ---------------------
+# reads every complete chunk of the stream at path into one
+# FrameBuffer; columns missing from some chunks are filled in
+def load_stream (path):
+
+	chunks = list(read_chunks (path))
+	column_order = []
+	for chunk in chunks:
+		column_order += [name for name in chunk.get ('column_order', []) if not name in column_order]
+
+	columns = {}
+	for name in column_order:
+		template = [chunk['columns'][name] for chunk in chunks if name in chunk['columns']][0]
+		parts = []
+		for chunk in chunks:
+			if name in chunk['columns']:
+				parts.append (chunk['columns'][name])
+			else:
+				dtype = get_fillable_dtype (template.dtype)
+				part = np.empty ((len(chunk['timestamp']),) + template.shape[1:], dtype=dtype)
+				part.fill (get_fill_value (dtype))
+				parts.append (part)
+		columns[name] = np.concatenate (parts)
+
+	timestamps = np.concatenate ([chunk['timestamp'] for chunk in chunks]) if len(chunks) > 0 else np.empty (0)
+	return FrameBuffer.from_arrays (timestamps, columns, column_order)
+
+
+
+class RecordingWriter (StoppableThread):
+	"""
+		Class: RecordingWriter
+		----------------------
+		chunks are handed over with write_frames (copied out of the
+		capture's frame buffer, so it can drop them right after) and
+		written by this thread, each flushed as it lands. a new
+		segment is started once the current one passes
+		_max_segment_bytes or spans more than _max_segment_secs.
+		at most _max_queued_chunks wait to be written; past that,
+		write_frames drops the chunk (counting its frames) unless
+		_block_when_full, in which case it waits for room
+	"""
+	_name = "RecordingWriter"
+	queue_timeout = 0.1 	# secs; bounds how long stop () takes
+
+
+	def __init__ (self, _path, _max_segment_bytes=64*1024*1024, _max_segment_secs=300, _max_queued_chunks=64, _block_when_full=False):
+		"""
+			PUBLIC: Constructor
+			-------------------
+			given the path of the stream (a directory, created if
+			needed), segment limits and queue bound/overflow policy
+		"""
+		StoppableThread.__init__ (self, self._name)
+		self.path 				= _path
+		self.max_segment_bytes 	= _max_segment_bytes
+		self.max_segment_secs 	= _max_segment_secs
+		if not os.path.isdir (self.path):
+			os.makedirs (self.path)
+
+		self.chunks 			= Queue.Queue (maxsize=_max_queued_chunks)
+		self.block_when_full 	= _block_when_full
+		self.num_dropped 		= 0
+		self.segment 			= None
+		self.num_segments 		= get_next_segment_index (self.path)
+		self.segment_bytes 		= 0
+		self.segment_start 		= None
+
+		self.num_frames 		= 0
+		self.num_bytes 			= 0
+
+
+	def write_frames (self, frame_buffer, start_index, end_index):
+		"""
+			PUBLIC: write_frames
+			--------------------
+			queues a copy of frames [start_index:end_index] of
+			frame_buffer's live region for writing; returns false if
+			the queue was full and they were dropped
+		"""
+		if end_index <= start_index:
+			return True
+		column_order = frame_buffer.get_column_names ()
+		chunk = 	{
+						'timestamp': frame_buffer.get_timestamps ()[start_index:end_index].copy (),
+						'columns': {name: frame_buffer.get_column (name)[start_index:end_index].copy () for name in column_order},
+						'column_order': column_order
+					}
+		try:
+			self.chunks.put (chunk, block=self.block_when_full)
+		except Queue.Full:
+			self.num_dropped += end_index - start_index
+			return False
+		return True
+
+
+	def thread_iteration (self):
+		"""
+			PRIVATE: thread_iteration
+			-------------------------
+			writes the next queued chunk, if any
+		"""
+		try:
+			chunk = self.chunks.get (timeout=self.queue_timeout)
+		except Queue.Empty:
+			return
+		self.write_chunk (chunk)
+
+
+	def run (self):
+		"""
+			PUBLIC, OVERRIDE: run
+			---------------------
+			writes chunks until stopped, then whatever is still
+			queued, and closes the segment
+		"""
+		StoppableThread.run (self)
+		while not self.chunks.empty ():
+			self.write_chunk (self.chunks.get ())
+		if not self.segment is None:
+			self.segment.close ()
+			self.segment = None
+
+
+	def write_chunk (self, chunk):
+		"""
+			PRIVATE: write_chunk
+			--------------------
+			appends a chunk to the current segment (rotating first if
+			it is over its limits) and flushes it to disk
+		"""
+		#=====[ Step 1: rotate if needed	]=====
+		timestamps = chunk['timestamp']
+		if self.segment is None or self.segment_bytes >= self.max_segment_bytes or \
+			(timestamps[-1] - self.segment_start) / 1000000.0 > self.max_segment_secs:
+			self.open_segment (timestamps[0])
+
+		#=====[ Step 2: length-prefixed pickle, flushed	]=====
+		payload = pickle.dumps (chunk, pickle.HIGHEST_PROTOCOL)
+		self.segment.write (chunk_header.pack (len(payload)) + payload)
+		self.segment.flush ()
+		os.fsync (self.segment.fileno ())
+		self.segment_bytes += chunk_header.size + len(payload)
+		self.num_bytes += chunk_header.size + len(payload)
+		self.num_frames += len(timestamps)
+
+
+	def open_segment (self, start_timestamp):
+		"""
+			PRIVATE: open_segment
+			---------------------
+			closes the current segment, starts the next
+		"""
+		if not self.segment is None:
+			self.segment.close ()
+		self.segment = open (os.path.join (self.path, get_segment_filename (self.num_segments)), 'wb')
+		self.segment.write (segment_magic)
+		self.num_segments += 1
+		self.segment_bytes = len(segment_magic)
+		self.segment_start = start_timestamp
+
+
+	def get_stats (self):
+		"""
+			PUBLIC: get_stats
+			-----------------
+			returns frames/bytes written, segments started, chunks
+			still waiting to be written and frames dropped because
+			the queue was full
+		"""
+		return 	{
+					'frames': self.num_frames,
+					'dropped': self.num_dropped,
+					'bytes': self.num_bytes,
+					'segments': self.num_segments,
+					'queued_chunks': self.chunks.qsize ()
+				}
@@ -0,0 +1,7 @@
+#-------------------------------------------------- #
+# Package: tests
+# --------------
+# unit tests; run from the directory containing
+# NIPy with:
+#	python -m unittest discover -s NIPy/tests -t .
+#-------------------------------------------------- #
@@ -0,0 +1,147 @@
+#-------------------------------------------------- #
+# Tests: FeatureCache
+# -------------------
+# features are reused until the recording or the
+# extractor changes, and survive reopening the cache.
+#-------------------------------------------------- #
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from ..file_storage.FeatureCache import FeatureCache
+
+
+class CountingExtractor:
+	"""
+		Class: CountingExtractor
+		------------------------
+		extracts each column's mean, times 'scale'; counts the
+		recordings it extracts from
+	"""
+	feature_version = 1
+	cacheable = True
+
+	def __init__ (self, _scale=1.0):
+
+		self.scale = _scale
+		self.num_extracted = 0
+
+
+	def get_cache_params (self):
+
+		return {'scale': self.scale}
+
+
+	def extract (self, dataframe):
+
+		self.num_extracted += 1
+		return dataframe.values.mean (axis=0) * self.scale
+
+
+# Function: make_dataframe
+# ------------------------
+# returns a small recording whose contents depend on 'offset'
+def make_dataframe (offset=0.0, num_frames=20):
+
+	return pd.DataFrame ({'palm_x': np.arange (num_frames) + offset, 'palm_y': np.ones (num_frames) * offset})
+
+
+class TestFeatureCache (unittest.TestCase):
+
+	def setUp (self):
+
+		self.data_dir = tempfile.mkdtemp ()
+		self.db_path = os.path.join (self.data_dir, 'features.sqlite')
+		self.cache = FeatureCache (self.db_path)
+
+
+	def tearDown (self):
+
+		self.cache.connection.close ()
+		shutil.rmtree (self.data_dir)
+
+
+	def test_hit (self):
+
+		extractor = CountingExtractor ()
+		dataframes = [make_dataframe (0), make_dataframe (1), make_dataframe (0)]
+		first = self.cache.extract_all (extractor, dataframes)
+		self.assertEqual (extractor.num_extracted, 2)
+
+		second = self.cache.extract_all (extractor, dataframes)
+		self.assertEqual (extractor.num_extracted, 2)
+		for features, expected in zip (second, first):
+			np.testing.assert_array_equal (features, expected)
+		stats = self.cache.get_stats ()
+		self.assertEqual ((stats['hits'], stats['misses'], stats['entries']), (4, 2, 2))
+
+
+	def test_changed_recording (self):
+
+		extractor = CountingExtractor ()
+		dataframe = make_dataframe (0)
+		self.cache.extract_all (extractor, [dataframe])
+		dataframe.loc[3, 'palm_x'] = 100.0
+		features, = self.cache.extract_all (extractor, [dataframe])
+		self.assertEqual (extractor.num_extracted, 2)
+		np.testing.assert_array_equal (features, dataframe.values.mean (axis=0))
+
+
+	def test_changed_extractor (self):
+
+		dataframes = [make_dataframe (0), make_dataframe (1)]
+		self.cache.extract_all (CountingExtractor (), dataframes)
+
+		#=====[ new parameters: re-extracted, old entries dropped	]=====
+		extractor = CountingExtractor (_scale=2.0)
+		features = self.cache.extract_all (extractor, dataframes)
+		self.assertEqual (extractor.num_extracted, 2)
+		np.testing.assert_array_equal (features[1], dataframes[1].values.mean (axis=0) * 2)
+		stats = self.cache.get_stats ()
+		self.assertEqual ((stats['invalidated'], stats['entries']), (2, 2))
+
+		#=====[ new version: the same	]=====
+		extractor.feature_version = 2
+		self.cache.extract_all (extractor, dataframes)
+		self.assertEqual (extractor.num_extracted, 4)
+		self.assertEqual (self.cache.get_stats ()['invalidated'], 4)
+
+
+	def test_not_cacheable (self):
+
+		extractor = CountingExtractor ()
+		extractor.cacheable = False
+		self.cache.extract_all (extractor, [make_dataframe (0)])
+		self.cache.extract_all (extractor, [make_dataframe (0)])
+		self.assertEqual (extractor.num_extracted, 2)
+		self.assertEqual (self.cache.get_stats ()['entries'], 0)
+
+
+	def test_extract_dict (self):
+
+		extractor = CountingExtractor ()
+		features = self.cache.extract_dict (extractor, {'swirl': [make_dataframe (0), make_dataframe (1)], 'wave': [make_dataframe (2)]})
+		self.assertEqual (sorted (features.keys ()), ['swirl', 'wave'])
+		self.assertEqual ([len(features['swirl']), len(features['wave'])], [2, 1])
+		np.testing.assert_array_equal (features['wave'][0], make_dataframe (2).values.mean (axis=0))
+
+
+	def test_persistent (self):
+
+		self.cache.extract_all (CountingExtractor (), [make_dataframe (0)])
+		self.cache.connection.close ()
+
+		self.cache = FeatureCache (self.db_path)
+		extractor = CountingExtractor ()
+		self.cache.extract_all (extractor, [make_dataframe (0)])
+		self.assertEqual (extractor.num_extracted, 0)
+
+		self.cache.clear ()
+		self.cache.extract_all (extractor, [make_dataframe (0)])
+		self.assertEqual (extractor.num_extracted, 1)
+
+
+if __name__ == '__main__':
+	unittest.main ()
@@ -0,0 +1,147 @@
+#-------------------------------------------------- #
+# Tests: FrameBuffer
+# ------------------
+# sliding the live region in place, growing, dropping
+# frames from the front and filling missing entries.
+#-------------------------------------------------- #
+import unittest
+import numpy as np
+from ..motion_sequence.FrameBuffer import FrameBuffer
+
+
+# Function: append_frames
+# -----------------------
+# appends frames [start:end] to frame_buffer, each with a float,
+# an object and a skeleton-like (2d) column
+def append_frames (frame_buffer, start, end):
+
+	for i in range(start, end):
+		frame_buffer.append ({'timestamp': i, 'palm_x': float(i), 'gesture': 'g' + str(i), 'joints': np.full ((2, 3), i, dtype=np.float32)})
+
+
+class TestFrameBuffer (unittest.TestCase):
+
+	def test_append (self):
+
+		frame_buffer = FrameBuffer (4)
+		append_frames (frame_buffer, 0, 10)
+		self.assertEqual (len(frame_buffer), 10)
+		np.testing.assert_array_equal (frame_buffer.get_timestamps (), np.arange (10))
+		np.testing.assert_array_equal (frame_buffer.get_column ('palm_x'), np.arange (10))
+		self.assertEqual (frame_buffer.get_column ('joints').dtype, np.float32)
+		self.assertEqual (frame_buffer.get_frame (-1)['gesture'], 'g9')
+
+
+	def test_drop_front (self):
+
+		frame_buffer = FrameBuffer (16)
+		append_frames (frame_buffer, 0, 10)
+		frame_buffer.drop_front (3)
+		self.assertEqual (len(frame_buffer), 7)
+		self.assertEqual (frame_buffer.get_num_dropped (), 3)
+		np.testing.assert_array_equal (frame_buffer.get_timestamps (), np.arange (3, 10))
+		self.assertEqual (frame_buffer.get_frame (0)['palm_x'], 3.0)
+
+		#=====[ dropped objects are released	]=====
+		self.assertTrue (all ([g is None for g in frame_buffer._columns['gesture'][:3]]))
+
+		#=====[ dropping more than there is empties it	]=====
+		frame_buffer.drop_front (100)
+		self.assertEqual (len(frame_buffer), 0)
+		self.assertEqual (frame_buffer.get_num_dropped (), 10)
+
+
+	def test_slide_in_place (self):
+
+		frame_buffer = FrameBuffer (8)
+		append_frames (frame_buffer, 0, 8)
+		timestamps = frame_buffer._timestamps
+		frame_buffer.drop_front (5)
+		append_frames (frame_buffer, 8, 10)
+
+		#=====[ at least half was dead: same arrays, live region moved down	]=====
+		self.assertTrue (frame_buffer._timestamps is timestamps)
+		self.assertEqual (frame_buffer._capacity, 8)
+		self.assertEqual (frame_buffer._start, 0)
+		np.testing.assert_array_equal (frame_buffer.get_timestamps (), np.arange (5, 10))
+		np.testing.assert_array_equal (frame_buffer.get_column ('palm_x'), np.arange (5, 10))
+		np.testing.assert_array_equal (frame_buffer.get_column ('joints')[:, 0, 0], np.arange (5, 10))
+		self.assertEqual ([frame_buffer.get_frame (i)['gesture'] for i in range(5)], ['g5', 'g6', 'g7', 'g8', 'g9'])
+		self.assertTrue (all ([g is None for g in frame_buffer._columns['gesture'][5:]]))
+
+
+	def test_grow (self):
+
+		frame_buffer = FrameBuffer (8)
+		append_frames (frame_buffer, 0, 8)
+		frame_buffer.drop_front (1)
+		append_frames (frame_buffer, 8, 9)
+
+		#=====[ too little was dead to slide: doubled	]=====
+		self.assertEqual (frame_buffer._capacity, 16)
+		self.assertEqual (frame_buffer.get_num_dropped (), 1)
+		np.testing.assert_array_equal (frame_buffer.get_timestamps (), np.arange (1, 9))
+		self.assertEqual (frame_buffer.get_frame (0)['gesture'], 'g1')
+
+
+	def test_borrowed_storage (self):
+
+		timestamps, palm_x = np.arange (4, dtype=np.float64), np.arange (4, dtype=np.float64)
+		frame_buffer = FrameBuffer.from_arrays (timestamps, {'palm_x': palm_x})
+		self.assertTrue (frame_buffer._timestamps is timestamps)
+		frame_buffer.drop_front (3)
+		frame_buffer.append ({'timestamp': 4, 'palm_x': 4.0})
+
+		#=====[ appending copies rather than writing into the wrapped arrays	]=====
+		np.testing.assert_array_equal (timestamps, np.arange (4))
+		np.testing.assert_array_equal (palm_x, np.arange (4))
+		np.testing.assert_array_equal (frame_buffer.get_column ('palm_x'), [3, 4])
+
+
+	def test_missing_entries (self):
+
+		frame_buffer = FrameBuffer ()
+		frame_buffer.append ({'timestamp': 0, 'palm_x': 0.0, 'counts': np.arange (3)})
+		frame_buffer.append ({'timestamp': 1, 'gesture': 'swirl', 'steps': np.arange (2)})
+
+		#=====[ float: nan; late object: None	]=====
+		self.assertTrue (np.isnan (frame_buffer.get_column ('palm_x')[1]))
+		self.assertEqual (list(frame_buffer.get_column ('gesture')), [None, 'swirl'])
+
+		#=====[ int columns missing an entry, or first seen late, become float	]=====
+		counts, steps = frame_buffer.get_column ('counts'), frame_buffer.get_column ('steps')
+		self.assertEqual (counts.dtype.kind, 'f')
+		np.testing.assert_array_equal (counts[0], [0, 1, 2])
+		self.assertTrue (np.isnan (counts[1]).all ())
+		self.assertEqual (steps.dtype.kind, 'f')
+		self.assertTrue (np.isnan (steps[0]).all ())
+		np.testing.assert_array_equal (steps[1], [0, 1])
+
+
+	def test_window_views (self):
+
+		frame_buffer = FrameBuffer ()
+		append_frames (frame_buffer, 0, 6)
+		frame_buffer.drop_front (2)
+		window = frame_buffer.get_window (1, 3)
+		np.testing.assert_array_equal (window['timestamp'], [3, 4])
+		np.testing.assert_array_equal (window['palm_x'], [3, 4])
+		self.assertRaises (ValueError, window['palm_x'].__setitem__, 0, 1.0)
+
+
+	def test_dataframe_not_shared (self):
+
+		frame_buffer = FrameBuffer ()
+		append_frames (frame_buffer, 0, 4)
+		first = frame_buffer.get_dataframe ()
+		first['palm_x'] = -1.0
+		first['extra'] = 0
+
+		#=====[ the cached dataframe is as built	]=====
+		second = frame_buffer.get_dataframe ()
+		self.assertFalse ('extra' in second.columns)
+		np.testing.assert_array_equal (second['palm_x'].values, np.arange (4))
+
+
+if __name__ == '__main__':
+	unittest.main ()
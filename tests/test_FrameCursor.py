@@ -0,0 +1,133 @@
+#-------------------------------------------------- #
+# Tests: FrameCursor
+# ------------------
+# cursor positions stay absolute as retention drops
+# frames from the front of the sequence's buffer.
+#-------------------------------------------------- #
+import unittest
+import numpy as np
+from ..motion_sequence.FrameBuffer import FrameBuffer
+from ..motion_sequence.MotionSequence import MotionSequence
+
+
+class BufferedSequence (MotionSequence):
+	"""
+		Class: BufferedSequence
+		-----------------------
+		motion sequence over a FrameBuffer the test fills and
+		drops from directly, publishing as RealTimeMotionSequence
+		does
+	"""
+
+	def __init__ (self):
+
+		MotionSequence.__init__ (self)
+		self.frame_buffer = FrameBuffer (8)
+
+
+	def get_frame_buffer (self):
+
+		return self.frame_buffer
+
+
+	def add_frames (self, num_frames, num_dropped=0):
+
+		with self._frames_published:
+			start = self.get_num_published ()
+			for i in range(start, start + num_frames):
+				self.frame_buffer.append ({'timestamp': i, 'palm_x': float(i)})
+			self.frame_buffer.drop_front (num_dropped)
+			self.publish (self.frame_buffer.get_num_dropped () + len(self.frame_buffer))
+
+
+class TestFrameCursor (unittest.TestCase):
+
+	def test_read (self):
+
+		motion_sequence = BufferedSequence ()
+		cursor = motion_sequence.get_cursor (0)
+		motion_sequence.add_frames (5)
+		window = cursor.read (block=False)
+		np.testing.assert_array_equal (window['timestamp'], np.arange (5))
+		self.assertEqual (cursor.position, 5)
+		self.assertEqual (cursor.get_num_pending (), 0)
+		self.assertTrue (cursor.read (block=False) is None)
+
+
+	def test_starts_at_now (self):
+
+		motion_sequence = BufferedSequence ()
+		motion_sequence.add_frames (5)
+		cursor = motion_sequence.get_cursor ()
+		self.assertEqual (cursor.position, 5)
+		motion_sequence.add_frames (2)
+		self.assertEqual ([f['timestamp'] for f in cursor.read_frames (block=False)], [5, 6])
+
+
+	def test_position_across_drop_front (self):
+
+		motion_sequence = BufferedSequence ()
+		cursor = motion_sequence.get_cursor (0)
+		motion_sequence.add_frames (6)
+		cursor.read (block=False)
+
+		#=====[ only frames already read are dropped: nothing skipped	]=====
+		motion_sequence.add_frames (4, num_dropped=6)
+		window = cursor.read (block=False)
+		np.testing.assert_array_equal (window['timestamp'], np.arange (6, 10))
+		np.testing.assert_array_equal (window['palm_x'], np.arange (6, 10))
+		self.assertEqual (cursor.position, 10)
+		self.assertEqual (cursor.num_skipped, 0)
+
+
+	def test_skips_dropped_frames (self):
+
+		motion_sequence = BufferedSequence ()
+		cursor = motion_sequence.get_cursor (0)
+		motion_sequence.add_frames (10, num_dropped=4)
+
+		#=====[ frames dropped before they were read are counted, not returned	]=====
+		window = cursor.read (block=False)
+		np.testing.assert_array_equal (window['timestamp'], np.arange (4, 10))
+		self.assertEqual (cursor.num_skipped, 4)
+		self.assertEqual (cursor.position, 10)
+
+
+	def test_independent_cursors (self):
+
+		motion_sequence = BufferedSequence ()
+		fast, slow = motion_sequence.get_cursor (0), motion_sequence.get_cursor (0)
+		motion_sequence.add_frames (3)
+		fast.read (block=False)
+
+		#=====[ the buffer slides while slow lags; its frames still line up	]=====
+		motion_sequence.add_frames (7, num_dropped=1)
+		self.assertEqual ([f['timestamp'] for f in fast.read_frames (block=False)], range(3, 10))
+		self.assertEqual ([f['timestamp'] for f in slow.read_frames (block=False)], range(1, 10))
+		self.assertEqual ((fast.num_skipped, slow.num_skipped), (0, 1))
+
+
+	def test_window_is_a_copy (self):
+
+		motion_sequence = BufferedSequence ()
+		cursor = motion_sequence.get_cursor (0)
+		motion_sequence.add_frames (8)
+		window = cursor.read (block=False)
+
+		#=====[ sliding the buffer in place leaves the window as read	]=====
+		motion_sequence.add_frames (0, num_dropped=8)
+		motion_sequence.add_frames (4)
+		self.assertEqual (motion_sequence.frame_buffer._capacity, 8)
+		np.testing.assert_array_equal (window['palm_x'], np.arange (8))
+
+
+	def test_wait_timeout (self):
+
+		motion_sequence = BufferedSequence ()
+		cursor = motion_sequence.get_cursor ()
+		self.assertFalse (cursor.wait (0.01))
+		self.assertTrue (cursor.read (timeout=0.01) is None)
+
+
+if __name__ == '__main__':
+	unittest.main ()
@@ -0,0 +1,141 @@
+#-------------------------------------------------- #
+# Tests: RecordingCache
+# ---------------------
+# hits, reloads when a file changes, explicit
+# invalidation, LRU eviction within the budget and
+# memory-mapped recordings kept out of it.
+#-------------------------------------------------- #
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from ..motion_sequence.FrameBuffer import FrameBuffer
+from ..file_storage.RecordingCodec import encode_recording
+from ..file_storage.ColumnarRecording import save_columnar
+from ..file_storage.RecordingCache import RecordingCache
+
+
+# Function: make_frame_buffer
+# ---------------------------
+# returns a FrameBuffer of num_frames frames with one float column
+# (16 bytes a frame, timestamps included)
+def make_frame_buffer (num_frames):
+
+	timestamps = np.arange (num_frames, dtype=np.float64) * 33333
+	return FrameBuffer.from_arrays (timestamps, {'palm_x': np.arange (num_frames, dtype=np.float64)})
+
+
+# Function: bump_mtime
+# --------------------
+# moves path's mtime forward, so a change registers even within
+# the filesystem's mtime resolution
+def bump_mtime (path, secs=10):
+
+	mtime = os.path.getmtime (path) + secs
+	os.utime (path, (mtime, mtime))
+
+
+class TestRecordingCache (unittest.TestCase):
+
+	def setUp (self):
+
+		self.data_dir = tempfile.mkdtemp ()
+
+
+	def tearDown (self):
+
+		shutil.rmtree (self.data_dir)
+
+
+	def write_recording (self, name, num_frames):
+
+		path = os.path.join (self.data_dir, name + '.zrecording')
+		encode_recording (make_frame_buffer (num_frames), path)
+		return path
+
+
+	def test_hit (self):
+
+		path = self.write_recording ('first', 10)
+		cache = RecordingCache ()
+		first, second = cache.get_frame_buffer (path), cache.get_frame_buffer (path)
+		stats = cache.get_stats ()
+		self.assertEqual ((stats['hits'], stats['misses'], stats['entries'], stats['bytes']), (1, 1, 1, 160))
+		self.assertTrue (cache.contains (path))
+
+		#=====[ callers get separate views of read-only arrays	]=====
+		first.trim (2, 5)
+		self.assertEqual ((len(first), len(second)), (3, 10))
+		self.assertRaises (ValueError, second.get_column ('palm_x').__setitem__, 0, 1.0)
+		self.assertRaises (ValueError, second._columns['palm_x'].__setitem__, 0, 1.0)
+		self.assertRaises (ValueError, second._timestamps.__setitem__, 0, 1.0)
+		self.assertRaises (ValueError, cache.entries[path][1]._columns['palm_x'].__setitem__, 0, 1.0)
+		self.assertFalse (cache.get_motion_sequence (path) is cache.get_motion_sequence (path))
+
+
+	def test_reload_on_change (self):
+
+		path = self.write_recording ('first', 10)
+		cache = RecordingCache ()
+		cache.get_frame_buffer (path)
+
+		self.write_recording ('first', 20)
+		bump_mtime (path)
+		self.assertFalse (cache.contains (path))
+		frame_buffer = cache.get_frame_buffer (path)
+		self.assertEqual (len(frame_buffer), 20)
+		stats = cache.get_stats ()
+		self.assertEqual ((stats['invalidations'], stats['misses'], stats['entries'], stats['bytes']), (1, 2, 1, 320))
+
+
+	def test_invalidate (self):
+
+		path = self.write_recording ('first', 10)
+		cache = RecordingCache ()
+		cache.get_frame_buffer (path)
+		cache.invalidate (path)
+		self.assertFalse (cache.contains (path))
+		self.assertEqual (cache.get_stats ()['bytes'], 0)
+		cache.get_frame_buffer (path)
+		self.assertEqual (cache.get_stats ()['misses'], 2)
+
+
+	def test_evicts_least_recently_used (self):
+
+		paths = [self.write_recording (name, 10) for name in ['a', 'b', 'c']]
+		cache = RecordingCache (_max_bytes=400)
+		cache.get_frame_buffer (paths[0])
+		cache.get_frame_buffer (paths[1])
+		cache.get_frame_buffer (paths[0])
+		cache.get_frame_buffer (paths[2])
+
+		stats = cache.get_stats ()
+		self.assertEqual ((stats['evictions'], stats['entries'], stats['bytes']), (1, 2, 320))
+		self.assertEqual ([cache.contains (path) for path in paths], [True, False, True])
+
+
+	def test_too_large (self):
+
+		path = self.write_recording ('first', 100)
+		cache = RecordingCache (_max_bytes=400)
+		self.assertEqual (len(cache.get_frame_buffer (path)), 100)
+		self.assertFalse (cache.contains (path))
+		self.assertEqual (cache.get_stats ()['bytes'], 0)
+
+
+	def test_mapped_outside_budget (self):
+
+		path = os.path.join (self.data_dir, 'first.recording')
+		save_columnar (make_frame_buffer (100), path)
+		cache = RecordingCache (_max_bytes=400)
+		cache.get_frame_buffer (path)
+
+		#=====[ memory-mapped columns are tracked, but don't count	]=====
+		stats = cache.get_stats ()
+		self.assertTrue (cache.contains (path))
+		self.assertEqual ((stats['bytes'], stats['mapped_bytes']), (0, 1600))
+
+
+if __name__ == '__main__':
+	unittest.main ()
@@ -0,0 +1,178 @@
+#-------------------------------------------------- #
+# Tests: RecordingCatalog
+# -----------------------
+# sync picks up added, changed and removed recordings,
+# relists only directories that changed, and keeps
+# working after the data directory moves.
+#-------------------------------------------------- #
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from ..motion_sequence.FrameBuffer import FrameBuffer
+from ..file_storage.RecordingCodec import encode_recording
+from ..file_storage.RecordingCatalog import RecordingCatalog
+
+
+# Function: write_recording
+# -------------------------
+# writes a (compressed) leap recording of num_frames 30Hz frames
+# to path, and returns path
+def write_recording (path, num_frames):
+
+	timestamps = np.arange (num_frames, dtype=np.float64) * 33333
+	encode_recording (FrameBuffer.from_arrays (timestamps, {'palm_x': np.arange (num_frames, dtype=np.float64)}), path)
+	return path
+
+
+# Function: bump_mtime
+# --------------------
+# moves path's mtime forward, so a change registers even within
+# the filesystem's mtime resolution
+def bump_mtime (path, secs=10):
+
+	mtime = os.path.getmtime (path) + secs
+	os.utime (path, (mtime, mtime))
+
+
+class CountingCatalog (RecordingCatalog):
+	"""
+		Class: CountingCatalog
+		----------------------
+		RecordingCatalog that records every path it indexes
+	"""
+
+	def __init__ (self, _db_path, _root_dir):
+
+		RecordingCatalog.__init__ (self, _db_path, _root_dir)
+		self.indexed = []
+
+
+	def add_recording (self, path, gesture_name=None, frame_buffer=None):
+
+		self.indexed.append (path)
+		RecordingCatalog.add_recording (self, path, gesture_name, frame_buffer)
+
+
+class TestRecordingCatalog (unittest.TestCase):
+
+	def setUp (self):
+
+		self.root_dir = tempfile.mkdtemp ()
+		self.recordings_dir = os.path.join (self.root_dir, 'recordings')
+		self.swirl_dir = os.path.join (self.root_dir, 'gestures', 'swirl')
+		os.makedirs (self.recordings_dir)
+		os.makedirs (self.swirl_dir)
+		self.db_path = os.path.join (self.root_dir, 'catalog.sqlite')
+
+
+	def tearDown (self):
+
+		shutil.rmtree (self.root_dir)
+
+
+	def open_catalog (self):
+
+		catalog = CountingCatalog (self.db_path, self.root_dir)
+		catalog.sync (self.recordings_dir, {'swirl': self.swirl_dir})
+		return catalog
+
+
+	def test_sync_indexes_recordings (self):
+
+		first = write_recording (os.path.join (self.swirl_dir, 'first.zrecording'), 31)
+		loose = write_recording (os.path.join (self.recordings_dir, 'loose.zrecording'), 4)
+		open (os.path.join (self.swirl_dir, 'notes.txt'), 'w').write ('not a recording')
+
+		catalog = self.open_catalog ()
+		self.assertEqual (catalog.get_gestures (), ['swirl'])
+		self.assertEqual (catalog.get_recording_paths ('swirl'), [first])
+		self.assertEqual (catalog.get_recording_paths (), [loose])
+
+		info = catalog.get_recording_info (first)
+		self.assertEqual (info['num_frames'], 31)
+		self.assertAlmostEqual (info['duration'], 30 * 0.033333)
+		self.assertEqual (info['devices'], ['leap'])
+		self.assertEqual (info['format'], 'compressed')
+		self.assertEqual ([i['path'] for i in catalog.find_recordings ('swirl', min_duration=0.5)], [first])
+		self.assertEqual (catalog.find_recordings ('swirl', max_duration=0.5), [])
+
+
+	def test_sync_skips_unchanged_directories (self):
+
+		write_recording (os.path.join (self.swirl_dir, 'first.zrecording'), 10)
+		self.open_catalog ()
+
+		#=====[ nothing changed: nothing reindexed	]=====
+		catalog = self.open_catalog ()
+		self.assertEqual (catalog.indexed, [])
+
+
+	def test_sync_invalidates (self):
+
+		first = write_recording (os.path.join (self.swirl_dir, 'first.zrecording'), 10)
+		second = write_recording (os.path.join (self.swirl_dir, 'second.zrecording'), 10)
+		self.open_catalog ()
+
+		#=====[ one added, one changed, one removed	]=====
+		third = write_recording (os.path.join (self.swirl_dir, 'third.zrecording'), 10)
+		write_recording (first, 20)
+		bump_mtime (first)
+		os.remove (second)
+		bump_mtime (self.swirl_dir)
+
+		catalog = self.open_catalog ()
+		self.assertEqual (sorted (catalog.indexed), [first, third])
+		self.assertEqual (catalog.get_recording_paths ('swirl'), [first, third])
+		self.assertEqual (catalog.get_recording_info (first)['num_frames'], 20)
+		self.assertTrue (catalog.get_recording_info (second) is None)
+
+
+	def test_sync_rewritten_in_place (self):
+
+		first = write_recording (os.path.join (self.swirl_dir, 'first.zrecording'), 10)
+		self.open_catalog ()
+
+		#=====[ the directory's mtime is as it was: the file itself is checked	]=====
+		directory_mtime = os.path.getmtime (self.swirl_dir)
+		write_recording (first, 20)
+		bump_mtime (first)
+		os.utime (self.swirl_dir, (directory_mtime, directory_mtime))
+
+		catalog = self.open_catalog ()
+		self.assertEqual (catalog.indexed, [first])
+		self.assertEqual (catalog.get_recording_info (first)['num_frames'], 20)
+
+
+	def test_sync_drops_removed_gestures (self):
+
+		write_recording (os.path.join (self.swirl_dir, 'first.zrecording'), 10)
+		self.open_catalog ()
+
+		catalog = CountingCatalog (self.db_path, self.root_dir)
+		catalog.sync (self.recordings_dir, {})
+		self.assertEqual (catalog.get_gestures (), [])
+		self.assertEqual (catalog.find_recordings (), [])
+
+
+	def test_moved_data_directory (self):
+
+		write_recording (os.path.join (self.swirl_dir, 'first.zrecording'), 10)
+		self.open_catalog ().connection.close ()
+
+		#=====[ paths are relative: moving everything keeps the catalog valid	]=====
+		moved_dir = self.root_dir + '_moved'
+		os.rename (self.root_dir, moved_dir)
+		self.root_dir = moved_dir
+		self.recordings_dir = os.path.join (moved_dir, 'recordings')
+		self.swirl_dir = os.path.join (moved_dir, 'gestures', 'swirl')
+		self.db_path = os.path.join (moved_dir, 'catalog.sqlite')
+
+		catalog = self.open_catalog ()
+		self.assertEqual (catalog.indexed, [])
+		self.assertEqual (catalog.get_recording_paths ('swirl'), [os.path.join (self.swirl_dir, 'first.zrecording')])
+
+
+if __name__ == '__main__':
+	unittest.main ()
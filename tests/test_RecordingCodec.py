@@ -0,0 +1,122 @@
+#-------------------------------------------------- #
+# Tests: RecordingCodec
+# ---------------------
+# round trips through every codec mode: exact where
+# promised, within the stated error where not.
+#-------------------------------------------------- #
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from ..motion_sequence.FrameBuffer import FrameBuffer
+from ..devices import skeleton
+from ..file_storage.RecordingCodec import *
+
+
+# Function: make_frame_buffer
+# ---------------------------
+# returns a FrameBuffer with one column of every kind the codec
+# treats differently, nan included
+def make_frame_buffer (num_frames=200):
+
+	random = np.random.RandomState (0)
+	timestamps = np.cumsum (random.uniform (30000, 36000, num_frames))
+	positions = random.uniform (-1000, 2000, (num_frames, skeleton.num_joints, 3)).astype (np.float32)
+	positions[5, 2] = np.nan
+	palm_x = random.normal (0, 100, num_frames)
+	palm_x[7] = np.nan
+	columns = 	{
+					skeleton.positions_column: positions,
+					'palm_x': palm_x,
+					'hands': random.randint (0, 3, num_frames),
+					'gesture': np.array (['swirl'] * (num_frames - 1) + [None], dtype=object)
+				}
+	return FrameBuffer.from_arrays (timestamps, columns, sorted (columns.keys ()))
+
+
+class TestRecordingCodec (unittest.TestCase):
+
+	def setUp (self):
+
+		self.data_dir = tempfile.mkdtemp ()
+		self.path = os.path.join (self.data_dir, 'recording' + compressed_extension)
+		self.frame_buffer = make_frame_buffer ()
+
+
+	def tearDown (self):
+
+		shutil.rmtree (self.data_dir)
+
+
+	def round_trip (self, mode):
+
+		report = encode_recording (self.frame_buffer, self.path, mode)
+		self.assertTrue (is_compressed_recording (self.path))
+		self.assertEqual (report['mode'], mode)
+		decoded = decode_recording (self.path)
+		self.assertEqual (decoded.get_column_names (), self.frame_buffer.get_column_names ())
+		for name in decoded.get_column_names ():
+			self.assertEqual (decoded.get_column (name).dtype, self.frame_buffer.get_column (name).dtype)
+			self.assertEqual (decoded.get_column (name).shape, self.frame_buffer.get_column (name).shape)
+		np.testing.assert_array_equal (decoded.get_timestamps (), np.round (self.frame_buffer.get_timestamps ()))
+		return decoded
+
+
+	def assert_exact (self, decoded, names):
+
+		for name in names:
+			np.testing.assert_array_equal (decoded.get_column (name), self.frame_buffer.get_column (name))
+
+
+	def test_lossless (self):
+
+		decoded = self.round_trip ('lossless')
+		self.assert_exact (decoded, self.frame_buffer.get_column_names ())
+
+
+	def test_quantized (self):
+
+		decoded = self.round_trip ('quantized')
+		self.assert_exact (decoded, ['palm_x', 'hands', 'gesture'])
+
+		#=====[ positions within half a step, nan kept	]=====
+		positions, original = decoded.get_column (skeleton.positions_column), self.frame_buffer.get_column (skeleton.positions_column)
+		np.testing.assert_array_equal (np.isnan (positions), np.isnan (original))
+		finite = np.isfinite (original)
+		self.assertTrue (np.abs (positions[finite] - original[finite]).max () <= default_precisions[skeleton.positions_column] / 2 + 1e-3)
+
+
+	def test_quantized_precisions (self):
+
+		encode_recording (self.frame_buffer, self.path, 'quantized', {'palm_x': 0.1})
+		decoded = decode_recording (self.path)
+		self.assert_exact (decoded, [skeleton.positions_column])
+		self.assertTrue (np.nanmax (np.abs (decoded.get_column ('palm_x') - self.frame_buffer.get_column ('palm_x'))) <= 0.05 + 1e-9)
+
+
+	def test_float16 (self):
+
+		decoded = self.round_trip ('float16')
+		self.assert_exact (decoded, ['hands', 'gesture'])
+		for name in [skeleton.positions_column, 'palm_x']:
+			np.testing.assert_allclose (decoded.get_column (name), self.frame_buffer.get_column (name), rtol=1e-3, atol=1e-3)
+
+
+	def test_report (self):
+
+		encode_recording (self.frame_buffer, self.path, 'lossless')
+		report = get_codec_report (self.path)
+		self.assertTrue (report['encoded_bytes'] > 0 and report['ratio'] > 0)
+		self.assertEqual (report['raw_bytes'], self.frame_buffer.get_timestamps ().nbytes + sum ([self.frame_buffer.get_column (name).nbytes for name in self.frame_buffer.get_column_names ()]))
+		self.assertTrue ('decode_secs' in report)
+
+
+	def test_unknown_mode (self):
+
+		self.assertRaises (ValueError, encode_recording, self.frame_buffer, self.path, 'lossy')
+		self.assertFalse (is_compressed_recording (self.path))
+
+
+if __name__ == '__main__':
+	unittest.main ()
@@ -0,0 +1,73 @@
+#-------------------------------------------------- #
+# Tests: StorageDelegate
+# ----------------------
+# converting recordings to other formats keeps each
+# gesture's recordings counted once.
+#-------------------------------------------------- #
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from ..file_storage.StorageDelegate import StorageDelegate
+
+
+# Function: write_pickled_recording
+# ---------------------------------
+# writes a pickled dataframe recording of num_frames leap frames
+# to path, and returns path
+def write_pickled_recording (path, num_frames=10):
+
+	dataframe = pd.DataFrame ({'timestamp': np.arange (num_frames) * 33333.0, 'palm_x': np.arange (num_frames, dtype=np.float64)})
+	dataframe.to_pickle (path)
+	return path
+
+
+class TestStorageDelegate (unittest.TestCase):
+
+	def setUp (self):
+
+		self.data_dir = tempfile.mkdtemp ()
+		self.swirl_dir = os.path.join (self.data_dir, 'gestures', 'swirl')
+		os.makedirs (self.swirl_dir)
+		for name in ['first', 'second']:
+			write_pickled_recording (os.path.join (self.swirl_dir, name + '.dataframe'))
+		self.storage_delegate = StorageDelegate (self.data_dir, num_load_workers=2)
+
+
+	def tearDown (self):
+
+		shutil.rmtree (self.data_dir)
+
+
+	def assert_recordings (self, storage_delegate, extension):
+
+		filepaths = storage_delegate.get_gesture_recording_filepaths ('swirl')
+		self.assertEqual ([os.path.basename (f) for f in filepaths], ['first' + extension, 'second' + extension])
+		self.assertEqual (len(storage_delegate.get_gesture_recordings ('swirl')), 2)
+
+
+	def test_convert_recordings (self):
+
+		self.storage_delegate.convert_recordings ()
+
+		#=====[ converted copies replace the kept pickles, also after a resync	]=====
+		self.assert_recordings (self.storage_delegate, '.recording')
+		self.assertTrue (os.path.exists (os.path.join (self.swirl_dir, 'first.dataframe')))
+		self.assert_recordings (StorageDelegate (self.data_dir, num_load_workers=2), '.recording')
+
+
+	def test_compress_recordings (self):
+
+		self.storage_delegate.convert_recordings ()
+		self.storage_delegate.compress_recordings ()
+
+		#=====[ compressed copies replace the kept originals, also after a resync	]=====
+		self.assert_recordings (self.storage_delegate, '.zrecording')
+		self.assertTrue (os.path.isdir (os.path.join (self.swirl_dir, 'first.recording')))
+		self.assert_recordings (StorageDelegate (self.data_dir, num_load_workers=2), '.zrecording')
+
+
+if __name__ == '__main__':
+	unittest.main ()
@@ -0,0 +1,65 @@
+#-------------------------------------------------- #
+# File: clock.py
+# --------------
+# monotonic clock for pacing and latency measurement.
+# uses time.monotonic where the interpreter has it,
+# else the 'monotonic' backport, else the system's
+# clock_gettime (CLOCK_MONOTONIC) through ctypes;
+# never wall-clock time, which jumps when the clock
+# is set.
+#-------------------------------------------------- #
+import os
+import sys
+import time
+import ctypes
+import ctypes.util
+
+
+# CLOCK_MONOTONIC per platform (sys.platform prefix -> clock id)
+clock_monotonic_ids = {'linux': 1, 'darwin': 6, 'freebsd': 4}
+
+
+class timespec (ctypes.Structure):
+	_fields_ = [('tv_sec', ctypes.c_long), ('tv_nsec', ctypes.c_long)]
+
+
+# Function: get_clock_gettime_monotonic
+# -------------------------------------
+# returns a function reading CLOCK_MONOTONIC through ctypes, or None
+# if this platform has none we know of
+def get_clock_gettime_monotonic ():
+
+	clock_ids = [i for prefix, i in clock_monotonic_ids.items () if sys.platform.startswith (prefix)]
+	if len(clock_ids) == 0:
+		return None
+	for library_name in [ctypes.util.find_library ('c'), ctypes.util.find_library ('rt')]:
+		if library_name is None:
+			continue
+		library = ctypes.CDLL (library_name, use_errno=True)
+		if not hasattr (library, 'clock_gettime'):
+			continue
+		clock_gettime = library.clock_gettime
+		clock_gettime.argtypes = [ctypes.c_int, ctypes.POINTER (timespec)]
+
+		def monotonic (clock_id=clock_ids[0], clock_gettime=clock_gettime):
+			t = timespec ()
+			if clock_gettime (clock_id, ctypes.byref (t)) != 0:
+				errno = ctypes.get_errno ()
+				raise OSError (errno, os.strerror (errno))
+			return t.tv_sec + t.tv_nsec * 1e-9
+		return monotonic
+	return None
+
+
+# Function: monotonic
+# -------------------
+# returns seconds on a clock that never goes backwards
+if hasattr (time, 'monotonic'):
+	monotonic = time.monotonic
+else:
+	try:
+		from monotonic import monotonic
+	except ImportError:
+		monotonic = get_clock_gettime_monotonic ()
+		if monotonic is None:
+			raise ImportError ("No monotonic clock available on " + sys.platform + "; install the 'monotonic' package")
@@ -7,6 +7,7 @@ from ..motion_sequence.MotionSequence import MotionSequence
 from ..motion_sequence.MotionSequence import usec_to_sec
 from ..motion_sequence.MotionSequence import PlayBackMotionSequence
 from ..classification.FeatureFunctions import lower_time_resolution
+from ..devices import skeleton
 from ..interface.util import print_message, print_status
 from .parameters import parameters
 
@@ -75,21 +76,22 @@ class PrimesenseVisualizer (Visualizer):
 	"""
 
 	limb_joint_pairs = 	[
-							('JOINT_HEAD_POSITION', 'JOINT_NECK_POSITION'),
-							('JOINT_NECK_POSITION', 'JOINT_LEFT_SHOULDER_POSITION'),
-							('JOINT_NECK_POSITION', 'JOINT_RIGHT_SHOULDER_POSITION'),
-							('JOINT_LEFT_SHOULDER_POSITION', 'JOINT_LEFT_ELBOW_POSITION'),
-							('JOINT_RIGHT_SHOULDER_POSITION', 'JOINT_RIGHT_ELBOW_POSITION'),
-							('JOINT_LEFT_ELBOW_POSITION', 'JOINT_LEFT_HAND_POSITION'),
-							('JOINT_RIGHT_ELBOW_POSITION', 'JOINT_RIGHT_HAND_POSITION'),
-							('JOINT_NECK_POSITION', 'JOINT_TORSO_POSITION'),
-							('JOINT_TORSO_POSITION', 'JOINT_LEFT_HIP_POSITION'),
-							('JOINT_TORSO_POSITION', 'JOINT_RIGHT_HIP_POSITION'),
-							('JOINT_LEFT_HIP_POSITION', 'JOINT_LEFT_KNEE_POSITION'),
-							('JOINT_RIGHT_HIP_POSITION', 'JOINT_RIGHT_KNEE_POSITION'),
-							('JOINT_LEFT_KNEE_POSITION', 'JOINT_LEFT_FOOT_POSITION'),
-							('JOINT_RIGHT_KNEE_POSITION', 'JOINT_RIGHT_FOOT_POSITION')
+							('JOINT_HEAD', 'JOINT_NECK'),
+							('JOINT_NECK', 'JOINT_LEFT_SHOULDER'),
+							('JOINT_NECK', 'JOINT_RIGHT_SHOULDER'),
+							('JOINT_LEFT_SHOULDER', 'JOINT_LEFT_ELBOW'),
+							('JOINT_RIGHT_SHOULDER', 'JOINT_RIGHT_ELBOW'),
+							('JOINT_LEFT_ELBOW', 'JOINT_LEFT_HAND'),
+							('JOINT_RIGHT_ELBOW', 'JOINT_RIGHT_HAND'),
+							('JOINT_NECK', 'JOINT_TORSO'),
+							('JOINT_TORSO', 'JOINT_LEFT_HIP'),
+							('JOINT_TORSO', 'JOINT_RIGHT_HIP'),
+							('JOINT_LEFT_HIP', 'JOINT_LEFT_KNEE'),
+							('JOINT_RIGHT_HIP', 'JOINT_RIGHT_KNEE'),
+							('JOINT_LEFT_KNEE', 'JOINT_LEFT_FOOT'),
+							('JOINT_RIGHT_KNEE', 'JOINT_RIGHT_FOOT')
 						]
+	limb_joint_indices = [(skeleton.joint_index[a], skeleton.joint_index[b]) for a, b in limb_joint_pairs]
 
 
 	def __init__ (self):
@@ -226,20 +228,19 @@ class PrimesenseVisualizer (Visualizer):
 			gathers statistics on movement within the motion sequence,
 			including centroid of motion and boundaries
 		"""
-		#==========[ Step 1: get dataframe, columns	]==========
-		df 					= ms.get_dataframe ()
-		position_columns 	= [i for i in df.columns if self.is_position_key (i)]
+		#==========[ Step 1: get joint positions (frames x joints x 3)	]==========
+		positions, orientations = ms.get_skeleton ()
 
-		#==========[ Step 2: get list of all x, y, z coordinates	]==========
-		xs = np.array([f['x'] for pos_col in position_columns for f in df[pos_col]]).flatten ()
-		ys = np.array([f['y'] for pos_col in position_columns for f in df[pos_col]]).flatten ()
-		zs = np.array([f['z'] for pos_col in position_columns for f in df[pos_col]]).flatten ()				
+		#==========[ Step 2: get all x, y, z coordinates	]==========
+		xs = positions[:, :, 0]
+		ys = positions[:, :, 1]
+		zs = positions[:, :, 2]
 
 		#==========[ Step 3: compute centroid, shifted motion boundaries	]==========
-		centroid = (np.mean(xs), np.mean(ys), np.mean(zs))
-		x_lims = (np.min(xs) - centroid[0] - 200, np.max(xs) - centroid[0] + 200)
-		y_lims = (np.min(ys) - centroid[1], np.max(ys) - centroid[1])
-		z_lims = (np.min(zs) - centroid[2] - 200, np.max(zs) - centroid[2] + 200)		
+		centroid = (np.nanmean(xs), np.nanmean(ys), np.nanmean(zs))
+		x_lims = (np.nanmin(xs) - centroid[0] - 200, np.nanmax(xs) - centroid[0] + 200)
+		y_lims = (np.nanmin(ys) - centroid[1], np.nanmax(ys) - centroid[1])
+		z_lims = (np.nanmin(zs) - centroid[2] - 200, np.nanmax(zs) - centroid[2] + 200)		
 		return centroid, x_lims, y_lims, z_lims
 
 
@@ -278,33 +279,23 @@ class PrimesenseVisualizer (Visualizer):
 		"""
 			PRIVATE: plot_line
 			------------------
-			given two points, plots a line between them
+			given two points (x, y, z arrays), plots a line between them
 			necessary because matplotlib screws up the axes for us...
 		"""
-		xs = [p1['x'], p2['x']]
-		ys = [p1['y'], p2['y']]
-		zs = [p1['z'], p2['z']]
+		xs = [p1[0], p2[0]]
+		ys = [p1[1], p2[1]]
+		zs = [p1[2], p2[2]]
 		return self.ax.plot (xs, zs, ys, color='#780000', linewidth=4, marker='o', markersize=12)
 
 
-	def shift (self, frame, origin):
+	def shift (self, positions, origin):
 		"""
 			PRIVATE: shift
 			--------------
-			given a frame, shifts it to the provided origin
+			given joint positions (joints x 3), shifts them to the
+			provided origin
 		""" 
-		joint_coords = {k:v for k, v in frame.items () if self.is_position_key(k)}
-
-		return {	
-				
-					k:	{	
-							'x':v['x'] - origin[0], 
-							'y':v['y'] - self.y_floor,
-							'z':v['z'] - origin[2]	
-						} 
-					
-						for k, v in joint_coords.items ()
-				}
+		return positions - np.array ([origin[0], self.y_floor, origin[2]], dtype=positions.dtype)
 
 
 	def update_animation (self, num, limbs, ms):
@@ -317,17 +308,18 @@ class PrimesenseVisualizer (Visualizer):
 		self.interpret_controls (ms)
 
 		#=====[ Step 2: get correct frame	]=====
-		current_frame = dict(ms.get_dataframe ().iloc [self.current_frame_index])
+		positions, orientations = ms.get_skeleton ()
+		current_positions = positions[self.current_frame_index % len(positions)]
 
 		#=====[ Step 3: apply shift to frame	]=====
-		current_frame = self.shift(current_frame, self.centroid)
+		current_positions = self.shift(current_positions, self.centroid)
 
 		#==========[ Step 4: update each limb with frame data	]==========
-		for limb, joint_pair in zip(limbs, self.limb_joint_pairs):
+		for limb, joint_pair in zip(limbs, self.limb_joint_indices):
 
-			xs = [current_frame[joint_pair[0]]['x'], current_frame[joint_pair[1]]['x']]
-			ys = [current_frame[joint_pair[0]]['y'], current_frame[joint_pair[1]]['y']]
-			zs = [current_frame[joint_pair[0]]['z'], current_frame[joint_pair[1]]['z']]						
+			xs = current_positions[joint_pair, 0]
+			ys = current_positions[joint_pair, 1]
+			zs = current_positions[joint_pair, 2]
 
 			limb = limb[0]
 			limb.set_data (xs, zs)